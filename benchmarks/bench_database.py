@@ -0,0 +1,68 @@
+"""
+Micro-benchmark: single-row inserts/sec through DatabaseManager.
+
+"before" reproduces the old write path (default rollback journal, commit after
+every statement); "after" is the current DatabaseManager (WAL + group commit).
+
+Run from the repository root:
+    python benchmarks/bench_database.py [--rows 2000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import aiosqlite
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from database import DatabaseManager  # noqa: E402
+
+CREATE = "CREATE TABLE events (id INTEGER PRIMARY KEY, channel_id INTEGER, content TEXT)"
+INSERT = "INSERT INTO events (channel_id, content) VALUES (?, ?)"
+
+
+async def bench_before(path: str, rows: int) -> float:
+    """Old behaviour: one commit (and fsync) per statement."""
+    async with aiosqlite.connect(path) as conn:
+        await conn.execute(CREATE)
+        await conn.commit()
+        start = time.perf_counter()
+        for i in range(rows):
+            async with conn.execute(INSERT, (i, "message content")):
+                await conn.commit()
+        return time.perf_counter() - start
+
+
+async def bench_after(path: str, rows: int) -> float:
+    db = DatabaseManager(path)
+    await db.connect()
+    await db.execute(CREATE, durable=True)
+    start = time.perf_counter()
+    for i in range(rows):
+        await db.execute(INSERT, i, "message content")
+    await db.commit()  # Include the final flush
+    elapsed = time.perf_counter() - start
+    await db.close()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = await bench_before(os.path.join(tmp, "before.db"), args.rows)
+        after = await bench_after(os.path.join(tmp, "after.db"), args.rows)
+
+    print(f"rows: {args.rows}")
+    print(f"before (commit per statement): {args.rows / before:10.0f} inserts/sec")
+    print(f"after  (WAL + group commit):   {args.rows / after:10.0f} inserts/sec")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import discord
+
+
+class CachedImage(NamedTuple):
+    """Attachment-like view of a cached image, for messages the message cache no longer knows."""
+    id: int
+    filename: str
+    size: int
+    content_type: str = "image/*"  # Only images are cached
+
+
+class AttachmentCache:
+    """
+    Bounded, content-addressed on-disk cache of image attachments.
+    Images are stored when a message is posted, so they can still be attached
+    to the deletion log after Discord's CDN has stopped serving them.
+    Blobs are evicted least-recently-used first once `max_bytes` is exceeded,
+    and unconditionally once unused for `max_age` seconds.
+    With a database, the message -> blob index is kept in SQLite too, so cached
+    images of messages posted before a restart can still be rescued.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age: float, channel_ids, max_messages: int = 10000,
+                 db=None):
+        self.directory = directory
+        self.db = db
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.channel_ids = frozenset(channel_ids)
+        self.max_messages = max_messages
+        self.logger = logging.getLogger("bot.attachment_cache")
+
+        # digest -> (size, last_used), least recently used first
+        self._blobs: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        # message ID -> (author ID, [(attachment ID, digest, filename)]), oldest first
+        self._messages: OrderedDict[int, tuple[int, list[tuple[int, str, str]]]] = OrderedDict()
+        self._forgotten: list[int] = []  # Message IDs to delete from the persisted index
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def should_cache(self, message: discord.Message) -> bool:
+        return message.channel.id in self.channel_ids and any(self._is_image(a) for a in message.attachments)
+
+    @staticmethod
+    def _is_image(attachment: discord.Attachment) -> bool:
+        return bool(attachment.content_type and attachment.content_type.startswith('image/'))
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    async def load(self):
+        """Indexes the blobs already on disk and restores the message index from the database."""
+        await asyncio.to_thread(self._scan)
+        if self.db is not None:
+            await self.db.execute(
+                "CREATE TABLE IF NOT EXISTS attachment_cache_index ("
+                "message_id INTEGER NOT NULL, attachment_id INTEGER NOT NULL, author_id INTEGER NOT NULL, "
+                "digest TEXT NOT NULL, filename TEXT NOT NULL, PRIMARY KEY (message_id, attachment_id)) WITHOUT ROWID"
+            )
+            # Message IDs are snowflakes, so this is oldest first
+            rows = await self.db.fetchall(
+                "SELECT message_id, attachment_id, author_id, digest, filename FROM attachment_cache_index "
+                "ORDER BY message_id, attachment_id"
+            )
+            for row in rows:
+                if row["digest"] in self._blobs:
+                    _author_id, entries = self._messages.setdefault(row["message_id"], (row["author_id"], []))
+                    entries.append((row["attachment_id"], row["digest"], row["filename"]))
+            stale = {row["message_id"] for row in rows} - set(self._messages)
+            self._forgotten.extend(stale)
+            self._trim_messages()
+            await self.flush()
+        self.logger.info(f"Attachment cache loaded: {len(self._blobs)} file(s), {self.total_bytes} bytes, "
+                         f"{len(self._messages)} message(s).")
+
+    def _scan(self):
+        """Indexes blobs already on disk (blocking; runs in a thread)."""
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        for root, _dirs, names in os.walk(self.directory):
+            for name in names:
+                stat = os.stat(os.path.join(root, name))
+                found.append((stat.st_mtime, name, stat.st_size))
+
+        for mtime, digest, size in sorted(found):
+            self._blobs[digest] = (size, mtime)
+            self.total_bytes += size
+        self._evict()
+
+    async def store(self, message: discord.Message):
+        """Downloads and stores the image attachments of a freshly posted message."""
+        entries = []
+        for attachment in message.attachments:
+            if not self._is_image(attachment) or attachment.size > self.max_bytes:
+                continue
+            try:
+                data = await attachment.read()
+            except Exception as e:
+                self.logger.warning(f"Could not cache attachment {attachment.filename}: {e}")
+                continue
+
+            digest = hashlib.sha256(data).hexdigest()
+            if digest not in self._blobs:
+                await asyncio.to_thread(self._write, digest, data)
+            # Checked again after the write: a concurrent store of the same bytes may have registered it
+            if digest in self._blobs:
+                self._touch(digest)  # Same bytes already stored
+            else:
+                self._blobs[digest] = (len(data), time.time())
+                self.total_bytes += len(data)
+            entries.append((attachment.id, digest, attachment.filename))
+
+        if entries:
+            self._messages[message.id] = (message.author.id, entries)
+            self._trim_messages()
+            self._evict()
+            if self.db is not None:
+                await self.db.executemany(
+                    "INSERT OR REPLACE INTO attachment_cache_index "
+                    "(message_id, attachment_id, author_id, digest, filename) VALUES (?, ?, ?, ?, ?)",
+                    [(message.id, attachment_id, message.author.id, digest, filename)
+                     for attachment_id, digest, filename in entries],
+                )
+                await self.flush()
+
+    def _trim_messages(self):
+        while len(self._messages) > self.max_messages:
+            message_id, _entries = self._messages.popitem(last=False)
+            self._forgotten.append(message_id)
+
+    async def flush(self):
+        """Deletes forgotten messages from the persisted index."""
+        message_ids, self._forgotten = self._forgotten, []
+        if message_ids and self.db is not None:
+            await self.db.executemany(
+                "DELETE FROM attachment_cache_index WHERE message_id = ?", [(message_id,) for message_id in message_ids]
+            )
+
+    def _write(self, digest: str, data: bytes):
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def get(self, message_id: int) -> Optional[tuple[int, list[CachedImage]]]:
+        """Author ID and still-cached images of a message, or None if the cache holds none."""
+        author_id, entries = self._messages.get(message_id, (None, ()))
+        images = [CachedImage(attachment_id, filename, self._blobs[digest][0])
+                  for attachment_id, digest, filename in entries if digest in self._blobs]
+        return (author_id, images) if images else None
+
+    def pop_files(self, message_id: int) -> dict[int, discord.File]:
+        """Returns the cached files of a message, keyed by attachment ID, and forgets the message."""
+        files = {}
+        _author_id, entries = self._messages.pop(message_id, (None, ()))
+        if entries:
+            self._forgotten.append(message_id)
+        for attachment_id, digest, filename in entries:
+            if digest not in self._blobs:
+                continue  # Evicted since it was stored
+            try:
+                files[attachment_id] = discord.File(self._path(digest), filename=filename)
+            except OSError:
+                self._drop(digest)
+                continue
+            self._touch(digest)
+        return files
+
+    def discard(self, message_id: int):
+        """Forgets a message without opening its files (the blobs stay until evicted)."""
+        if self._messages.pop(message_id, None) is not None:
+            self._forgotten.append(message_id)
+
+    def _touch(self, digest: str):
+        size, _last_used = self._blobs[digest]
+        self._blobs[digest] = (size, time.time())
+        self._blobs.move_to_end(digest)
+
+    def _evict(self):
+        cutoff = time.time() - self.max_age
+        while self._blobs:
+            digest, (_size, last_used) = next(iter(self._blobs.items()))
+            if self.total_bytes <= self.max_bytes and last_used >= cutoff:
+                break
+            self._drop(digest)
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+            self.stats["evictions"] += 1
+
+    def _drop(self, digest: str):
+        size, _last_used = self._blobs.pop(digest)
+        self.total_bytes -= size
+
+    def record(self, hits: int, misses: int):
+        self.stats["hits"] += hits
+        self.stats["misses"] += misses
+
+
+def from_config(config, db=None) -> Optional[AttachmentCache]:
+    """Builds the cache from config.py, or returns None if no channel opted in."""
+    channel_ids = getattr(config, "LOG_ATTACHMENT_CACHE_CHANNELS", [])
+    if not channel_ids:
+        return None
+    return AttachmentCache(
+        directory=getattr(config, "LOG_ATTACHMENT_CACHE_DIR", "attachment_cache"),
+        max_bytes=getattr(config, "LOG_ATTACHMENT_CACHE_MAX_BYTES", 500 * 1024 * 1024),
+        max_age=getattr(config, "LOG_ATTACHMENT_CACHE_MAX_AGE_HOURS", 72) * 3600,
+        channel_ids=channel_ids,
+        db=db,
+    )
@@ -0,0 +1,120 @@
+import asyncio
+import io
+import logging
+import os
+import tempfile
+from typing import Optional
+
+import aiohttp
+import discord
+
+
+class StagedAttachment:
+    """
+    An attachment downloaded once and kept either in memory or in a temporary
+    file on disk, so it can be re-uploaded to any number of channels.
+    """
+    __slots__ = ("filename", "spoiler", "description", "size", "data", "path")
+
+    def __init__(self, attachment: discord.Attachment, data: Optional[bytes] = None, path: Optional[str] = None):
+        self.filename = attachment.filename
+        self.spoiler = attachment.is_spoiler()
+        self.description = attachment.description
+        self.size = len(data) if data is not None else os.path.getsize(path)
+        self.data = data
+        self.path = path
+
+    def to_file(self) -> discord.File:
+        """Returns a fresh discord.File over the staged bytes (one per upload)."""
+        fp = io.BytesIO(self.data) if self.data is not None else self.path
+        return discord.File(fp, filename=self.filename, spoiler=self.spoiler, description=self.description)
+
+    def cleanup(self):
+        """Removes the temporary file, if the attachment was spilled to disk."""
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self.data = None
+
+
+class AttachmentPipeline:
+    """
+    Downloads message attachments concurrently (bounded) within a per-message byte budget.
+    Files up to `spool_threshold` bytes stay in memory; larger ones are streamed to disk.
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, max_concurrency: int = 4, max_bytes_per_message: int = 25 * 1024 * 1024,
+                 spool_threshold: int = 2 * 1024 * 1024, session: Optional[aiohttp.ClientSession] = None):
+        self.max_bytes_per_message = max_bytes_per_message
+        self.spool_threshold = spool_threshold
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # A shared session (e.g. the bot's) is borrowed, never closed here
+        self._session = session
+        self._owns_session = session is None
+        self.logger = logging.getLogger("bot.attachments")
+
+    async def close(self):
+        if self._owns_session and self._session and not self._session.closed:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session = aiohttp.ClientSession()
+            self._owns_session = True
+        return self._session
+
+    async def stage(self, attachments: list[discord.Attachment]) -> tuple[list[StagedAttachment], list[discord.Attachment]]:
+        """
+        Downloads the attachments that fit in the byte budget.
+        Returns (staged, skipped); skipped attachments were over budget or failed to download.
+        """
+        selected, skipped = [], []
+        remaining = self.max_bytes_per_message
+        for attachment in attachments:
+            if attachment.size > remaining:
+                skipped.append(attachment)
+                continue
+            remaining -= attachment.size
+            selected.append(attachment)
+
+        results = await asyncio.gather(*(self._download(a) for a in selected))
+
+        staged = []
+        for attachment, result in zip(selected, results):
+            if result is None:
+                skipped.append(attachment)
+            else:
+                staged.append(result)
+
+        if skipped:
+            self.logger.warning(f"Skipped {len(skipped)} attachment(s) (over budget or failed): {[a.filename for a in skipped]}")
+        return staged, skipped
+
+    async def _download(self, attachment: discord.Attachment) -> Optional[StagedAttachment]:
+        async with self._semaphore:
+            try:
+                if attachment.size <= self.spool_threshold:
+                    return StagedAttachment(attachment, data=await attachment.read())
+                return StagedAttachment(attachment, path=await self._download_to_disk(attachment))
+            except Exception as e:
+                self.logger.error(f"Failed to download attachment {attachment.filename}: {e}")
+                return None
+
+    async def _download_to_disk(self, attachment: discord.Attachment) -> str:
+        """Streams a large attachment to a temporary file without buffering it in memory."""
+        fd, path = tempfile.mkstemp(prefix="mirror_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async with self._get_session().get(attachment.url) as resp:
+                    resp.raise_for_status()
+                    async for chunk in resp.content.iter_chunked(self.CHUNK_SIZE):
+                        f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import discord
+
+# Audit log actions that explain a member leaving
+TRACKED_ACTIONS = (
+    discord.AuditLogAction.kick,
+    discord.AuditLogAction.ban,
+    discord.AuditLogAction.member_prune,
+)
+
+
+class AuditRecord(NamedTuple):
+    action: discord.AuditLogAction
+    user_id: Optional[int]  # Executor
+    reason: Optional[str]
+    recorded_at: float
+
+
+class AuditIndex:
+    """
+    Short-lived in-memory index of recent kick/ban/prune audit log entries,
+    keyed by (guild ID, target user ID), fed by the audit log gateway event.
+    Each record explains one removal and is consumed by it. Prunes have no
+    single target: they are keyed by (guild ID, None) and explain at most as
+    many leaves as the prune removed members.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._records: OrderedDict[tuple[int, Optional[int]], AuditRecord] = OrderedDict()
+        self._prune_left: dict[int, Optional[int]] = {}  # guild ID -> leaves the prune still explains (None = unknown)
+        self._waiters: dict[tuple[int, Optional[int]], list[asyncio.Future]] = {}
+
+    def add(self, entry: discord.AuditLogEntry):
+        if entry.action not in TRACKED_ACTIONS:
+            return
+        guild_id = entry.guild.id
+        record = AuditRecord(entry.action, entry.user_id, entry.reason, time.monotonic())
+
+        if entry.action is discord.AuditLogAction.member_prune:
+            key = (guild_id, None)
+            self._prune_left[guild_id] = getattr(entry.extra, "members_removed", None)
+        else:
+            key = (guild_id, getattr(entry.target, "id", None))
+        self._records.pop(key, None)
+        self._records[key] = record
+        self._expire()
+
+        # Hand the record to removals already waiting for it
+        waiting = [k for k in self._waiters if k[0] == guild_id] if key[1] is None else [key]
+        for waiter_key in waiting:
+            for future in list(self._waiters.get(waiter_key, ())):
+                if future.done():
+                    continue
+                taken = self.take(*waiter_key)
+                if taken is None:
+                    return
+                future.set_result(taken)
+
+    def take(self, guild_id: int, user_id: int) -> Optional[AuditRecord]:
+        """Returns (and consumes) the record explaining why a user left, if one is still fresh."""
+        self._expire()
+        record = self._records.pop((guild_id, user_id), None)
+        if record is not None:
+            return record
+
+        record = self._records.get((guild_id, None))
+        left = self._prune_left.get(guild_id)
+        if record is None or left is None:
+            return record
+        if left <= 1:
+            del self._records[(guild_id, None)]
+            del self._prune_left[guild_id]
+            if left < 1:
+                return None
+        else:
+            self._prune_left[guild_id] = left - 1
+        return record
+
+    async def wait_for(self, guild_id: int, user_id: int, timeout: float) -> Optional[AuditRecord]:
+        """Like take(), but waits briefly for the audit event, which may arrive after the leave event."""
+        record = self.take(guild_id, user_id)
+        if record is not None:
+            return record
+
+        key = (guild_id, user_id)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(key)
+            if waiters and future in waiters:
+                waiters.remove(future)
+                if not waiters:
+                    del self._waiters[key]
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._records:
+            key, record = next(iter(self._records.items()))
+            if record.recorded_at >= cutoff:
+                break
+            del self._records[key]
+            if key[1] is None:
+                self._prune_left.pop(key[0], None)
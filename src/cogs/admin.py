@@ -0,0 +1,98 @@
+import io
+from typing import Literal
+
+import discord
+from discord.ext import commands
+
+from profiler import Profiler
+
+SORT_KEYS = ("total", "count", "mean", "max")
+
+
+class Admin(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.profiler = Profiler()
+
+    async def cog_unload(self):
+        if self.profiler.running:
+            self.profiler.stop()
+
+    @commands.hybrid_command(name="dbstats", description="Shows the database statements taking the most time.")
+    @commands.has_permissions(administrator=True)
+    async def dbstats(self, ctx: commands.Context, sort: str = "total", limit: commands.Range[int, 1, 25] = 10):
+        """Lists the top statements by total time (or count/mean/max) since startup."""
+        if sort not in SORT_KEYS:
+            await ctx.send(f"❌ Sort by one of: {', '.join(SORT_KEYS)}.", ephemeral=True)
+            return
+
+        query_stats = self.bot.db.query_stats
+        top = query_stats.top(limit, key=sort)
+        if not top:
+            await ctx.send("No queries recorded yet.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title=f"🗄️ Top {len(top)} Statements by {sort.title()}",
+            description=f"{len(query_stats)} distinct statement(s) recorded. Slow query threshold: "
+                        f"{self._format_threshold(self.bot.db.slow_query_threshold)}.",
+            color=discord.Color.dark_teal(),
+        )
+        for i, stats in enumerate(top, start=1):
+            statement = stats.statement if len(stats.statement) <= 200 else stats.statement[:197] + "..."
+            embed.add_field(
+                name=f"{i}. {stats.total * 1000:.0f} ms total · {stats.count} call(s)",
+                value=f"avg {stats.mean * 1000:.2f} ms · p95 {stats.quantile(0.95) * 1000:.1f} ms · "
+                      f"max {stats.max * 1000:.1f} ms\n```sql\n{statement}\n```",
+                inline=False,
+            )
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_group(name="profile", description="Profiles the bot's event loop on demand.")
+    @commands.is_owner()
+    async def profile(self, ctx: commands.Context):
+        state = "running" if self.profiler.running else "off"
+        await ctx.send(f"Profiler is {state}. Use `profile start`, `profile stop` or `profile dump`.", ephemeral=True)
+
+    @profile.command(name="start", description="Starts profiling for a window of seconds.")
+    @commands.is_owner()
+    async def profile_start(self, ctx: commands.Context, seconds: commands.Range[int, 1, 600] = 60):
+        try:
+            self.profiler.start(seconds)
+        except RuntimeError as e:
+            await ctx.send(f"❌ {e}", ephemeral=True)
+            return
+        await ctx.send(f"⏱️ Profiling for up to {seconds}s. Use `profile stop` to end early.", ephemeral=True)
+
+    @profile.command(name="stop", description="Stops profiling and sends the report.")
+    @commands.is_owner()
+    async def profile_stop(self, ctx: commands.Context, sort: Literal["cumulative", "tottime", "ncalls"] = "cumulative"):
+        try:
+            report = self.profiler.stop(sort)
+        except RuntimeError as e:
+            await ctx.send(f"❌ {e}", ephemeral=True)
+            return
+        await ctx.send("✅ Profiling stopped.", file=self._report_file(report), ephemeral=True)
+
+    @profile.command(name="dump", description="Sends the report of the last profiling session.")
+    @commands.is_owner()
+    async def profile_dump(self, ctx: commands.Context):
+        if self.profiler.running:
+            await ctx.send("A session is still running; use `profile stop` to end it and get its report.", ephemeral=True)
+            return
+        if self.profiler.last_report is None:
+            await ctx.send("No profiling session has finished yet.", ephemeral=True)
+            return
+        await ctx.send(file=self._report_file(self.profiler.last_report), ephemeral=True)
+
+    @staticmethod
+    def _report_file(report: str) -> discord.File:
+        return discord.File(io.BytesIO(report.encode("utf-8")), filename="profile.txt")
+
+    @staticmethod
+    def _format_threshold(threshold) -> str:
+        return "off" if threshold is None else f"{threshold * 1000:.0f} ms"
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Admin(bot))
@@ -1,10 +1,41 @@
+import re
+import time
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+import config
+from purge import PurgeFilter, PurgeJob
+
+# Interaction tokens expire after 15 minutes, and with them edits to an ephemeral status message
+INTERACTION_EDIT_WINDOW = 14 * 60
+
+
+class PurgeView(discord.ui.View):
+    """Cancel button on a purge's status message."""
+
+    def __init__(self, author_id: int):
+        super().__init__(timeout=None)
+        self.author_id = author_id
+        self.job: PurgeJob = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        permissions = getattr(interaction.user, "guild_permissions", None)
+        return interaction.user.id == self.author_id or bool(permissions and permissions.manage_messages)
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.danger)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.job:
+            self.job.cancel()
+        button.disabled = True
+        await interaction.response.edit_message(view=self)
+
+
 class General(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._purges: dict[int, PurgeJob] = {}  # Channel ID -> running purge
 
     @commands.hybrid_command(name="ping", description="Checks the bot's latency.")
     async def ping(self, ctx: commands.Context):
@@ -12,12 +43,87 @@ class General(commands.Cog):
         latency_ms = round(self.bot.latency * 1000)
         await ctx.send(f"Pong! 🏓 ({latency_ms}ms)")
 
-    @commands.hybrid_command(name="purge", description="Deletes a specified number of messages.")
+    @commands.hybrid_command(name="purge", description="Deletes messages, optionally filtered.")
     @commands.has_permissions(manage_messages=True)
+    @commands.bot_has_permissions(manage_messages=True, read_message_history=True)
     @commands.guild_only()
-    async def purge(self, ctx: commands.Context, amount: int):
-        deleted = await ctx.channel.purge(limit=amount)
-        await ctx.send(f"Deleted {len(deleted)} messages.", delete_after=3, ephemeral=True)
+    @app_commands.describe(
+        amount="How many matching messages to delete",
+        user="Only messages from this user",
+        bots="Only messages from bots",
+        contains="Only messages containing this text",
+        attachments="Only messages with attachments",
+        regex="Only messages matching this regular expression",
+    )
+    async def purge(self, ctx: commands.Context, amount: commands.Range[int, 1, 10000], user: discord.User = None,
+                    bots: bool = False, contains: str = None, attachments: bool = False, regex: str = None):
+        if ctx.channel.id in self._purges:
+            await ctx.send("A purge is already running in this channel.", ephemeral=True)
+            return
+
+        pattern = None
+        if regex:
+            try:
+                pattern = re.compile(regex[:200])
+            except re.error as e:
+                await ctx.send(f"❌ Invalid regex: {e}", ephemeral=True)
+                return
+
+        purge_filter = PurgeFilter(user_id=user.id if user else None, bots_only=bots, contains=contains,
+                                   has_attachment=attachments, pattern=pattern)
+        view = PurgeView(ctx.author.id)
+        status = await ctx.send(embed=self._purge_embed(None, purge_filter, amount), view=view, ephemeral=True)
+        started = time.monotonic()
+        progress_message = status
+
+        async def show_progress(job: PurgeJob):
+            nonlocal progress_message
+            embed = self._purge_embed(job, purge_filter, amount)
+            if progress_message is status and ctx.interaction and time.monotonic() - started > INTERACTION_EDIT_WINDOW:
+                # Long purges (old messages go one per second) outlive the token: continue in a channel message
+                progress_message = await ctx.channel.send(embed=embed, view=None if job.finished else view)
+                return
+            await progress_message.edit(embed=embed, view=None if job.finished else view)
+
+        job = PurgeJob(
+            ctx.channel, purge_filter, amount,
+            before=ctx.message if ctx.interaction is None else status,
+            scan_limit=getattr(config, "PURGE_MAX_SCAN", 50000),
+            single_delete_interval=getattr(config, "PURGE_SINGLE_DELETE_INTERVAL", 1.0),
+            on_progress=show_progress,
+        )
+        view.job = job
+        self._purges[ctx.channel.id] = job
+        try:
+            await job.run()
+        finally:
+            del self._purges[ctx.channel.id]
+            view.stop()
+
+    @staticmethod
+    def _purge_embed(job, purge_filter: PurgeFilter, amount: int) -> discord.Embed:
+        if job is None:
+            title, color = "🧹 Purge starting", discord.Color.blurple()
+        elif not job.finished:
+            title, color = "🧹 Purging...", discord.Color.blurple()
+        elif job.error:
+            title, color = "❌ Purge stopped", discord.Color.red()
+        elif job.cancelled:
+            title, color = "⏹️ Purge cancelled", discord.Color.orange()
+        else:
+            title, color = "✅ Purge complete", discord.Color.green()
+
+        embed = discord.Embed(title=title, color=color)
+        embed.description = f"Up to {amount} message(s): {purge_filter.describe()}."
+        if job is not None:
+            embed.add_field(name="Scanned", value=job.scanned, inline=True)
+            embed.add_field(name="Matched", value=job.matched, inline=True)
+            embed.add_field(name="Deleted", value=job.deleted, inline=True)
+            if job.failed:
+                embed.add_field(name="Failed", value=job.failed, inline=True)
+            if job.error:
+                embed.add_field(name="Error", value=job.error, inline=False)
+        return embed
 
     @purge.error
     async def purge_error(self, ctx: commands.Context, error):
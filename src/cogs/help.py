@@ -1,54 +1,94 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 
+from help_index import HelpIndex
+
+class HelpView(discord.ui.View):
+    """Previous/Next pager over the pre-rendered help pages."""
+
+    def __init__(self, pages: list[discord.Embed], author_id: int):
+        super().__init__(timeout=120)
+        self.pages = pages
+        self.author_id = author_id
+        self.page = 0
+        self.message: discord.Message = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= len(self.pages) - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Run /help yourself to page through the commands.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.page], view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page += 1
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.pages[self.page], view=self)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
 class Help(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._index: HelpIndex = None  # Built on first use after each extension load/unload
+
+    @property
+    def index(self) -> HelpIndex:
+        if self._index is None:
+            self._index = HelpIndex.build(self.bot)
+        return self._index
+
+    @commands.Cog.listener()
+    async def on_extensions_changed(self, name: str):
+        self._index = None
 
     @commands.hybrid_command(name="help", description="Displays the list of available commands.")
-    async def help(self, ctx: commands.Context, command_name: str = None):
+    @app_commands.describe(command_name="Command to show details for")
+    async def help(self, ctx: commands.Context, *, command_name: str = None):
         """
         Displays the list of available commands or details for a specific command.
         """
         if command_name:
             # Help for a specific command
-            cmd = self.bot.get_command(command_name)
-            if not cmd or cmd.hidden:
-                await ctx.send(f"❌ Command `{command_name}` not found.", ephemeral=True)
+            embed = self.index.lookup(command_name)
+            if embed is None:
+                suggestions = self.index.suggest(command_name, limit=3)
+                hint = f" Did you mean {', '.join(f'`{name}`' for name in suggestions)}?" if suggestions else ""
+                await ctx.send(f"❌ Command `{command_name}` not found.{hint}", ephemeral=True)
                 return
+            await ctx.send(embed=embed)
+            return
 
-            embed = discord.Embed(title=f"Command: {cmd.name}", description=cmd.description or "No description provided.", color=discord.Color.blue())
-            if cmd.aliases:
-                embed.add_field(name="Aliases", value=", ".join(cmd.aliases), inline=False)
-            
-            # Usage syntax (basic)
-            params = []
-            for key, value in cmd.clean_params.items():
-                params.append(f"<{key}>" if value.default is value.empty else f"[{key}]")
-            usage = f"/{cmd.name} " + " ".join(params)
-            embed.add_field(name="Usage", value=f"`{usage}`", inline=False)
+        # General Help
+        pages = self.index.pages
+        if len(pages) == 1:
+            await ctx.send(embed=pages[0])
+            return
+        view = HelpView(pages, ctx.author.id)
+        view.message = await ctx.send(embed=pages[0], view=view)
 
-            await ctx.send(embed=embed)
-        else:
-            # General Help
-            embed = discord.Embed(title="📚 Bot Commands", description="Here are the available commands:", color=discord.Color.blue())
-            
-            for cog_name, cog in self.bot.cogs.items():
-                commands_list = []
-                for cmd in cog.get_commands():
-                    if not cmd.hidden:
-                        commands_list.append(f"`{cmd.name}`")
-                
-                if commands_list:
-                    embed.add_field(name=cog_name, value=", ".join(commands_list), inline=False)
-            
-            # Uncategorized
-            uncogged = [f"`{c.name}`" for c in self.bot.commands if c.cog is None and not c.hidden]
-            if uncogged:
-                embed.add_field(name="Uncategorized", value=", ".join(uncogged), inline=False)
-
-            embed.set_footer(text="Type /help <command> for more info.")
-            await ctx.send(embed=embed)
+    @help.autocomplete("command_name")
+    async def command_name_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        return [app_commands.Choice(name=name, value=name) for name in self.index.suggest(current)]
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(Help(bot))
\ No newline at end of file
+    await bot.add_cog(Help(bot))
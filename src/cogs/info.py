@@ -1,10 +1,72 @@
+import heapq
+
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+
+from guild_stats import GuildStatsEngine
+
+# /growth: days of history shown row by row (totals cover the whole range)
+GROWTH_TABLE_DAYS = 14
 
 class Info(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.stats = GuildStatsEngine(self.bot.db)
+
+    async def cog_load(self):
+        await self.stats.create_tables()
+        if self.bot.is_ready():  # Reloaded: guild_available will not fire again
+            for guild in self.bot.guilds:
+                await self.stats.seed(guild)
+        self.persist_stats.start()
+
+    async def cog_unload(self):
+        self.persist_stats.cancel()
+        await self.stats.persist()
+
+    @tasks.loop(minutes=10)
+    async def persist_stats(self):
+        # Today's row is rewritten in place; a day's final counts land on the first run after midnight UTC
+        await self.stats.persist()
+
+    # --- Stats upkeep ---
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        await self.stats.seed(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        await self.stats.seed(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.stats.remove_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.stats.member_join(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.stats.member_remove(member)
 
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        self.stats.member_update(before, after)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.stats.role_delete(role)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self.stats.channel_create(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.stats.channel_delete(channel)
+
+    # --- Commands ---
     @commands.hybrid_command(name="userinfo", description="Displays information about a user.")
     async def userinfo(self, ctx: commands.Context, member: discord.Member = None):
         member = member or ctx.author
@@ -20,20 +82,64 @@ class Info(commands.Cog):
         await ctx.send(embed=embed)
 
     @commands.hybrid_command(name="serverinfo", description="Displays information about the server.")
+    @commands.guild_only()
     async def serverinfo(self, ctx: commands.Context):
         guild = ctx.guild
         embed = discord.Embed(title=f"Server Info: {guild.name}", color=discord.Color.blue())
         if guild.icon:
             embed.set_thumbnail(url=guild.icon.url)
         
-        embed.add_field(name="Owner", value=guild.owner.mention, inline=True)
+        embed.add_field(name="Owner", value=guild.owner.mention if guild.owner else f"<@{guild.owner_id}>", inline=True)
         embed.add_field(name="Members", value=guild.member_count, inline=True)
-        embed.add_field(name="Channels", value=len(guild.channels), inline=True)
+
+        stats = self.stats.get(guild.id)
+        if stats is None:  # Not counted yet (guild still loading)
+            embed.add_field(name="Channels", value=len(guild.channels), inline=True)
+        else:
+            embed.add_field(name="Humans / Bots", value=f"{stats.humans} / {stats.bots}", inline=True)
+            channels = stats.channels
+            embed.add_field(
+                name=f"Channels ({sum(channels.values())})",
+                value=f"{channels['text']} text · {channels['voice']} voice · {channels['forum']} forum · "
+                      f"{channels['category']} categories",
+                inline=False,
+            )
+            embed.add_field(name="Today", value=f"+{stats.joins} joined · -{stats.leaves} left", inline=True)
+
         embed.add_field(name="Roles", value=len(guild.roles), inline=True)
         embed.add_field(name="Created At", value=discord.utils.format_dt(guild.created_at, style='D'), inline=True)
+
+        if stats is not None and stats.roles:
+            top_roles = heapq.nlargest(5, stats.roles.items(), key=lambda item: item[1])
+            embed.add_field(name="Largest Roles", value="\n".join(f"<@&{role_id}> · {count}" for role_id, count in top_roles),
+                            inline=False)
         
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="growth", description="Shows the server's member growth over the last days.")
+    @commands.guild_only()
+    async def growth(self, ctx: commands.Context, days: commands.Range[int, 2, 90] = 30):
+        """Daily members, joins and leaves from the stored snapshots (today is live)."""
+        history = await self.stats.history(ctx.guild.id, days)
+        if not history:
+            await ctx.send("No statistics recorded for this server yet.", ephemeral=True)
+            return
+
+        first, last = history[0], history[-1]
+        joins = sum(day.joins for day in history)
+        leaves = sum(day.leaves for day in history)
+        embed = discord.Embed(title=f"📈 Growth: {ctx.guild.name}", color=discord.Color.blue(),
+                              description=f"{len(history)} day(s) recorded since {first.day}.")
+        embed.add_field(name="Members", value=f"{last.members} ({last.members - first.members:+d})", inline=True)
+        embed.add_field(name="Joined / Left", value=f"+{joins} / -{leaves}", inline=True)
+        embed.add_field(name="Joins per Day", value=f"{joins / len(history):.1f}", inline=True)
+
+        rows = [f"{'Day':<10} {'Members':>8} {'Joined':>7} {'Left':>6}"]
+        rows += [f"{day.day:<10} {day.members:>8} {day.joins:>7} {day.leaves:>6}" for day in history[-GROWTH_TABLE_DAYS:]]
+        embed.add_field(name=f"Last {min(len(history), GROWTH_TABLE_DAYS)} Day(s)", value="```\n" + "\n".join(rows) + "\n```",
+                        inline=False)
+        await ctx.send(embed=embed)
+
     @commands.hybrid_command(name="avatar", description="Displays a user's avatar.")
     async def avatar(self, ctx: commands.Context, member: discord.Member = None):
         member = member or ctx.author
@@ -42,4 +148,4 @@ class Info(commands.Cog):
         await ctx.send(embed=embed)
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(Info(bot))
\ No newline at end of file
+    await bot.add_cog(Info(bot))
@@ -1,25 +1,182 @@
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
 import aiohttp
+import asyncio
 import io
 import logging
+from typing import Literal
 
 import config
+import attachment_cache
+import metrics
+from audit_index import AuditIndex, AuditRecord
+from event_archive import EVENT_TYPES, EventArchive, parse_duration
+from join_flood import JoinFloodGuard
+from log_dispatcher import LogDispatcher
+from message_cache import MessageCache
+
+# /logsearch: matches fetched per search, and how many are shown in the embed (the rest go in a file)
+LOG_SEARCH_LIMIT = 200
+LOG_SEARCH_EMBED_RESULTS = 10
 
 class Logger(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.logger = logging.getLogger("bot.cogs.logger")
         
-        # --- CONFIGURATION ---
-        self.log_channel_messages = config.LOG_CHANNEL_MESSAGES
-        self.log_channel_members = config.LOG_CHANNEL_MEMBERS
-        self.log_channel_moderation = config.LOG_CHANNEL_MODERATION
-        self.log_channel_server = config.LOG_CHANNEL_SERVER
-        self.log_channel_voice = config.LOG_CHANNEL_VOICE
+        # Image rescue limits (per request timeout, total bytes attached per log message)
+        self.rescue_timeout = aiohttp.ClientTimeout(total=getattr(config, "LOG_RESCUE_TIMEOUT", 5))
+        self.rescue_max_bytes = getattr(config, "LOG_RESCUE_MAX_BYTES", 8 * 1024 * 1024)
+
+        # Compact record of recent messages, for deletions discord.py's cache misses
+        self.message_cache = MessageCache(
+            max_entries=getattr(config, "LOG_MESSAGE_CACHE_MAX_ENTRIES", 50000),
+            max_bytes=getattr(config, "LOG_MESSAGE_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+        )
+
+        # Opt-in local copy of images from allowlisted channels (None when disabled)
+        self.attachment_cache = attachment_cache.from_config(config)
+
+        # Coalesces log embeds per channel (up to 10 per message)
+        self.dispatcher = LogDispatcher(interval=getattr(config, "LOG_BATCH_INTERVAL", 1.0))
+
+        # Recent kick/ban/prune audit entries, fed by on_audit_log_entry_create
+        self.audit_index = AuditIndex(ttl=30.0)
+        self.audit_wait_timeout = 2.0
+
+        # Searchable SQLite copy of every logged event (set up in cog_load)
+        self.archive: EventArchive = None
+        self._archive_flush: asyncio.Task = None
+
+        # During a join flood, one aggregated join embed per window instead of one per join
+        self.join_flood = JoinFloodGuard(
+            self._log_join_batch, "join logs",
+            threshold=getattr(config, "JOIN_FLOOD_THRESHOLD", 10),
+            window=getattr(config, "JOIN_FLOOD_WINDOW", 10.0),
+        )
+
+    async def cog_load(self):
+        if self.attachment_cache:
+            self.attachment_cache.db = self.bot.db
+            await self.attachment_cache.load()
+
+        self.archive = EventArchive(
+            self.bot.db,
+            retention_days=getattr(config, "LOG_ARCHIVE_RETENTION_DAYS", 30),
+            batch_size=getattr(config, "LOG_ARCHIVE_BATCH_SIZE", 500),
+        )
+        await self.archive.create_tables()
+        self.flush_archive.start()
+        self.prune_archive.start()
+
+        metrics.QUEUE_DEPTH.labels("log_dispatcher").set_function(self.dispatcher.depth)
+        metrics.QUEUE_DEPTH.labels("log_archive").set_function(self.archive.__len__)
+
+    async def cog_unload(self):
+        metrics.QUEUE_DEPTH.remove("log_dispatcher")
+        metrics.QUEUE_DEPTH.remove("log_archive")
+
+        # Runs on Bot.close too: send whatever is still queued
+        await self.join_flood.close()
+        await self.dispatcher.close()
+        if self.archive:
+            self.flush_archive.cancel()
+            self.prune_archive.cancel()
+            await self.archive.flush()
+        if self.attachment_cache:
+            await self.attachment_cache.flush()
+
+    def log_channel(self, guild_id, kind: str):
+        """The guild's log channel ID for `kind` (messages, members, moderation, server, voice), or None."""
+        return self.bot.settings.get(guild_id, f"log_channel_{kind}")
+
+    def _archive(self, event_type: str, guild_id, user_id=None, channel_id=None, content: str = ""):
+        """Records a log event in the searchable archive (written in batches)."""
+        if self.archive is None:
+            return
+        if self.archive.record(event_type, guild_id, user_id, channel_id, content) and self._archive_flush is None:
+            self._archive_flush = asyncio.create_task(self._flush_full_archive())
+
+    async def _flush_full_archive(self):
+        try:
+            await self.archive.flush()
+        except Exception as e:
+            self.logger.error(f"Could not write archived log events: {e}")
+        finally:
+            self._archive_flush = None
+
+    @tasks.loop(seconds=5)
+    async def flush_archive(self):
+        await self.archive.flush()
+        if self.attachment_cache:
+            await self.attachment_cache.flush()
+
+    @tasks.loop(hours=1)
+    async def prune_archive(self):
+        await self.archive.prune()
+
+    @commands.hybrid_command(name="logsearch", description="Searches the archived log events.")
+    @commands.has_permissions(view_audit_log=True)
+    @commands.guild_only()
+    @app_commands.describe(
+        since="How far back to search, e.g. 30m, 12h, 7d, 2w (default 7d)",
+        until="Ignore events newer than this long ago, e.g. 1d",
+        text="Words that must all appear in the event",
+    )
+    async def logsearch(self, ctx: commands.Context, user: discord.User = None,
+                        channel: discord.abc.GuildChannel = None, event: Literal[EVENT_TYPES] = None,
+                        since: str = "7d", until: str = None, *, text: str = None):
+        since_delta = parse_duration(since)
+        until_delta = parse_duration(until) if until else None
+        if since_delta is None or (until and until_delta is None):
+            await ctx.send("❌ Durations look like `30m`, `12h`, `7d` or `2w`.", ephemeral=True)
+            return
+
+        # Make buffered events visible to the reader pool; this commits only if the buffer held any.
+        # Events already flushed are at most one group-commit interval from being visible.
+        await self.archive.flush(durable=True)
+
+        now = discord.utils.utcnow()
+        results = await self.archive.search(
+            ctx.guild.id,
+            user_id=user.id if user else None,
+            channel_id=channel.id if channel else None,
+            event_type=event,
+            since=now - since_delta,
+            until=now - until_delta if until_delta else None,
+            text=text,
+            limit=LOG_SEARCH_LIMIT,
+        )
+
+        embed = discord.Embed(title="🔎 Log Search", color=discord.Color.blurple(), timestamp=now)
+        if not results:
+            embed.description = "No archived events match these filters."
+            await ctx.send(embed=embed, ephemeral=True)
+            return
+
+        for result in results[:LOG_SEARCH_EMBED_RESULTS]:
+            where = f" in <#{result.channel_id}>" if result.channel_id else ""
+            who = f"<@{result.user_id}>" if result.user_id else "—"
+            content = result.content if len(result.content) <= 200 else result.content[:197] + "..."
+            embed.add_field(
+                name=f"{result.event_type} · {discord.utils.format_dt(result.created_at, style='f')}",
+                value=f"{who}{where}\n{content or '*[No text]*'}",
+                inline=False,
+            )
+
+        files = []
+        if len(results) > LOG_SEARCH_EMBED_RESULTS:
+            lines = [
+                f"[{r.created_at:%Y-%m-%d %H:%M:%S}] {r.event_type} user={r.user_id} channel={r.channel_id}: {r.content}"
+                for r in results
+            ]
+            files.append(discord.File(io.BytesIO("\n".join(lines).encode("utf-8")), filename="logsearch.txt"))
+        embed.set_footer(text=f"{len(results)} match(es)" + (" (limit reached)" if len(results) == LOG_SEARCH_LIMIT else ""))
+        await ctx.send(embed=embed, files=files, ephemeral=True)
 
     async def _send_log(self, channel_id: int, embed: discord.Embed, files: list = None):
-        """Helper to send log to a specific channel if ID is set."""
+        """Helper to queue a log for a specific channel if ID is set (sent in batches)."""
         if not channel_id:
             return
 
@@ -36,39 +193,179 @@ class Logger(commands.Cog):
             self.logger.warning(f"Log channel with ID {cid} not found.")
             return
 
+        metrics.LOG_EVENTS.labels(str(cid)).inc()
+        if not files:
+            self.dispatcher.submit(channel, embed)
+            return
+
+        # Files are sent on their own; flush what is queued first to keep the order
+        await self.dispatcher.flush(cid)
         try:
-            await channel.send(embed=embed, files=files or [])
+            await channel.send(embed=embed, files=files)
+            metrics.MESSAGES_SENT.labels("logger", "ok").inc()
         except discord.errors.Forbidden:
             self.logger.warning(f"Missing permissions to send message in channel {channel.name} ({channel.id}).")
+            metrics.MESSAGES_SENT.labels("logger", "forbidden").inc()
         except Exception as e:
             self.logger.error(f"Could not send log to channel {channel.id}: {e}")
+            metrics.MESSAGES_SENT.labels("logger", "error").inc()
 
     # --- 1. MESSAGES & IMAGES ---
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None or message.author.bot:
+            return
+
+        # Compact copy so deletions of messages discord.py no longer caches can still be logged
+        self.message_cache.add(message)
+
+        # Keep a local copy of images so they can be rescued if the message is deleted
+        if self.attachment_cache and self.attachment_cache.should_cache(message):
+            await self.attachment_cache.store(message)
+
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
         if message.author.bot: return
-        
+
+        await self._log_deletion(message.id, getattr(message.guild, "id", None), message.channel.id,
+                                 message.channel.mention, message.author, message.content, message.attachments)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        record = self.message_cache.pop(payload.message_id)
+        if payload.cached_message is not None:
+            return  # Handled by on_message_delete
+
+        if record is not None:
+            author_id, channel_id = record.author_id, record.channel_id
+            content, attachments = record.content, record.attachments
+        else:
+            # Posted before the last restart: only the attachment cache (persisted) may still know it
+            cached = self.attachment_cache.get(payload.message_id) if self.attachment_cache else None
+            if cached is None:
+                return  # Never seen
+            (author_id, attachments), channel_id, content = cached, payload.channel_id, None
+
+        author = self._resolve_user(payload.guild_id, author_id) or discord.Object(author_id)
+        await self._log_deletion(payload.message_id, payload.guild_id, channel_id, f"<#{channel_id}>",
+                                 author, content, attachments)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        """Logs a bulk delete (e.g. /purge) as one summary with a transcript file."""
+        cached = {message.id: message for message in payload.cached_messages}
+        records = {record.id: record for record in self.message_cache.pop_many(payload.message_ids)}
+
+        lines, recorded = [], 0
+        for message_id in sorted(payload.message_ids):
+            if self.attachment_cache:
+                self.attachment_cache.discard(message_id)
+
+            message = cached.get(message_id)
+            if message is not None:
+                author_id, author = message.author.id, message.author
+                content, attachments = message.content, message.attachments
+            elif message_id in records:
+                record = records[message_id]
+                author_id = record.author_id
+                author = self._resolve_user(payload.guild_id, author_id) or "Unknown user"
+                content, attachments = record.content, record.attachments
+            else:
+                continue
+
+            recorded += 1
+            sent_at = discord.utils.snowflake_time(message_id).strftime("%Y-%m-%d %H:%M:%S")
+            lines.append(f"[{sent_at}] {author} ({author_id}): {content}")
+            for attachment in attachments:
+                lines.append(f"    [Attachment] {attachment.filename} {attachment.url}")
+
+        embed = discord.Embed(title="🧹 Bulk Delete", color=discord.Color.red(), timestamp=discord.utils.utcnow())
+        embed.description = (
+            f"**Channel:** <#{payload.channel_id}>\n"
+            f"**Messages:** {len(payload.message_ids)} ({recorded} with recorded content)"
+        )
+
+        self._archive("bulk_delete", payload.guild_id, channel_id=payload.channel_id,
+                      content=f"{len(payload.message_ids)} messages deleted\n" + "\n".join(lines))
+
+        files = None
+        if lines:
+            transcript = io.BytesIO("\n".join(lines).encode("utf-8"))
+            files = [discord.File(transcript, filename=f"bulk-delete-{payload.channel_id}.txt")]
+        await self._send_log(self.log_channel(payload.guild_id, "messages"), embed, files=files)
+
+    def _resolve_user(self, guild_id, user_id: int):
+        guild = self.bot.get_guild(guild_id) if guild_id else None
+        return (guild.get_member(user_id) if guild else None) or self.bot.get_user(user_id)
+
+    async def _log_deletion(self, message_id: int, guild_id, channel_id: int, channel_mention: str, author, content: str, attachments):
         embed = discord.Embed(title="🗑️ Message Deleted", color=discord.Color.red(), timestamp=discord.utils.utcnow())
-        embed.set_author(name=f"{message.author} ({message.author.id})", icon_url=message.author.display_avatar.url)
-        embed.description = f"**Channel:** {message.channel.mention}\n**Content:** {message.content or '*[No text]*'}"
-        embed.set_footer(text=f"Message ID: {message.id}")
+        if isinstance(author, discord.abc.User):
+            embed.set_author(name=f"{author} ({author.id})", icon_url=author.display_avatar.url)
+        else:
+            embed.set_author(name=f"Unknown user ({author.id})")
+        if content is None:
+            content_text = "*[Unknown: sent before the last restart]*"
+        else:
+            content_text = content or "*[No text]*"
+        embed.description = f"**Channel:** {channel_mention}\n**Content:** {content_text}"
+        embed.set_footer(text=f"Message ID: {message_id}")
+
+        filenames = " ".join(attachment.filename for attachment in attachments)
+        self._archive("message_delete", guild_id, author.id, channel_id, f"{content or ''}\n{filenames}".strip())
 
         files = []
         # Attempt to rescue images
-        if message.attachments:
-            embed.add_field(name="Attachments", value=f"{len(message.attachments)} file(s) found.", inline=False)
-            async with aiohttp.ClientSession() as session:
-                for attachment in message.attachments:
-                    if attachment.content_type and attachment.content_type.startswith('image/'):
-                        try:
-                            async with session.get(attachment.url) as resp:
-                                if resp.status == 200:
-                                    data = io.BytesIO(await resp.read())
-                                    files.append(discord.File(data, filename=attachment.filename))
-                        except Exception:
-                            pass # Image might be gone already
-
-        await self._send_log(self.log_channel_messages, embed, files=files)
+        if attachments:
+            embed.add_field(name="Attachments", value=f"{len(attachments)} file(s) found.", inline=False)
+            files = await self._rescue_images(message_id, channel_id, attachments)
+
+        await self._send_log(self.log_channel(guild_id, "messages"), embed, files=files)
+
+    async def _rescue_images(self, message_id: int, channel_id: int, attachments) -> list:
+        """
+        Collects the images of a deleted message, within the size cap.
+        Local cache copies are used first; the rest are downloaded concurrently
+        over the bot's shared session.
+        """
+        cached = self.attachment_cache.pop_files(message_id) if self.attachment_cache else {}
+
+        files, selected = [], []
+        budget = self.rescue_max_bytes
+        for attachment in attachments:
+            if not (attachment.content_type and attachment.content_type.startswith('image/')):
+                continue
+            if attachment.size > budget:
+                continue
+            budget -= attachment.size
+            if attachment.id in cached:
+                files.append(cached.pop(attachment.id))
+            else:
+                selected.append(attachment)
+
+        for file in cached.values():
+            file.close()  # Over the size cap
+        if self.attachment_cache and channel_id in self.attachment_cache.channel_ids:
+            self.attachment_cache.record(hits=len(files), misses=len(selected))
+
+        results = await asyncio.gather(*(self._download_image(a) for a in selected))
+        return files + [file for file in results if file is not None]
+
+    async def _download_image(self, attachment: discord.Attachment):
+        try:
+            async with self.bot.http_session.get(attachment.url, timeout=self.rescue_timeout) as resp:
+                if resp.status == 200:
+                    data = io.BytesIO(await resp.read())
+                    return discord.File(data, filename=attachment.filename)
+        except Exception:
+            pass # Image might be gone already (or the request timed out)
+        return None
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        # Keep the compact cache in step with edits
+        if payload.message is not None:
+            self.message_cache.update_content(payload.message_id, payload.message.content)
 
     @commands.Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message):
@@ -79,67 +376,118 @@ class Logger(commands.Cog):
         embed.description = f"**Channel:** {before.channel.mention} [Jump to Message]({before.jump_url})"
         embed.add_field(name="Before", value=before.content or "*[No text]*", inline=False)
         embed.add_field(name="After", value=after.content or "*[No text]*", inline=False)
-        
-        await self._send_log(self.log_channel_messages, embed)
+
+        self._archive("message_edit", getattr(before.guild, "id", None), before.author.id, before.channel.id,
+                      f"{before.content}\n{after.content}")
+
+        await self._send_log(self.log_channel(getattr(before.guild, "id", None), "messages"), embed)
 
     # --- 2. MEMBERS ---
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
+        self._archive("member_join", member.guild.id, member.id, content=str(member))
+        if self.join_flood.add(member):
+            return  # Logged with the rest of the batch
+
         embed = discord.Embed(title="📥 Member Joined", color=discord.Color.green(), timestamp=discord.utils.utcnow())
         embed.set_author(name=f"{member} ({member.id})", icon_url=member.display_avatar.url)
         embed.add_field(name="Account Created", value=discord.utils.format_dt(member.created_at, style='R'))
-        await self._send_log(self.log_channel_members, embed)
+        await self._send_log(self.log_channel(member.guild.id, "members"), embed)
+
+    async def _log_join_batch(self, guild: discord.Guild, members: list, rate: float):
+        embed = discord.Embed(title=f"📥 {len(members)} Members Joined", color=discord.Color.dark_green(),
+                              timestamp=discord.utils.utcnow())
+        lines, shown = [], 0
+        for member in members:
+            line = f"{member.mention} `{member}` · created {discord.utils.format_dt(member.created_at, style='R')}"
+            if shown and sum(len(l) + 1 for l in lines) + len(line) > 3900:
+                break
+            lines.append(line)
+            shown += 1
+        if shown < len(members):
+            lines.append(f"... and {len(members) - shown} more (see `/logsearch event:member_join`)")
+        embed.description = "\n".join(lines)
+        embed.add_field(name="Join Rate", value=f"{rate:.0f} joins/min")
+        newest = max(members, key=lambda m: m.created_at)
+        embed.add_field(name="Newest Account", value=f"{newest.mention} ({discord.utils.format_dt(newest.created_at, style='R')})")
+        embed.set_footer(text=f"Join flood: joins are logged together every {self.join_flood.window:.0f}s")
+        await self._send_log(self.log_channel(guild.id, "members"), embed)
+
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        # Index kicks/bans/prunes so member removals can be classified without an API call
+        self.audit_index.add(entry)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
-        # Check Audit Logs to see if this was a Kick
-        is_kick = False
-        executor = None
-        reason = None
-
-        if member.guild.me.guild_permissions.view_audit_log:
-            async for entry in member.guild.audit_logs(limit=1, action=discord.AuditLogAction.kick):
-                if entry.target.id == member.id:
-                    if (discord.utils.utcnow() - entry.created_at).total_seconds() < 5:
-                        is_kick = True
-                        executor = entry.user
-                        reason = entry.reason
-                        break
-
-        if is_kick:
+        # Check Audit Logs to see if this was a Kick (or a ban/prune)
+        record = await self._find_removal_record(member)
+
+        if record and record.action is discord.AuditLogAction.ban:
+            return  # Logged by on_member_ban
+
+        if record and record.action is discord.AuditLogAction.kick:
             embed = discord.Embed(title="🥾 Member Kicked", color=discord.Color.orange(), timestamp=discord.utils.utcnow())
             embed.set_author(name=f"{member} ({member.id})", icon_url=member.display_avatar.url)
-            embed.add_field(name="Kicked By", value=executor.mention, inline=True)
-            embed.add_field(name="Reason", value=reason or "No reason provided", inline=False)
-            await self._send_log(self.log_channel_moderation, embed)
+            embed.add_field(name="Kicked By", value=f"<@{record.user_id}>", inline=True)
+            embed.add_field(name="Reason", value=record.reason or "No reason provided", inline=False)
+            self._archive("member_kick", member.guild.id, member.id,
+                          content=f"{member} kicked by {record.user_id}: {record.reason or ''}".strip())
+            await self._send_log(self.log_channel(member.guild.id, "moderation"), embed)
+        elif record and record.action is discord.AuditLogAction.member_prune:
+            embed = discord.Embed(title="✂️ Member Pruned", color=discord.Color.orange(), timestamp=discord.utils.utcnow())
+            embed.set_author(name=f"{member} ({member.id})", icon_url=member.display_avatar.url)
+            embed.add_field(name="Pruned By", value=f"<@{record.user_id}>", inline=True)
+            self._archive("member_prune", member.guild.id, member.id, content=f"{member} pruned by {record.user_id}")
+            await self._send_log(self.log_channel(member.guild.id, "moderation"), embed)
         else:
             embed = discord.Embed(title="📤 Member Left", color=discord.Color.dark_grey(), timestamp=discord.utils.utcnow())
             embed.set_author(name=f"{member} ({member.id})", icon_url=member.display_avatar.url)
-            await self._send_log(self.log_channel_members, embed)
+            self._archive("member_leave", member.guild.id, member.id, content=str(member))
+            await self._send_log(self.log_channel(member.guild.id, "members"), embed)
+
+    async def _find_removal_record(self, member: discord.Member):
+        """Finds the kick/ban/prune audit entry for a removed member, if any."""
+        if not member.guild.me.guild_permissions.view_audit_log:
+            return None
+
+        if self.bot.intents.moderation:
+            # The audit log event can arrive shortly after the removal event
+            return await self.audit_index.wait_for(member.guild.id, member.id, timeout=self.audit_wait_timeout)
+
+        # Fallback without the gateway event: one REST call
+        async for entry in member.guild.audit_logs(limit=1, action=discord.AuditLogAction.kick):
+            if entry.target.id == member.id and (discord.utils.utcnow() - entry.created_at).total_seconds() < 5:
+                return AuditRecord(entry.action, entry.user_id, entry.reason, 0.0)
+        return None
 
     # --- 3. MODERATION (Bans) ---
     @commands.Cog.listener()
     async def on_member_ban(self, guild: discord.Guild, user: discord.User):
         embed = discord.Embed(title="🔨 Member Banned", color=discord.Color.dark_red(), timestamp=discord.utils.utcnow())
         embed.set_author(name=f"{user} ({user.id})", icon_url=user.display_avatar.url)
-        await self._send_log(self.log_channel_moderation, embed)
+        self._archive("member_ban", guild.id, user.id, content=str(user))
+        await self._send_log(self.log_channel(guild.id, "moderation"), embed)
 
     @commands.Cog.listener()
     async def on_member_unban(self, guild: discord.Guild, user: discord.User):
         embed = discord.Embed(title="🔓 Member Unbanned", color=discord.Color.green(), timestamp=discord.utils.utcnow())
         embed.set_author(name=f"{user} ({user.id})", icon_url=user.display_avatar.url)
-        await self._send_log(self.log_channel_moderation, embed)
+        self._archive("member_unban", guild.id, user.id, content=str(user))
+        await self._send_log(self.log_channel(guild.id, "moderation"), embed)
 
     # --- 4. SERVER (Roles, Channels, Emojis) ---
     @commands.Cog.listener()
     async def on_guild_role_create(self, role: discord.Role):
         embed = discord.Embed(title="🛡️ Role Created", description=role.name, color=discord.Color.blue(), timestamp=discord.utils.utcnow())
-        await self._send_log(self.log_channel_server, embed)
+        self._archive("role_create", role.guild.id, content=role.name)
+        await self._send_log(self.log_channel(role.guild.id, "server"), embed)
 
     @commands.Cog.listener()
     async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
         embed = discord.Embed(title="📺 Channel Created", description=channel.name, color=discord.Color.blue(), timestamp=discord.utils.utcnow())
-        await self._send_log(self.log_channel_server, embed)
+        self._archive("channel_create", channel.guild.id, channel_id=channel.id, content=channel.name)
+        await self._send_log(self.log_channel(channel.guild.id, "server"), embed)
 
     @commands.Cog.listener()
     async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
@@ -159,13 +507,15 @@ class Logger(commands.Cog):
         )
         
         embed.set_footer(text=f"ID: {after.id} • {discord.utils.format_dt(discord.utils.utcnow(), style='R')}")
+        self._archive("channel_update", after.guild.id, channel_id=after.id, content=f"#{before.name} -> #{after.name}")
 
-        await self._send_log(self.log_channel_server, embed)
+        await self._send_log(self.log_channel(after.guild.id, "server"), embed)
 
     @commands.Cog.listener()
     async def on_guild_emojis_update(self, guild, before, after):
         embed = discord.Embed(title="😀 Emojis Updated", description=f"Total Emojis: {len(after)}", color=discord.Color.blue(), timestamp=discord.utils.utcnow())
-        await self._send_log(self.log_channel_server, embed)
+        self._archive("emojis_update", guild.id, content=f"Total Emojis: {len(after)}")
+        await self._send_log(self.log_channel(guild.id, "server"), embed)
 
     # --- 5. VOICE ---
     @commands.Cog.listener()
@@ -185,7 +535,9 @@ class Logger(commands.Cog):
             embed.title = "🔄 Moved Voice"
             embed.description = f"Moved from **{before.channel.name}** to **{after.channel.name}**"
 
-        await self._send_log(self.log_channel_voice, embed)
+        self._archive("voice", member.guild.id, member.id, (after.channel or before.channel).id,
+                      f"{embed.title.split(' ', 1)[1]}: {embed.description.replace('**', '')}")
+        await self._send_log(self.log_channel(member.guild.id, "voice"), embed)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Logger(bot))
\ No newline at end of file
@@ -1,88 +1,613 @@
 import asyncio
+import datetime
+import functools
 import logging
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 import config
+import metrics
+from attachments import AttachmentPipeline, StagedAttachment
+from guild_settings import MIRROR_MAPPINGS
+
+WEBHOOK_NAME = "Mirror"
+
+
+class MirrorRoute(NamedTuple):
+    """A single source -> target edge of the mirror routing table."""
+    target_channel_id: int
+    author_id: Optional[int] = None  # Only mirror this author if set
+    delivery: str = "channel"  # "channel" (bot sends) or "webhook"
+
+
+class MirrorLink(NamedTuple):
+    """Where a source message was mirrored to."""
+    target_channel_id: int
+    mirror_message_id: int
+    delivery: str
+    webhook_id: Optional[int] = None  # Webhook that sent the copy (only it can edit the copy)
+    linked: str = ""  # Space-separated IDs of attachments posted as links instead of files
+
+
+def build_routes(mappings) -> Mapping[int, tuple[MirrorRoute, ...]]:
+    """
+    Builds an immutable source channel ID -> routes index from mirror mappings.
+    A source channel may appear in several mappings; each one adds a target (fan-out).
+    """
+    default_delivery = getattr(config, "MIRROR_DELIVERY", "channel")
+    table: dict[int, list[MirrorRoute]] = {}
+    for mapping in mappings or []:
+        source_channel_id = mapping.get("SOURCE_CHANNEL_ID")
+        target_channel_id = mapping.get("TARGET_CHANNEL_ID")
+        if not source_channel_id or not target_channel_id:
+            continue  # Skip incomplete mappings
+
+        route = MirrorRoute(int(target_channel_id), mapping.get("BOT_TO_MIRROR_ID"), mapping.get("DELIVERY", default_delivery))
+        routes = table.setdefault(int(source_channel_id), [])
+        if route not in routes:
+            routes.append(route)
+
+    return MappingProxyType({source: tuple(routes) for source, routes in table.items()})
+
+
+class MirrorPayload:
+    """A rendered source message, shared by every target it is delivered to."""
+    __slots__ = ("message", "content", "embeds", "staged", "linked", "_refs")
+
+    def __init__(self, message: discord.Message, content: str, embeds: list, staged: list[StagedAttachment], refs: int,
+                 linked: str = ""):
+        self.message = message
+        self.content = content
+        self.embeds = embeds
+        self.staged = staged
+        self.linked = linked
+        self._refs = refs
+
+    def files(self) -> list[discord.File]:
+        """Fresh file objects for one upload (discord.py closes them after sending)."""
+        return [attachment.to_file() for attachment in self.staged]
+
+    def release(self):
+        """Called once per target; the staged files are removed after the last delivery."""
+        self._refs -= 1
+        if self._refs <= 0:
+            for attachment in self.staged:
+                attachment.cleanup()
+
+
+class TargetSender:
+    """
+    Send queue and worker for one target channel, so a slow or rate-limited
+    target never delays the listener or the other mappings.
+    """
+
+    def __init__(self, cog: "Mirror", channel, max_size: int):
+        self.cog = cog
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.task = asyncio.create_task(self._run())
+
+    def submit(self, job) -> bool:
+        """Queues a zero-argument coroutine function; returns False if the queue is full."""
+        try:
+            self.queue.put_nowait(job)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _run(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await job()
+            except Exception as e:
+                self.cog.logger.error(f"Mirror job for channel {self.channel.id} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def close(self):
+        """Stops the worker and releases the payloads of jobs that never ran (their staged files)."""
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        while not self.queue.empty():
+            job = self.queue.get_nowait()
+            self.queue.task_done()
+            for arg in getattr(job, "args", ()):
+                if isinstance(arg, MirrorPayload):
+                    arg.release()
 
 
 class Mirror(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.logger = logging.getLogger("bot.cogs.mirror")
+        self.routes = build_routes([])  # Filled from the settings store in cog_load
+
+        # Messages that arrived empty, waiting for their embed edit (message ID -> Future)
+        self._pending: dict[int, asyncio.Future] = {}
+        self.embed_wait_timeout = 10.0
+        # How pending messages were resolved: by edit event or by fallback fetch
+        self.wait_stats = {"event": 0, "fallback": 0}
+
+        # Attachments are downloaded once per source message and reused for every target
+        self.attachments = AttachmentPipeline(
+            max_concurrency=getattr(config, "MIRROR_ATTACHMENT_CONCURRENCY", 4),
+            max_bytes_per_message=getattr(config, "MIRROR_ATTACHMENT_BUDGET", 25 * 1024 * 1024),
+            spool_threshold=getattr(config, "MIRROR_ATTACHMENT_SPOOL_THRESHOLD", 2 * 1024 * 1024),
+            session=getattr(bot, "http_session", None),
+        )
+
+        # One send queue per target channel (channel ID -> sender)
+        self._senders: dict[int, TargetSender] = {}
+        self.queue_size = getattr(config, "MIRROR_QUEUE_SIZE", 100)
+        # Webhooks used for "webhook" delivery (channel ID -> webhook), persisted in SQLite
+        self._webhooks: dict[int, discord.Webhook] = {}
+        # Their IDs, so on_message can ignore the mirror's own webhook messages in constant time
+        self._webhook_ids: set[int] = set()
+
+        # Source message -> mirrored copies, used to propagate edits and deletes.
+        # Recent links live in an LRU (source ID -> {target channel ID -> MirrorLink});
+        # new/removed links are written to SQLite in batches by the flush loop.
+        self._links: OrderedDict[int, dict[int, MirrorLink]] = OrderedDict()
+        self.link_cache_size = getattr(config, "MIRROR_LINK_CACHE_SIZE", 1000)
+        self.link_retention_days = getattr(config, "MIRROR_LINK_RETENTION_DAYS", 14)
+        self._link_inserts: list[tuple] = []
+        self._link_deletes: list[tuple] = []
+
+    async def cog_load(self):
+        self.rebuild_routes()
+        await self.bot.db.execute(
+            "CREATE TABLE IF NOT EXISTS mirror_webhooks ("
+            "channel_id INTEGER PRIMARY KEY, webhook_id INTEGER NOT NULL, webhook_token TEXT NOT NULL)"
+        )
+        for row in await self.bot.db.fetchall("SELECT channel_id, webhook_id, webhook_token FROM mirror_webhooks"):
+            self._webhooks[row["channel_id"]] = discord.Webhook.partial(row["webhook_id"], row["webhook_token"], client=self.bot)
+            self._webhook_ids.add(row["webhook_id"])
+        self.logger.info(f"Loaded {len(self._webhooks)} cached mirror webhook(s).")
+
+        # The primary key leads with source_message_id, so it doubles as the source ID index.
+        # Message IDs are snowflakes (time-ordered), which is what pruning relies on.
+        await self.bot.db.execute(
+            "CREATE TABLE IF NOT EXISTS mirror_messages ("
+            "source_message_id INTEGER NOT NULL, target_channel_id INTEGER NOT NULL, "
+            "mirror_message_id INTEGER NOT NULL, delivery TEXT NOT NULL, "
+            "webhook_id INTEGER, linked TEXT NOT NULL DEFAULT '', "
+            "PRIMARY KEY (source_message_id, target_channel_id)) WITHOUT ROWID"
+        )
+        # Tables created before webhook_id/linked existed
+        columns = {row["name"] for row in await self.bot.db.fetchall("PRAGMA table_info(mirror_messages)")}
+        if "webhook_id" not in columns:
+            await self.bot.db.execute("ALTER TABLE mirror_messages ADD COLUMN webhook_id INTEGER")
+        if "linked" not in columns:
+            await self.bot.db.execute("ALTER TABLE mirror_messages ADD COLUMN linked TEXT NOT NULL DEFAULT ''")
+        self.flush_links.start()
+        self.prune_links.start()
+        metrics.QUEUE_DEPTH.labels("mirror").set_function(self.queue_depth)
+
+    async def cog_unload(self):
+        metrics.QUEUE_DEPTH.remove("mirror")
+
+        # Give queued mirrors a moment to go out, then stop the workers
+        try:
+            await asyncio.wait_for(self.join_queues(), timeout=5)
+        except asyncio.TimeoutError:
+            self.logger.warning("Mirror queues not drained before unload; dropping pending sends.")
+        await asyncio.gather(*(sender.close() for sender in self._senders.values()))
+        self._senders.clear()
+        await self.attachments.close()
+
+        self.flush_links.cancel()
+        self.prune_links.cancel()
+        await self._flush_links()
+
+    def queue_depth(self) -> int:
+        """Mirrors waiting to be sent, across all target channels."""
+        return sum(sender.queue.qsize() for sender in self._senders.values())
+
+    async def join_queues(self):
+        """Waits until every queued mirror has been delivered."""
+        await asyncio.gather(*(sender.queue.join() for sender in list(self._senders.values())))
+
+    def rebuild_routes(self, mappings=None):
+        """
+        Rebuilds the routing table and swaps it in place (no cog reload needed).
+        Defaults to every guild's mirror_mappings setting.
+        """
+        if mappings is None:
+            mappings = [mapping for guild_mappings in self.bot.settings.values(MIRROR_MAPPINGS).values()
+                        for mapping in guild_mappings]
+        self.routes = build_routes(mappings)
+        self.logger.info(f"Mirror routes rebuilt: {len(self.routes)} source channel(s).")
+        return self.routes
+
+    @commands.Cog.listener()
+    async def on_guild_settings_update(self, guild_id: int, key: str, value):
+        if key == MIRROR_MAPPINGS:
+            self.rebuild_routes()
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """
         This event is triggered when a message is sent in a channel the bot can see.
         """
-        # Ignore messages from the bot itself
-        if message.author == self.bot.user:
+        # Ignore messages from the bot itself, including its own mirror webhooks (no chained or cyclic mirrors)
+        if message.author == self.bot.user or self._is_mirror_webhook(message.webhook_id):
+            return
+
+        # Constant-time lookup of the routes for this source channel
+        routes = self.routes.get(message.channel.id)
+        if not routes:
+            return
+
+        targets = []
+        for route in routes:
+            if route.author_id is not None and route.author_id != message.author.id:
+                continue  # Mapping is restricted to another author
+
+            target_channel = self.bot.get_channel(route.target_channel_id)
+            if not target_channel:
+                continue  # Skip if the target channel is not found
+            targets.append((target_channel, route))
+
+        if not targets:
+            return
+
+        self.logger.info(f"Detected target match. MsgID: {message.id}. Initial Content: '{message.content}', Embeds: {len(message.embeds)}, Attachments: {len(message.attachments)}")
+
+        message = await self._wait_for_content(message)
+        if message is None:
+            return
+
+        staged, skipped = await self.attachments.stage(message.attachments)
+        payload = self._render(message, staged, skipped, refs=len(targets))
+        if payload is None:
+            return
+
+        # Hand off to the per-target queues; delivery happens in the workers
+        for target_channel, route in targets:
+            job = functools.partial(self._deliver, target_channel, payload, route.delivery)
+            if not self._sender_for(target_channel).submit(job):
+                self.logger.warning(f"Mirror queue for {target_channel.name} is full; dropping message {message.id}.")
+                payload.release()
+
+    def _is_mirror_webhook(self, webhook_id: Optional[int]) -> bool:
+        return webhook_id in self._webhook_ids
+
+    @staticmethod
+    def _has_content(message: discord.Message) -> bool:
+        return bool(message.content or message.embeds or message.attachments or message.stickers)
+
+    async def _wait_for_content(self, message: discord.Message) -> Optional[discord.Message]:
+        """
+        Waits for a message that appears empty to be filled in (handles delayed edits/unfurls).
+        The message is registered as pending and completed by the edit event; a single
+        fetch is only done as a fallback once the timeout expires.
+        """
+        if self._has_content(message):
+            return message
+
+        self.logger.info(f"Message {message.id} empty. Waiting up to {self.embed_wait_timeout}s for an edit...")
+        future = self._pending.get(message.id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[message.id] = future
+
+        try:
+            resolved = await asyncio.wait_for(asyncio.shield(future), timeout=self.embed_wait_timeout)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            if resolved is None:
+                self.logger.warning(f"Message {message.id} deleted before mirroring.")
+                return None
+            self.wait_stats["event"] += 1
+            return resolved
+        finally:
+            self._pending.pop(message.id, None)
+
+        # Fallback: one fetch in case the edit event was missed
+        try:
+            message = await message.channel.fetch_message(message.id)
+        except discord.NotFound:
+            self.logger.warning(f"Message {message.id} deleted before mirroring.")
+            return None
+        self.wait_stats["fallback"] += 1
+        self.logger.info(f"Fallback fetch: Content='{message.content}', Embeds={len(message.embeds)}")
+        return message
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """
+        Completes a pending mirror as soon as the late embed/unfurl lands,
+        otherwise propagates the edit to the mirrored copies.
+        """
+        message = payload.message
+        future = self._pending.get(payload.message_id)
+        if future is not None:
+            if not future.done() and message is not None and self._has_content(message):
+                future.set_result(message)
+            return
+
+        if message is None or payload.channel_id not in self.routes:
+            return
+        before = payload.cached_message
+        if before is not None and before.content == message.content and before.embeds == message.embeds:
+            return  # Nothing visible changed (e.g. pin or flag update)
+
+        self._submit_to_targets(payload.channel_id, payload.message_id, self._propagate_edit, message,
+                                author_id=message.author.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Stops waiting on a pending message that was deleted, and deletes its copies."""
+        future = self._pending.get(payload.message_id)
+        if future is not None:
+            if not future.done():
+                future.set_result(None)
+            return
+
+        if payload.channel_id in self.routes:
+            author_id = payload.cached_message.author.id if payload.cached_message is not None else None
+            self._submit_to_targets(payload.channel_id, payload.message_id, self._propagate_delete, payload.message_id,
+                                    author_id=author_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        if payload.channel_id not in self.routes:
+            return
+        for message_id in payload.message_ids:
+            self._submit_to_targets(payload.channel_id, message_id, self._propagate_delete, message_id)
+
+    def _render(self, message: discord.Message, staged: list[StagedAttachment],
+                skipped: list[discord.Attachment], refs: int) -> Optional[MirrorPayload]:
+        """Builds the payload sent to every target, or None if there is nothing to send."""
+        # Replicate embeds
+        new_embeds = [embed.copy() for embed in message.embeds]
+        if new_embeds:
+            self.logger.info(f"Embed Data: {[e.to_dict() for e in message.embeds]}")
+
+        content_to_send = self._compose_content(message, skipped, has_files=bool(staged))
+
+        # Check if there is any content to send to avoid HTTP 400 (Empty Message)
+        if not content_to_send and not new_embeds and not staged:
+            self.logger.warning(f"Skipping empty message {message.id} from {message.author} in {message.channel}. Type: {message.type}")
+            self.logger.warning(f"Debug: content='{content_to_send}', embeds={len(new_embeds)}, files={len(staged)}")
+            return None
+
+        linked = " ".join(str(attachment.id) for attachment in skipped)
+        return MirrorPayload(message, content_to_send, new_embeds, staged, refs, linked)
+
+    @staticmethod
+    def _compose_content(message: discord.Message, skipped: list[discord.Attachment], has_files: bool) -> str:
+        """The text of a copy: the message content, links to attachments that were not uploaded, or a sticker note."""
+        # Attachments come from the staged copies; link the ones that could not be staged
+        content_to_send = message.content
+        if skipped:
+            links = "\n".join(attachment.url for attachment in skipped)
+            content_to_send = f"{content_to_send}\n{links}" if content_to_send else links
+
+        # Handle Stickers (fallback text if only stickers are present)
+        if not content_to_send and not message.embeds and not has_files and message.stickers:
+            sticker_names = ", ".join([s.name for s in message.stickers])
+            content_to_send = f"**[Sticker(s): {sticker_names}]**"
+        return content_to_send
+
+    def _sender_for(self, target_channel) -> TargetSender:
+        sender = self._senders.get(target_channel.id)
+        if sender is None or sender.task.done():
+            sender = TargetSender(self, target_channel, self.queue_size)
+            self._senders[target_channel.id] = sender
+        return sender
+
+    async def _deliver(self, target_channel, payload: MirrorPayload, delivery: str):
+        """Sends the payload to one target channel (runs in that target's worker)."""
+        message = payload.message
+        webhook_id = None
+        try:
+            if delivery == "webhook":
+                sent, webhook_id = await self._send_webhook(target_channel, payload)
+            else:
+                sent = await target_channel.send(
+                    content=payload.content,
+                    embeds=payload.embeds,
+                    files=payload.files(),
+                )
+            self.logger.info(f"Mirrored message {message.id} from {message.author} to {target_channel.name}.")
+            metrics.MESSAGES_SENT.labels("mirror", "ok").inc()
+        except Exception as e:
+            self.logger.error(f"Failed to mirror message {message.id}: {e}")
+            metrics.MESSAGES_SENT.labels("mirror", "forbidden" if isinstance(e, discord.Forbidden) else "error").inc()
+        else:
+            if sent is not None:
+                self._remember_link(message.id, MirrorLink(target_channel.id, sent.id, delivery, webhook_id, payload.linked))
+        finally:
+            payload.release()
+
+    async def _send_webhook(self, target_channel, payload: MirrorPayload):
+        """Sends through the channel's webhook; returns (sent message, webhook ID)."""
+        author = payload.message.author
+        for attempt in range(2):
+            webhook = await self._get_webhook(target_channel)
+            try:
+                sent = await webhook.send(
+                    content=payload.content,
+                    embeds=payload.embeds,
+                    files=payload.files(),
+                    username=author.display_name,
+                    avatar_url=author.display_avatar.url,
+                    wait=True,
+                )
+                return sent, webhook.id
+            except discord.NotFound:
+                # Webhook was deleted in Discord; forget it and create a new one once
+                await self._forget_webhook(target_channel.id)
+                if attempt:
+                    raise
+
+    async def _get_webhook(self, target_channel) -> discord.Webhook:
+        webhook = self._webhooks.get(target_channel.id)
+        if webhook is not None:
+            return webhook
+
+        # Reuse a webhook this bot created earlier, otherwise create one
+        existing = await target_channel.webhooks()
+        webhook = discord.utils.find(lambda w: w.user == self.bot.user and w.token, existing)
+        if webhook is None:
+            webhook = await target_channel.create_webhook(name=WEBHOOK_NAME, reason="Mirror delivery")
+
+        await self.bot.db.execute(
+            "INSERT OR REPLACE INTO mirror_webhooks (channel_id, webhook_id, webhook_token) VALUES (?, ?, ?)",
+            target_channel.id, webhook.id, webhook.token,
+        )
+        self._webhooks[target_channel.id] = webhook
+        self._webhook_ids.add(webhook.id)
+        self.logger.info(f"Cached mirror webhook {webhook.id} for channel {target_channel.id}.")
+        return webhook
+
+    async def _forget_webhook(self, channel_id: int):
+        webhook = self._webhooks.pop(channel_id, None)
+        if webhook is not None:
+            self._webhook_ids.discard(webhook.id)
+        await self.bot.db.execute("DELETE FROM mirror_webhooks WHERE channel_id = ?", channel_id)
+
+    # --- Edit/delete propagation ---
+
+    def _submit_to_targets(self, source_channel_id: int, source_message_id: int, handler, *args,
+                           author_id: Optional[int] = None):
+        """
+        Queues handler(target_channel, *args) on every target the source message may have been
+        mirrored to, behind its pending sends. Routes restricted to another author are skipped
+        (when the author is known), and so are messages older than the link retention window.
+        """
+        cutoff = discord.utils.utcnow() - datetime.timedelta(days=self.link_retention_days)
+        if discord.utils.snowflake_time(source_message_id) < cutoff:
+            return
+        for route in self.routes.get(source_channel_id, ()):
+            if route.author_id is not None and author_id is not None and route.author_id != author_id:
+                continue
+            target_channel = self.bot.get_channel(route.target_channel_id)
+            if target_channel is None:
+                continue
+            if not self._sender_for(target_channel).submit(functools.partial(handler, target_channel, *args)):
+                self.logger.warning(f"Mirror queue for {target_channel.name} is full; dropping update.")
+
+    def _remember_link(self, source_message_id: int, link: MirrorLink):
+        self._cache_links(source_message_id)[link.target_channel_id] = link
+        self._link_inserts.append((source_message_id, *link))
+
+    def _cache_links(self, source_message_id: int, links: Optional[dict] = None) -> dict[int, MirrorLink]:
+        """Returns (creating if needed) the LRU entry for a source message."""
+        entry = self._links.get(source_message_id)
+        if entry is None:
+            entry = self._links[source_message_id] = links or {}
+            while len(self._links) > self.link_cache_size:
+                self._links.popitem(last=False)
+        else:
+            self._links.move_to_end(source_message_id)
+        return entry
+
+    async def _get_link(self, source_message_id: int, target_channel_id: int) -> Optional[MirrorLink]:
+        """Finds the copy of a source message in a target channel (LRU first, then SQLite)."""
+        if source_message_id not in self._links:
+            rows = await self.bot.db.fetchall(
+                "SELECT target_channel_id, mirror_message_id, delivery, webhook_id, linked "
+                "FROM mirror_messages WHERE source_message_id = ?",
+                source_message_id,
+            )
+            # Misses are cached too (as an empty entry), so repeated edits of an unmirrored message stay in memory
+            self._cache_links(source_message_id, {row["target_channel_id"]: MirrorLink(*row) for row in rows})
+        return self._cache_links(source_message_id).get(target_channel_id)
+
+    def _link_webhook(self, target_channel, link: MirrorLink) -> Optional[discord.Webhook]:
+        """The cached webhook that sent a copy, or None if it has been replaced since (it cannot be edited then)."""
+        webhook = self._webhooks.get(target_channel.id)
+        if webhook is None or (link.webhook_id is not None and webhook.id != link.webhook_id):
+            return None
+        return webhook
+
+    async def _propagate_edit(self, target_channel, message: discord.Message):
+        link = await self._get_link(message.id, target_channel.id)
+        if link is None:
             return
 
-        # Iterate through all configured mirror mappings
-        for mapping in getattr(config, "MIRROR_MAPPINGS", []):
-            source_channel_id = mapping.get("SOURCE_CHANNEL_ID")
-
-            # Check if the message matches the current mapping's source channel
-            if message.channel.id == source_channel_id:
-                target_channel_id = mapping.get("TARGET_CHANNEL_ID")
-                if not target_channel_id:
-                    continue  # Skip if no target is defined for this mapping
-
-                target_channel = self.bot.get_channel(target_channel_id)
-                if not target_channel:
-                    continue  # Skip if the target channel is not found
-
-                self.logger.info(f"Detected target match. MsgID: {message.id}. Initial Content: '{message.content}', Embeds: {len(message.embeds)}, Attachments: {len(message.attachments)}")
-
-                # Wait a moment if the message appears empty (handles delayed edits/unfurls)
-                if not message.content and not message.embeds and not message.attachments and not message.stickers:
-                    self.logger.info("Message empty. Entering retry loop...")
-                    # Retry loop: Some bots edit in the embed after a few seconds
-                    for _ in range(5):  # Wait up to 10 seconds
-                        await asyncio.sleep(2)
-                        try:
-                            message = await message.channel.fetch_message(message.id)
-                            self.logger.info(f"Retry {_ + 1}: Content='{message.content}', Embeds={len(message.embeds)}")
-                        except discord.NotFound:
-                            self.logger.warning(f"Message {message.id} deleted before mirroring.")
-                            return
-                        
-                        if message.content or message.embeds or message.attachments or message.stickers:
-                            break
-
-                # Replicate embeds
-                new_embeds = [embed.copy() for embed in message.embeds]
-                if new_embeds:
-                    self.logger.info(f"Embed Data: {[e.to_dict() for e in new_embeds]}")
-
-                # Replicate attachments
-                files = [await attachment.to_file() for attachment in message.attachments]
-
-                # Handle Stickers (fallback text if only stickers are present)
-                content_to_send = message.content
-                if not content_to_send and not new_embeds and not files and message.stickers:
-                    sticker_names = ", ".join([s.name for s in message.stickers])
-                    content_to_send = f"**[Sticker(s): {sticker_names}]**"
-
-                # Check if there is any content to send to avoid HTTP 400 (Empty Message)
-                if not content_to_send and not new_embeds and not files:
-                    self.logger.warning(f"Skipping empty message {message.id} from {message.author} in {message.channel}. Type: {message.type}")
-                    self.logger.warning(f"Debug: content='{content_to_send}', embeds={len(new_embeds)}, files={len(files)}")
+        # Same text as the original send: attachments that were linked stay linked
+        linked_ids = {int(attachment_id) for attachment_id in link.linked.split()}
+        skipped = [attachment for attachment in message.attachments if attachment.id in linked_ids]
+        content = self._compose_content(message, skipped, has_files=len(message.attachments) > len(skipped)) or None
+        embeds = [embed.copy() for embed in message.embeds]
+        try:
+            if link.delivery == "webhook":
+                webhook = self._link_webhook(target_channel, link)
+                if webhook is None:
+                    self.logger.warning(f"Webhook of the copy of message {message.id} in {target_channel.name} "
+                                        f"was replaced; not propagating the edit.")
                     return
+                await webhook.edit_message(link.mirror_message_id, content=content, embeds=embeds)
+            else:
+                await target_channel.get_partial_message(link.mirror_message_id).edit(content=content, embeds=embeds)
+            self.logger.info(f"Propagated edit of message {message.id} to {target_channel.name}.")
+        except discord.NotFound:
+            self._forget_link(message.id, target_channel.id)  # Copy was deleted by hand
+        except Exception as e:
+            self.logger.error(f"Failed to propagate edit of message {message.id}: {e}")
+
+    async def _propagate_delete(self, target_channel, source_message_id: int):
+        link = await self._get_link(source_message_id, target_channel.id)
+        if link is None:
+            return
+
+        try:
+            webhook = self._link_webhook(target_channel, link) if link.delivery == "webhook" else None
+            if webhook is not None:
+                await webhook.delete_message(link.mirror_message_id)
+            else:
+                # Channel copies, or webhook copies whose webhook was replaced (needs Manage Messages)
+                await target_channel.get_partial_message(link.mirror_message_id).delete()
+            self.logger.info(f"Propagated delete of message {source_message_id} to {target_channel.name}.")
+        except discord.NotFound:
+            pass  # Copy already gone
+        except Exception as e:
+            self.logger.error(f"Failed to propagate delete of message {source_message_id}: {e}")
+            return
+
+        self._forget_link(source_message_id, target_channel.id)
+
+    def _forget_link(self, source_message_id: int, target_channel_id: int):
+        links = self._links.get(source_message_id)
+        if links is not None:
+            links.pop(target_channel_id, None)
+        self._link_deletes.append((source_message_id, target_channel_id))
+
+    async def _flush_links(self):
+        """Writes buffered link inserts/deletes in one batch each."""
+        inserts, self._link_inserts = self._link_inserts, []
+        deletes, self._link_deletes = self._link_deletes, []
+        if inserts:
+            await self.bot.db.executemany(
+                "INSERT OR REPLACE INTO mirror_messages "
+                "(source_message_id, target_channel_id, mirror_message_id, delivery, webhook_id, linked) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                inserts,
+            )
+        if deletes:
+            await self.bot.db.executemany(
+                "DELETE FROM mirror_messages WHERE source_message_id = ? AND target_channel_id = ?",
+                deletes,
+            )
+
+    @tasks.loop(seconds=5)
+    async def flush_links(self):
+        await self._flush_links()
 
-                # Send the replicated message and stop checking other mappings
-                try:
-                    await target_channel.send(
-                        content=content_to_send,
-                        embeds=new_embeds,
-                        files=files,
-                    )
-                    self.logger.info(f"Mirrored message {message.id} from {message.author} to {target_channel.name}.")
-                except Exception as e:
-                    self.logger.error(f"Failed to mirror message {message.id}: {e}")
-                return
+    @tasks.loop(hours=1)
+    async def prune_links(self):
+        """Drops links older than the retention window (message IDs are time-ordered snowflakes)."""
+        cutoff = discord.utils.utcnow() - datetime.timedelta(days=self.link_retention_days)
+        await self.bot.db.execute("DELETE FROM mirror_messages WHERE source_message_id < ?", discord.utils.time_snowflake(cutoff))
 
 
 async def setup(bot: commands.Bot):
@@ -1,9 +1,114 @@
+import asyncio
+import datetime
+import logging
+import weakref
+from collections import OrderedDict
+
 import discord
 from discord.ext import commands
 
+import config
+import mass_moderation
+
+
+class WarningsView(discord.ui.View):
+    """Previous/Next pager over a member's warnings, fetching one page per click."""
+
+    def __init__(self, cog: "Moderation", author_id: int, guild_id: int, member: discord.abc.User, total: int):
+        super().__init__(timeout=120)
+        self.cog = cog
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.member = member
+        self.total = total
+        self.page = 0
+        # Keyset cursor each page was loaded with: (created_at, id) of the row before it
+        self._cursors: list = [None]
+        self._next_cursor = None
+        self.message: discord.Message = None
+
+    async def load(self) -> discord.Embed:
+        rows = await self.cog.fetch_warning_page(self.guild_id, self.member.id, self._cursors[self.page])
+        has_next = len(rows) > self.cog.warn_page_size
+        rows = rows[:self.cog.warn_page_size]
+        if rows:
+            self._next_cursor = (rows[-1]["created_at"], rows[-1]["id"])
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = not has_next
+        return self.cog.build_warnings_embed(self.member, rows, self.page, self.total)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the moderator who ran this command can page through it.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page -= 1
+        await interaction.response.edit_message(embed=await self.load(), view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        del self._cursors[self.page + 1:]
+        self._cursors.append(self._next_cursor)
+        self.page += 1
+        await interaction.response.edit_message(embed=await self.load(), view=self)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+
+class MassKickFlags(commands.FlagConverter):
+    """Options of /masskick; as a prefix command: `!masskick users: <ids...> joined_within_minutes: 10 reason: raid`."""
+    users: str = commands.flag(default=None, description="User IDs or mentions, separated by spaces")
+    joined_within_minutes: commands.Range[int, 1, 43200] = commands.flag(
+        default=None, description="Also target members who joined in the last N minutes (and match the account age, if given)")
+    account_younger_than_days: commands.Range[int, 1, 5000] = commands.flag(
+        default=None, description="Also target members whose account is younger than N days (and match the join time, if given)")
+    dry_run: bool = commands.flag(default=False, description="Only list who would be affected")
+    reason: str = commands.flag(default="No reason provided", description="Reason for the audit log")
+
+
+class MassBanFlags(MassKickFlags):
+    delete_message_days: commands.Range[int, 0, 7] = commands.flag(default=1, description="Days of their messages to delete (0-7)")
+
+
 class Moderation(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.logger = logging.getLogger("bot.cogs.moderation")
+
+        # Read-through cache of warning counts ((guild ID, user ID) -> count), updated on
+        # every write so escalation checks never need a COUNT query. Least recently used first.
+        self._warn_counts: OrderedDict[tuple[int, int], int] = OrderedDict()
+        self.warn_count_cache_size = 10000
+        # Serializes count-then-write per member so concurrent /warns cannot both read the same count
+        self._warn_locks: weakref.WeakValueDictionary[tuple[int, int], asyncio.Lock] = weakref.WeakValueDictionary()
+        self.warn_page_size = getattr(config, "WARN_PAGE_SIZE", 10)
+        # Warning count -> action ("timeout" or "kick") taken when a member reaches it
+        self.warn_escalation = dict(getattr(config, "WARN_ESCALATION", {}))
+        self.warn_timeout = datetime.timedelta(minutes=getattr(config, "WARN_TIMEOUT_MINUTES", 60))
+
+        # /massban and /masskick
+        self.mass_action_limit = getattr(config, "MASS_ACTION_LIMIT", 1000)
+        self.mass_kick_concurrency = getattr(config, "MASS_KICK_CONCURRENCY", 5)
+
+    async def cog_load(self):
+        await self.bot.db.execute(
+            "CREATE TABLE IF NOT EXISTS warnings ("
+            "id INTEGER PRIMARY KEY, guild_id INTEGER NOT NULL, user_id INTEGER NOT NULL, "
+            "moderator_id INTEGER NOT NULL, reason TEXT NOT NULL, created_at INTEGER NOT NULL)"
+        )
+        await self.bot.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_warnings_member ON warnings (guild_id, user_id, created_at)"
+        )
 
     @commands.hybrid_command(name="kick", description="Kicks a member from the server.")
     @commands.has_permissions(kick_members=True)
@@ -61,5 +166,204 @@ class Moderation(commands.Cog):
 
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="massban", description="Bans many users at once (IDs or selectors).")
+    @commands.has_permissions(ban_members=True)
+    @commands.bot_has_permissions(ban_members=True, manage_guild=True)  # Bulk ban needs both
+    @commands.guild_only()
+    async def massban(self, ctx: commands.Context, *, flags: MassBanFlags):
+        await self._mass_action(ctx, "ban", flags, delete_message_seconds=flags.delete_message_days * 86400)
+
+    @commands.hybrid_command(name="masskick", description="Kicks many members at once (IDs or selectors).")
+    @commands.has_permissions(kick_members=True)
+    @commands.bot_has_permissions(kick_members=True)
+    @commands.guild_only()
+    async def masskick(self, ctx: commands.Context, *, flags: MassKickFlags):
+        await self._mass_action(ctx, "kick", flags)
+
+    async def _mass_action(self, ctx: commands.Context, action: str, flags: MassKickFlags,
+                           delete_message_seconds: int = 86400):
+        reason, dry_run = flags.reason, flags.dry_run
+        joined_within = datetime.timedelta(minutes=flags.joined_within_minutes) if flags.joined_within_minutes else None
+        younger_than = datetime.timedelta(days=flags.account_younger_than_days) if flags.account_younger_than_days else None
+
+        # Explicit IDs plus every member matching all the selectors given
+        targets = dict.fromkeys(mass_moderation.parse_user_ids(flags.users))
+        targets.update(dict.fromkeys(m.id for m in mass_moderation.select_members(ctx.guild, joined_within, younger_than)))
+        if not targets:
+            await ctx.send("No users matched. Give user IDs or a selector.", ephemeral=True)
+            return
+        if len(targets) > self.mass_action_limit:
+            await ctx.send(f"❌ {len(targets)} users matched; the limit is {self.mass_action_limit} per command.", ephemeral=True)
+            return
+
+        allowed, results = mass_moderation.check_hierarchy(ctx.author, ctx.guild, targets)
+        if ctx.interaction:
+            await ctx.defer()  # Large batches take longer than the 3 second interaction window
+
+        audit_reason = f"{ctx.author} ({ctx.author.id}): {reason}"
+        if dry_run:
+            results.extend(mass_moderation.TargetResult(user_id, "would " + action) for user_id in allowed)
+        elif action == "ban":
+            results.extend(await mass_moderation.bulk_ban(ctx.guild, allowed, audit_reason, delete_message_seconds))
+        else:
+            results.extend(await mass_moderation.mass_kick(ctx.guild, allowed, audit_reason, self.mass_kick_concurrency))
+
+        done = "banned" if action == "ban" else "kicked"
+        tally = {outcome: sum(1 for r in results if r.result == outcome) for outcome in (done, "failed", "skipped")}
+        title = f"🔨 Mass {action.title()}" + (" (dry run)" if dry_run else "")
+        embed = discord.Embed(title=title, color=discord.Color.red() if action == "ban" else discord.Color.orange())
+        embed.add_field(name="Matched", value=len(targets), inline=True)
+        embed.add_field(name="Would act on" if dry_run else done.title(), value=len(allowed) if dry_run else tally[done], inline=True)
+        embed.add_field(name="Failed", value=tally["failed"], inline=True)
+        embed.add_field(name="Skipped", value=tally["skipped"], inline=True)
+        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+
+        await ctx.send(embed=embed, file=mass_moderation.results_file(results, f"mass{action}-results.csv"))
+
+    @commands.hybrid_command(name="warn", description="Warns a member.")
+    @commands.has_permissions(moderate_members=True)
+    @commands.guild_only()
+    async def warn(self, ctx: commands.Context, member: discord.Member, *, reason: str = "No reason provided"):
+        # Role hierarchy check
+        if member.top_role >= ctx.author.top_role and ctx.author.id != ctx.guild.owner_id:
+            await ctx.send("You cannot warn this member due to role hierarchy.", ephemeral=True)
+            return
+
+        count = await self.add_warning(ctx.guild.id, member.id, ctx.author.id, reason)
+        action = await self._escalate(member, count)
+
+        embed = discord.Embed(title="⚠️ Member Warned", color=discord.Color.gold())
+        embed.add_field(name="User", value=f"{member} ({member.id})", inline=True)
+        embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+        embed.add_field(name="Warnings", value=count, inline=True)
+        embed.add_field(name="Reason", value=reason, inline=False)
+        if action:
+            embed.add_field(name="Escalation", value=action, inline=False)
+
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name="warnings", description="Lists a member's warnings.")
+    @commands.has_permissions(moderate_members=True)
+    @commands.guild_only()
+    async def warnings(self, ctx: commands.Context, member: discord.User):
+        total = await self.get_warning_count(ctx.guild.id, member.id)
+        view = WarningsView(self, ctx.author.id, ctx.guild.id, member, total)
+        embed = await view.load()
+        if total <= self.warn_page_size:
+            await ctx.send(embed=embed)
+            return
+        view.message = await ctx.send(embed=embed, view=view)
+
+    @commands.hybrid_command(name="clearwarns", description="Clears all warnings of a member.")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def clearwarns(self, ctx: commands.Context, member: discord.User):
+        count = await self.clear_warnings(ctx.guild.id, member.id)
+        await ctx.send(f"🧽 Cleared {count} warning(s) for {member.mention}.")
+
+    async def get_warning_count(self, guild_id: int, user_id: int) -> int:
+        """Returns a member's warning count, from the cache when possible."""
+        key = (guild_id, user_id)
+        count = self._warn_counts.get(key)
+        if count is None:
+            row = await self.bot.db.fetchone(
+                "SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND user_id = ?", guild_id, user_id
+            )
+            count = row[0] if row else 0
+        self._cache_warning_count(key, count)
+        return count
+
+    async def add_warning(self, guild_id: int, user_id: int, moderator_id: int, reason: str) -> int:
+        """Stores a warning and returns the member's new warning count."""
+        async with self._warn_lock(guild_id, user_id):
+            count = await self.get_warning_count(guild_id, user_id)
+            await self.bot.db.execute(
+                "INSERT INTO warnings (guild_id, user_id, moderator_id, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+                guild_id, user_id, moderator_id, reason, int(discord.utils.utcnow().timestamp()),
+            )
+            self._cache_warning_count((guild_id, user_id), count + 1)
+            return count + 1
+
+    async def clear_warnings(self, guild_id: int, user_id: int) -> int:
+        """Deletes every warning of a member and returns how many there were."""
+        async with self._warn_lock(guild_id, user_id):
+            count = await self.get_warning_count(guild_id, user_id)
+            await self.bot.db.execute("DELETE FROM warnings WHERE guild_id = ? AND user_id = ?", guild_id, user_id)
+            self._cache_warning_count((guild_id, user_id), 0)
+            return count
+
+    def _warn_lock(self, guild_id: int, user_id: int) -> asyncio.Lock:
+        lock = self._warn_locks.get((guild_id, user_id))
+        if lock is None:
+            lock = self._warn_locks[(guild_id, user_id)] = asyncio.Lock()
+        return lock
+
+    def _cache_warning_count(self, key: tuple[int, int], count: int):
+        self._warn_counts[key] = count
+        self._warn_counts.move_to_end(key)
+        while len(self._warn_counts) > self.warn_count_cache_size:
+            self._warn_counts.popitem(last=False)
+
+    async def fetch_warning_page(self, guild_id: int, user_id: int, cursor=None) -> list:
+        """
+        Fetches one page of warnings (newest first) plus one extra row telling whether
+        another page follows. `cursor` is the (created_at, id) of the last row already shown.
+        """
+        if cursor is None:
+            return await self.bot.db.fetchall(
+                "SELECT id, moderator_id, reason, created_at FROM warnings "
+                "WHERE guild_id = ? AND user_id = ? "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                guild_id, user_id, self.warn_page_size + 1,
+            )
+        return await self.bot.db.fetchall(
+            "SELECT id, moderator_id, reason, created_at FROM warnings "
+            "WHERE guild_id = ? AND user_id = ? AND (created_at, id) < (?, ?) "
+            "ORDER BY created_at DESC, id DESC LIMIT ?",
+            guild_id, user_id, *cursor, self.warn_page_size + 1,
+        )
+
+    def build_warnings_embed(self, member: discord.abc.User, rows: list, page: int, total: int) -> discord.Embed:
+        embed = discord.Embed(title=f"⚠️ Warnings for {member}", color=discord.Color.gold())
+        if not rows:
+            embed.description = "This user has no warnings."
+            return embed
+
+        for row in rows:
+            created_at = datetime.datetime.fromtimestamp(row["created_at"], tz=datetime.timezone.utc)
+            embed.add_field(
+                name=f"#{row['id']} · {discord.utils.format_dt(created_at, style='f')}",
+                value=f"**Moderator:** <@{row['moderator_id']}>\n**Reason:** {row['reason']}",
+                inline=False,
+            )
+        pages = max(1, -(-total // self.warn_page_size))
+        embed.set_footer(text=f"Page {page + 1}/{pages} · {total} warning(s)")
+        return embed
+
+    async def _escalate(self, member: discord.Member, count: int):
+        """Applies the action configured for this warning count, if any; returns what was done."""
+        action = self.warn_escalation.get(count)
+        if action is None:
+            return None
+
+        reason = f"Reached {count} warnings"
+        try:
+            if action == "timeout":
+                await member.timeout(self.warn_timeout, reason=reason)
+                return f"Timed out for {int(self.warn_timeout.total_seconds() // 60)} minute(s) ({reason.lower()})."
+            if action == "kick":
+                await member.kick(reason=reason)
+                return f"Kicked ({reason.lower()})."
+        except discord.Forbidden:
+            self.logger.warning(f"Missing permissions to {action} {member} ({member.id}) in {member.guild.id}.")
+            return f"Could not {action} the member (missing permissions)."
+        except discord.HTTPException as e:
+            self.logger.error(f"Failed to {action} {member} ({member.id}): {e}")
+            return f"Could not {action} the member."
+
+        self.logger.warning(f"Unknown warn escalation action: {action}")
+        return None
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Moderation(bot))
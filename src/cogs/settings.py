@@ -0,0 +1,108 @@
+from typing import Literal, Optional
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+import config
+from guild_settings import CHANNEL_SETTINGS, MIRROR_MAPPINGS
+
+
+class Settings(commands.Cog):
+    """Admin commands over the per-guild settings store (bot.settings); changes apply without a restart."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # One-time import of the channel IDs in config.py (needs the channel cache, hence on_ready)
+        await self.bot.settings.import_legacy(config, self._guild_of)
+
+    def _guild_of(self, channel_id: int) -> Optional[int]:
+        channel = self.bot.get_channel(channel_id)
+        return channel.guild.id if channel is not None and getattr(channel, "guild", None) else None
+
+    @commands.hybrid_group(name="settings", description="Shows or changes this server's bot settings.")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def settings(self, ctx: commands.Context):
+        await self.settings_show(ctx)
+
+    @settings.command(name="show", description="Shows this server's bot settings.")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def settings_show(self, ctx: commands.Context):
+        current = self.bot.settings.for_guild(ctx.guild.id)
+        embed = discord.Embed(title=f"⚙️ Settings: {ctx.guild.name}", color=discord.Color.blurple())
+        for key, purpose in CHANNEL_SETTINGS.items():
+            channel_id = current.get(key)
+            embed.add_field(name=key, value=f"<#{channel_id}>" if channel_id else "*not set*", inline=True)
+
+        mappings = current.get(MIRROR_MAPPINGS) or []
+        lines = [self._describe_mapping(mapping) for mapping in mappings]
+        embed.add_field(name=f"{MIRROR_MAPPINGS} ({len(mappings)})", value="\n".join(lines)[:1024] or "*none*", inline=False)
+        embed.set_footer(text="Change with /settings channel, /settings mirror_add and /settings mirror_remove.")
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @settings.command(name="channel", description="Sets (or clears, without a channel) one of the server's channels.")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    @app_commands.describe(key="Which channel to set", channel="Leave empty to clear the setting")
+    async def settings_channel(self, ctx: commands.Context, key: Literal[tuple(CHANNEL_SETTINGS)],
+                               channel: discord.TextChannel = None):
+        if channel is None:
+            await self.bot.settings.reset(ctx.guild.id, key)
+            await ctx.send(f"✅ `{key}` cleared.", ephemeral=True)
+            return
+        await self.bot.settings.set(ctx.guild.id, key, channel.id)
+        await ctx.send(f"✅ `{key}` set to {channel.mention} ({CHANNEL_SETTINGS[key]}).", ephemeral=True)
+
+    @settings.command(name="mirror_add", description="Mirrors messages from a channel of this server into another channel.")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    @app_commands.describe(author="Only mirror this user's (or bot's) messages",
+                           delivery="Send as the bot (channel) or through a webhook")
+    async def settings_mirror_add(self, ctx: commands.Context, source: discord.TextChannel, target: discord.TextChannel,
+                                  author: discord.User = None, delivery: Literal["channel", "webhook"] = None):
+        mapping = {"SOURCE_CHANNEL_ID": source.id, "TARGET_CHANNEL_ID": target.id}
+        if author:
+            mapping["BOT_TO_MIRROR_ID"] = author.id
+        if delivery:
+            mapping["DELIVERY"] = delivery
+
+        mappings = list(self.bot.settings.get(ctx.guild.id, MIRROR_MAPPINGS) or [])
+        if mapping in mappings:
+            await ctx.send("That mapping already exists.", ephemeral=True)
+            return
+        mappings.append(mapping)
+        await self.bot.settings.set(ctx.guild.id, MIRROR_MAPPINGS, mappings)
+        await ctx.send(f"✅ Mirroring {self._describe_mapping(mapping)}.", ephemeral=True)
+
+    @settings.command(name="mirror_remove", description="Stops mirroring a channel into another.")
+    @commands.has_permissions(administrator=True)
+    @commands.guild_only()
+    async def settings_mirror_remove(self, ctx: commands.Context, source: discord.TextChannel, target: discord.TextChannel):
+        mappings = self.bot.settings.get(ctx.guild.id, MIRROR_MAPPINGS) or []
+        kept = [m for m in mappings if (m.get("SOURCE_CHANNEL_ID"), m.get("TARGET_CHANNEL_ID")) != (source.id, target.id)]
+        if len(kept) == len(mappings):
+            await ctx.send(f"❌ No mapping from {source.mention} to {target.mention}.", ephemeral=True)
+            return
+        if kept:
+            await self.bot.settings.set(ctx.guild.id, MIRROR_MAPPINGS, kept)
+        else:
+            await self.bot.settings.reset(ctx.guild.id, MIRROR_MAPPINGS)
+        await ctx.send(f"✅ Removed {len(mappings) - len(kept)} mapping(s).", ephemeral=True)
+
+    @staticmethod
+    def _describe_mapping(mapping: dict) -> str:
+        text = f"<#{mapping.get('SOURCE_CHANNEL_ID')}> → <#{mapping.get('TARGET_CHANNEL_ID')}>"
+        if mapping.get("BOT_TO_MIRROR_ID"):
+            text += f" (only <@{mapping['BOT_TO_MIRROR_ID']}>)"
+        if mapping.get("DELIVERY"):
+            text += f" via {mapping['DELIVERY']}"
+        return text
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Settings(bot))
@@ -0,0 +1,48 @@
+import logging
+
+from aiohttp import web
+from discord.ext import commands
+
+import config
+import metrics
+
+
+class Telemetry(commands.Cog):
+    """Counts gateway events and serves every metric on an optional local HTTP endpoint."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = logging.getLogger("bot.cogs.telemetry")
+        self.host = getattr(config, "METRICS_HOST", "127.0.0.1")
+        self.port = getattr(config, "METRICS_PORT", None)
+        self._runner: web.AppRunner = None
+
+    async def cog_load(self):
+        metrics.GATEWAY_LATENCY.labels().set_function(lambda: self.bot.latency)
+        if not self.port:
+            return  # Endpoint disabled; metrics are still collected
+
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def cog_unload(self):
+        metrics.GATEWAY_LATENCY.remove()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=metrics.REGISTRY.render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    @commands.Cog.listener()
+    async def on_socket_event_type(self, event_type: str):
+        metrics.GATEWAY_EVENTS.labels(event_type).inc()
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Telemetry(bot))
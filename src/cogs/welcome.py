@@ -2,40 +2,69 @@ import discord
 import logging
 from discord.ext import commands
 import config
+import metrics
+from join_flood import JoinFloodGuard, mention_list
 
 class Welcome(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.logger = logging.getLogger("bot.cogs.welcome")
 
-    @commands.Cog.listener()
-    async def on_ready(self):
+        # During a join flood, one "Welcome @a, @b, ..." message per window instead of one per join
+        self.join_flood = JoinFloodGuard(
+            self._send_batched_welcome, "welcome messages",
+            threshold=getattr(config, "JOIN_FLOOD_THRESHOLD", 10),
+            window=getattr(config, "JOIN_FLOOD_WINDOW", 10.0),
+        )
+
+    async def cog_unload(self):
+        await self.join_flood.close()
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         if member.bot:
             return
+        if self.join_flood.add(member):
+            return  # Welcomed with the rest of the batch
+
+        channel = await self._welcome_channel(member.guild)
+        if channel is not None:
+            await self._send(channel, f"Welcome to the server, {member.mention}! 🎉")
 
-        # Send to the specific welcome channel
-        channel = member.guild.get_channel(config.WELCOME_CHANNEL_ID)
+    async def _send_batched_welcome(self, guild: discord.Guild, members: list, rate: float):
+        channel = await self._welcome_channel(guild)
+        if channel is not None:
+            await self._send(channel, f"Welcome to the server, {mention_list(members)}! 🎉")
+
+    async def _welcome_channel(self, guild: discord.Guild):
+        # Send to the guild's welcome channel (see /settings), if it has one
+        channel_id = self.bot.settings.get(guild.id, "welcome_channel")
+        if channel_id is None:
+            return None
+        channel = guild.get_channel(channel_id)
 
         # Fallback: Try fetching from API if not in cache
         if channel is None:
             try:
-                channel = await member.guild.fetch_channel(config.WELCOME_CHANNEL_ID)
+                channel = await guild.fetch_channel(channel_id)
             except Exception as e:
-                self.logger.warning(f"Failed to fetch welcome channel (ID: {config.WELCOME_CHANNEL_ID}): {e}")
+                self.logger.warning(f"Failed to fetch welcome channel (ID: {channel_id}): {e}")
 
-        if channel is not None:
-            try:
-                await channel.send(f"Welcome to the server, {member.mention}! 🎉")
-                self.logger.info(f"Sent welcome message to {channel.name}")
-            except discord.Forbidden:
-                self.logger.error(f"Missing permissions to send welcome message in {channel.name} ({channel.id})")
-            except Exception as e:
-                self.logger.error(f"Failed to send welcome message: {e}")
-        else:
-            self.logger.warning(f"Welcome channel ID {config.WELCOME_CHANNEL_ID} not found in guild {member.guild.name}")
+        if channel is None:
+            self.logger.warning(f"Welcome channel ID {channel_id} not found in guild {guild.name}")
+        return channel
+
+    async def _send(self, channel, content: str):
+        try:
+            await channel.send(content)
+            self.logger.info(f"Sent welcome message to {channel.name}")
+            metrics.MESSAGES_SENT.labels("welcome", "ok").inc()
+        except discord.Forbidden:
+            self.logger.error(f"Missing permissions to send welcome message in {channel.name} ({channel.id})")
+            metrics.MESSAGES_SENT.labels("welcome", "forbidden").inc()
+        except Exception as e:
+            self.logger.error(f"Failed to send welcome message: {e}")
+            metrics.MESSAGES_SENT.labels("welcome", "error").inc()
 
     @commands.hybrid_command(name="testwelcome", description="Test the welcome message configuration.")
     @commands.has_permissions(administrator=True)
@@ -46,14 +75,17 @@ class Welcome(commands.Cog):
         if not ctx.guild.get_member(ctx.author.id):
             await ctx.send("⚠️ **CRITICAL WARNING**: I cannot find you in my member cache. This means **Server Members Intent** is likely disabled or not working. The `on_member_join` event will NOT fire.")
 
-        channel_id = config.WELCOME_CHANNEL_ID
+        channel_id = self.bot.settings.get(ctx.guild.id, "welcome_channel")
+        if channel_id is None:
+            await ctx.send("❌ **Error**: No welcome channel is set. Use `/settings channel welcome_channel <channel>`.")
+            return
         channel = ctx.guild.get_channel(channel_id)
 
         if not channel:
             try:
                 channel = await ctx.guild.fetch_channel(channel_id)
             except discord.NotFound:
-                await ctx.send(f"❌ **Error**: Channel ID `{channel_id}` not found. Check `src/config.py`.")
+                await ctx.send(f"❌ **Error**: Channel ID `{channel_id}` not found. Check `/settings show`.")
                 return
             except discord.Forbidden:
                 await ctx.send(f"❌ **Error**: Bot cannot view channel `{channel_id}` (Missing Permissions).")
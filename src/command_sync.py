@@ -0,0 +1,48 @@
+import hashlib
+import json
+import logging
+import time
+
+from discord import app_commands
+
+logger = logging.getLogger("bot.command_sync")
+
+FINGERPRINT_KEY = "command_tree_fingerprint"
+
+
+def tree_fingerprint(tree: app_commands.CommandTree, application_id: int) -> str:
+    """
+    Stable SHA-256 of the global command tree as it would be sent to Discord.
+    Commands are sorted and keys ordered, so load order does not change the hash.
+    """
+    commands = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda payload: (payload.get("type", 1), payload["name"]),
+    )
+    blob = json.dumps({"application_id": application_id, "commands": commands},
+                      sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+async def sync_if_changed(tree: app_commands.CommandTree, db, application_id: int, force: bool = False) -> bool:
+    """
+    Syncs the global command tree only if its fingerprint differs from the last
+    successful sync (or `force` is set). Returns True if a sync happened.
+    """
+    await db.execute("CREATE TABLE IF NOT EXISTS bot_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    fingerprint = tree_fingerprint(tree, application_id)
+    row = await db.fetchone("SELECT value FROM bot_state WHERE key = ?", FINGERPRINT_KEY)
+    stored = row["value"] if row else None
+
+    if stored == fingerprint and not force:
+        logger.info(f"Command tree unchanged (fingerprint {fingerprint[:12]}); skipped global sync.")
+        return False
+
+    reason = "forced" if force else ("first run" if stored is None else "tree changed")
+    start = time.perf_counter()
+    synced = await tree.sync()
+    elapsed = time.perf_counter() - start
+
+    await db.execute("INSERT OR REPLACE INTO bot_state (key, value) VALUES (?, ?)", FINGERPRINT_KEY, fingerprint, durable=True)
+    logger.info(f"Synced {len(synced)} command(s) globally in {elapsed:.2f}s ({reason}, fingerprint {fingerprint[:12]}).")
+    return True
@@ -1,5 +1,6 @@
 # --- CONFIGURATION: CHANNEL IDS ---
-# Centralized configuration for channel IDs used across cogs.
+# Imported once into the per-guild settings store (guild_settings table) on first start;
+# after that, change channels with /settings instead of editing this file.
 
 WELCOME_CHANNEL_ID = 1464113713991778517
 
@@ -9,11 +10,51 @@ LOG_CHANNEL_MODERATION = 1450676851331567627
 LOG_CHANNEL_SERVER = 1450752093899067465
 LOG_CHANNEL_VOICE = 1450677163815604355
 
+# --- CONFIGURATION: LOGGER ---
+# - LOG_BATCH_INTERVAL: Seconds log embeds are held to be packed (up to 10) into one message.
+# - LOG_RESCUE_TIMEOUT: Seconds allowed per image download when logging a deleted message.
+# - LOG_RESCUE_MAX_BYTES: Max total image bytes attached to one deleted-message log.
+# - LOG_MESSAGE_CACHE_MAX_ENTRIES / _MAX_BYTES: Budget of the logger's compact message cache,
+#   used to log deletions of messages discord.py's own cache no longer holds.
+LOG_BATCH_INTERVAL = 1.0
+LOG_MESSAGE_CACHE_MAX_ENTRIES = 50000
+LOG_MESSAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+LOG_RESCUE_TIMEOUT = 5
+LOG_RESCUE_MAX_BYTES = 8 * 1024 * 1024
+
+# --- CONFIGURATION: JOIN FLOOD ---
+# Above this join rate a guild's welcome messages and join logs are sent as one batch per window.
+# - JOIN_FLOOD_THRESHOLD: Joins within the window that switch a guild to batched mode (back below half of it).
+# - JOIN_FLOOD_WINDOW: Length of the sliding window, and the interval between batches, in seconds.
+JOIN_FLOOD_THRESHOLD = 10
+JOIN_FLOOD_WINDOW = 10.0
+
+# --- CONFIGURATION: LOGGER ARCHIVE ---
+# Every logged event is also stored in SQLite (full-text indexed) for /logsearch.
+# - LOG_ARCHIVE_RETENTION_DAYS: Archived events older than this are pruned hourly.
+# - LOG_ARCHIVE_BATCH_SIZE: Buffered events that trigger a write before the 5 second flush.
+LOG_ARCHIVE_RETENTION_DAYS = 30
+LOG_ARCHIVE_BATCH_SIZE = 500
+
+# --- CONFIGURATION: LOGGER ATTACHMENT CACHE (opt-in) ---
+# Images posted in these channels are copied to disk, so deleted images can be rescued
+# even after the CDN stops serving them. Leave the list empty to disable the cache.
+# - LOG_ATTACHMENT_CACHE_DIR: Directory for the cached files (content-addressed).
+# - LOG_ATTACHMENT_CACHE_MAX_BYTES: Total size budget; least recently used files are evicted.
+# - LOG_ATTACHMENT_CACHE_MAX_AGE_HOURS: Files unused for this long are evicted.
+LOG_ATTACHMENT_CACHE_CHANNELS = []
+LOG_ATTACHMENT_CACHE_DIR = "attachment_cache"
+LOG_ATTACHMENT_CACHE_MAX_BYTES = 500 * 1024 * 1024
+LOG_ATTACHMENT_CACHE_MAX_AGE_HOURS = 72
+
 # --- CONFIGURATION: MIRROR ---
 # A list of dictionaries, where each dictionary represents a mirror mapping.
 # You can add as many mappings as you need.
 # - SOURCE_CHANNEL_ID: The channel to watch for messages.
 # - TARGET_CHANNEL_ID: The channel to send the mirrored messages to.
+# - DELIVERY (optional): "channel" or "webhook", overrides MIRROR_DELIVERY for this mapping.
+# A source channel may appear in several mappings to mirror into several targets.
+# Imported once into the settings store (see CHANNEL IDS); edit with /settings mirror_add|mirror_remove.
 MIRROR_MAPPINGS = [
     { # Financial News
         "SOURCE_CHANNEL_ID": 1450713437771399271,  # Replace with the first source channel ID
@@ -31,4 +72,63 @@ MIRROR_MAPPINGS = [
         "SOURCE_CHANNEL_ID": 1450680605300752394,  # Replace with the second source channel ID
         "TARGET_CHANNEL_ID": 1464113314882781307   # Replace with the second target channel ID
     }
-]
\ No newline at end of file
+]
+
+# --- CONFIGURATION: MIRROR ATTACHMENTS ---
+# - MIRROR_ATTACHMENT_CONCURRENCY: Max attachment downloads running at once.
+# - MIRROR_ATTACHMENT_BUDGET: Max bytes of attachments mirrored per message (the rest are linked).
+# - MIRROR_ATTACHMENT_SPOOL_THRESHOLD: Files larger than this are streamed to a temp file instead of RAM.
+MIRROR_ATTACHMENT_CONCURRENCY = 4
+MIRROR_ATTACHMENT_BUDGET = 25 * 1024 * 1024
+MIRROR_ATTACHMENT_SPOOL_THRESHOLD = 2 * 1024 * 1024
+
+
+# --- CONFIGURATION: MIRROR DELIVERY ---
+# - MIRROR_DELIVERY: "channel" sends as the bot; "webhook" sends through a webhook in each
+#   target channel (needs Manage Webhooks, keeps the source author's name and avatar).
+# - MIRROR_QUEUE_SIZE: Max mirrors waiting per target channel before new ones are dropped.
+MIRROR_DELIVERY = "channel"
+MIRROR_QUEUE_SIZE = 100
+
+
+# --- CONFIGURATION: MIRROR EDIT/DELETE PROPAGATION ---
+# - MIRROR_LINK_CACHE_SIZE: Recent source -> copy links kept in memory.
+# - MIRROR_LINK_RETENTION_DAYS: Links older than this are pruned; older sources are no longer synced.
+MIRROR_LINK_CACHE_SIZE = 1000
+MIRROR_LINK_RETENTION_DAYS = 14
+
+
+# --- CONFIGURATION: DATABASE ---
+# - DB_SLOW_QUERY_MS: Statements slower than this are logged with their query plan (None disables).
+DB_SLOW_QUERY_MS = 100
+
+
+# --- CONFIGURATION: WARN SYSTEM ---
+# - WARN_ESCALATION: Warning count -> action taken when a member reaches it ("timeout" or "kick").
+# - WARN_TIMEOUT_MINUTES: Length of the "timeout" escalation.
+# - WARN_PAGE_SIZE: Warnings shown per page of /warnings.
+WARN_ESCALATION = {3: "timeout", 5: "kick"}
+WARN_TIMEOUT_MINUTES = 60
+WARN_PAGE_SIZE = 10
+
+
+# --- CONFIGURATION: METRICS ---
+# Counters/histograms for gateway events, listeners, REST calls and send queues.
+# - METRICS_PORT: Port of the Prometheus-format endpoint (/metrics); None disables the endpoint.
+# - METRICS_HOST: Interface the endpoint listens on (keep it local).
+METRICS_PORT = None
+METRICS_HOST = "127.0.0.1"
+
+
+# --- CONFIGURATION: PURGE ---
+# - PURGE_MAX_SCAN: Max messages of history one /purge walks through.
+# - PURGE_SINGLE_DELETE_INTERVAL: Seconds between single deletes of messages older than 14 days.
+PURGE_MAX_SCAN = 50000
+PURGE_SINGLE_DELETE_INTERVAL = 1.0
+
+
+# --- CONFIGURATION: MASS MODERATION ---
+# - MASS_ACTION_LIMIT: Max users one /massban or /masskick may target.
+# - MASS_KICK_CONCURRENCY: Kicks in flight at once during /masskick.
+MASS_ACTION_LIMIT = 1000
+MASS_KICK_CONCURRENCY = 5
@@ -1,40 +1,281 @@
+import asyncio
+import contextlib
 import logging
+import pathlib
+import time
 import aiosqlite
 
+from query_stats import QueryStats
+
 class DatabaseManager:
-    def __init__(self, db_name: str):
+    """
+    Async SQLite access shared by every cog.
+
+    Writes are group-committed: statements run straight away, but the commit
+    (and its fsync) is deferred until `commit_batch_size` writes are pending or
+    `commit_interval` seconds have passed, whichever comes first. Callers that
+    need a write committed before continuing pass `durable=True` or await `commit()`.
+    With synchronous=NORMAL in WAL mode a committed transaction survives a crash
+    of the bot, but a power loss or OS crash may still roll back the last commits
+    (the database itself stays consistent).
+
+    All grouped writes share one open transaction. If a commit fails, or an error
+    makes SQLite roll the transaction back, every pending write is lost: this is
+    rolled back cleanly and logged with the number of writes dropped.
+
+    Next to the single writer connection there is a small pool of read-only
+    connections, used by `iterate()` and `read_only=True` fetches, so long
+    report queries run in their own threads instead of queueing behind writes.
+    Reads on the pool only see committed data.
+
+    Every statement is timed into `query_stats` (per normalized statement). Any
+    statement slower than `slow_query_threshold` seconds is logged, together with
+    its `EXPLAIN QUERY PLAN` (at most once per statement every `plan_log_interval`).
+    """
+
+    # Applied at connect(). WAL lets readers run alongside the writer, and with
+    # synchronous=NORMAL a commit no longer waits for an fsync of the main file.
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA foreign_keys=ON",
+    )
+
+    def __init__(self, db_name: str, commit_interval: float = 0.5, commit_batch_size: int = 200, readers: int = 2,
+                 slow_query_threshold: float = 0.1, plan_log_interval: float = 300.0):
         self.db_name = db_name
         self.conn = None
         self.logger = logging.getLogger("bot.database")
 
+        self.query_stats = QueryStats()
+        self.slow_query_threshold = slow_query_threshold
+        self.plan_log_interval = plan_log_interval
+        self._plan_tasks: set[asyncio.Task] = set()
+
+        self.reader_count = readers
+        self._readers: asyncio.Queue = None
+        self._reader_conns: list = []
+
+        self.commit_interval = commit_interval
+        self.commit_batch_size = commit_batch_size
+        self._pending_writes = 0
+        self._commit_task = None
+        self._commit_lock = asyncio.Lock()
+
     async def connect(self):
         self.conn = await aiosqlite.connect(self.db_name)
         self.conn.row_factory = aiosqlite.Row  # Allows accessing columns by name
+        for pragma in self.PRAGMAS:
+            await self.conn.execute(pragma)
+        await self.conn.commit()
+        await self._open_readers()
         self.logger.info(f"Connected to SQLite database: {self.db_name}")
 
+    async def _open_readers(self):
+        # An in-memory database is private to its connection: reads go through the writer
+        if self.reader_count <= 0 or self.db_name == ":memory:" or self.db_name.startswith("file::memory:"):
+            return
+        self._readers = asyncio.Queue()
+        for _ in range(self.reader_count):
+            # as_uri() percent-encodes the path, so names containing ?, # or % open the right file
+            uri = pathlib.Path(self.db_name).absolute().as_uri() + "?mode=ro"
+            reader = await aiosqlite.connect(uri, uri=True)
+            reader.row_factory = aiosqlite.Row
+            await reader.execute("PRAGMA busy_timeout=5000")
+            self._reader_conns.append(reader)
+            self._readers.put_nowait(reader)
+
     async def close(self):
         if self.conn:
+            if self._commit_task:
+                self._commit_task.cancel()
+                self._commit_task = None
+            await self.commit()
+            for task in self._plan_tasks:
+                task.cancel()
+            for reader in self._reader_conns:
+                await reader.close()
+            self._reader_conns.clear()
+            self._readers = None
             await self.conn.close()
+            self.conn = None
             self.logger.info("Database connection closed.")
 
-    async def execute(self, sql: str, *args):
-        """Executes a query and commits."""
+    async def execute(self, sql: str, *args, durable: bool = False):
+        """Executes a query; the commit is grouped with other writes unless durable=True. Returns the lastrowid."""
+        if not self.conn:
+            return
+        lastrowid, _rowcount = await self._execute(sql, args, durable)
+        return lastrowid
+
+    async def execute_changes(self, sql: str, *args, durable: bool = False) -> int:
+        """Like execute(), but returns the number of rows the statement changed."""
+        if not self.conn:
+            return 0
+        _lastrowid, rowcount = await self._execute(sql, args, durable)
+        return rowcount
+
+    async def _execute(self, sql: str, args, durable: bool) -> tuple:
+        # The counts are read from this statement's own cursor, so writes made by
+        # other tasks on the shared connection in the meantime cannot skew them
+        try:
+            async with self._timed(sql, args):
+                async with self.conn.execute(sql, args) as cursor:
+                    result = cursor.lastrowid, cursor.rowcount
+        except Exception:
+            self._check_transaction()
+            raise
+        await self._written(1, durable)
+        return result
+
+    async def executemany(self, sql: str, rows, durable: bool = False):
+        """Executes a query once per row of parameters, as a single grouped write."""
+        if not self.conn:
+            return
+        rows = list(rows)
+        if not rows:
+            return
+        try:
+            async with self._timed(sql, rows[0]):
+                await self.conn.executemany(sql, rows)
+        except Exception:
+            self._check_transaction()
+            raise
+        await self._written(len(rows), durable)
+
+    async def commit(self):
+        """
+        Commits every pending write now. On failure the transaction is rolled back
+        (so the connection stays usable), the lost writes are logged, and the error is raised.
+        """
         if not self.conn:
             return
-        async with self.conn.execute(sql, args) as cursor:
-            await self.conn.commit()
-            return cursor.lastrowid
+        async with self._commit_lock:
+            pending, self._pending_writes = self._pending_writes, 0
+            try:
+                async with self._timed("COMMIT"):
+                    await self.conn.commit()
+            except Exception as e:
+                self.logger.error(f"Commit failed, rolling back {pending} pending write(s): {e}")
+                try:
+                    await self.conn.rollback()
+                except Exception as rollback_error:
+                    self.logger.error(f"Rollback failed: {rollback_error}")
+                raise
+
+    def _check_transaction(self):
+        """After a failed statement: notices when SQLite rolled back the whole shared transaction."""
+        if self._pending_writes and not self.conn.in_transaction:
+            self.logger.error(f"A failed statement rolled back the open transaction; "
+                              f"{self._pending_writes} pending write(s) were lost.")
+            self._pending_writes = 0
+
+    async def _written(self, count: int, durable: bool):
+        self._pending_writes += count
+        if durable or self._pending_writes >= self.commit_batch_size:
+            await self.commit()
+        elif self._commit_task is None:
+            self._commit_task = asyncio.create_task(self._commit_later())
+
+    async def _commit_later(self):
+        await asyncio.sleep(self.commit_interval)
+        self._commit_task = None
+        try:
+            await self.commit()
+        except Exception as e:
+            self.logger.error(f"Group commit failed: {e}")
+
+    @contextlib.asynccontextmanager
+    async def reader(self):
+        """Borrows a read-only connection from the pool (the writer if there is no pool)."""
+        if self._readers is None:
+            yield self.conn
+            return
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
 
-    async def fetchone(self, sql: str, *args):
+    async def fetchone(self, sql: str, *args, read_only: bool = False):
         """Fetches a single row."""
         if not self.conn:
             return None
-        async with self.conn.execute(sql, args) as cursor:
-            return await cursor.fetchone()
+        async with self._connection(read_only) as conn, self._timed(sql, args):
+            async with conn.execute(sql, args) as cursor:
+                return await cursor.fetchone()
 
-    async def fetchall(self, sql: str, *args):
+    async def fetchall(self, sql: str, *args, read_only: bool = False):
         """Fetches all rows."""
         if not self.conn:
             return []
-        async with self.conn.execute(sql, args) as cursor:
-            return await cursor.fetchall()
\ No newline at end of file
+        async with self._connection(read_only) as conn, self._timed(sql, args):
+            async with conn.execute(sql, args) as cursor:
+                return await cursor.fetchall()
+
+    async def iterate(self, sql: str, *args, chunk_size: int = 500):
+        """
+        Streams rows from a read-only connection, fetching `chunk_size` rows at a time.
+        Use with `contextlib.aclosing()` if the loop may stop early.
+        """
+        if not self.conn:
+            return
+        elapsed = 0.0  # Time spent in the database, not in the consumer's loop body
+        try:
+            async with self.reader() as conn:
+                start = time.perf_counter()
+                async with conn.execute(sql, args) as cursor:
+                    while rows := await cursor.fetchmany(chunk_size):
+                        elapsed += time.perf_counter() - start
+                        for row in rows:
+                            yield row
+                        start = time.perf_counter()
+                    elapsed += time.perf_counter() - start
+        finally:
+            self._record(sql, args, elapsed)
+
+    def _connection(self, read_only: bool):
+        if read_only:
+            return self.reader()
+        return contextlib.nullcontext(self.conn)
+
+    @contextlib.asynccontextmanager
+    async def _timed(self, sql: str, args=()):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(sql, args, time.perf_counter() - start)
+
+    def _record(self, sql: str, args, elapsed: float):
+        stats = self.query_stats.record(sql, elapsed)
+        if self.slow_query_threshold is None or elapsed < self.slow_query_threshold:
+            return
+        self.logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {stats.statement}")
+
+        now = time.monotonic()
+        if sql != "COMMIT" and (stats.plan_logged_at is None or now - stats.plan_logged_at >= self.plan_log_interval):
+            stats.plan_logged_at = now
+            task = asyncio.create_task(self._log_plan(stats.statement, sql, args))
+            self._plan_tasks.add(task)
+            task.add_done_callback(self._plan_tasks.discard)
+
+    async def _log_plan(self, statement: str, sql: str, args):
+        """Logs the query plan of a slow statement, one line per step, indented by depth."""
+        if not self.conn:
+            return
+        try:
+            async with self.conn.execute(f"EXPLAIN QUERY PLAN {sql}", args) as cursor:
+                rows = await cursor.fetchall()
+        except Exception as e:
+            self.logger.debug(f"No query plan for {statement}: {e}")
+            return
+
+        depth = {0: -1}
+        lines = []
+        for node_id, parent_id, _unused, detail in rows:
+            depth[node_id] = depth.get(parent_id, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        self.logger.warning(f"Query plan for {statement}:\n" + "\n".join(lines))
@@ -0,0 +1,163 @@
+import datetime
+import logging
+import re
+from typing import NamedTuple, Optional
+
+import discord
+
+# Event types written by the Logger cog (used for /logsearch choices)
+EVENT_TYPES = (
+    "message_delete",
+    "message_edit",
+    "bulk_delete",
+    "member_join",
+    "member_leave",
+    "member_kick",
+    "member_prune",
+    "member_ban",
+    "member_unban",
+    "role_create",
+    "channel_create",
+    "channel_update",
+    "emojis_update",
+    "voice",
+)
+
+_DURATION = re.compile(r"^\s*(\d+)\s*([mhdw])\s*$", re.IGNORECASE)
+_DURATION_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_duration(text: str) -> Optional[datetime.timedelta]:
+    """Parses "30m", "12h", "7d" or "2w"; returns None if the text is not a duration."""
+    match = _DURATION.match(text or "")
+    if not match:
+        return None
+    return datetime.timedelta(**{_DURATION_UNITS[match.group(2).lower()]: int(match.group(1))})
+
+
+def fts_query(text: str) -> str:
+    """Turns free text into an FTS5 query matching every word (as literal terms, not syntax)."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class ArchivedEvent(NamedTuple):
+    id: int
+    event_type: str
+    user_id: Optional[int]
+    channel_id: Optional[int]
+    created_at: datetime.datetime
+    content: str
+
+
+class EventArchive:
+    """
+    SQLite copy of everything the Logger posts, searchable by user, channel,
+    event type, time and (through an FTS5 index) text.
+    Events are buffered in memory and written in batches by `flush()`.
+    """
+
+    def __init__(self, db, retention_days: int = 30, batch_size: int = 500):
+        self.db = db
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.logger = logging.getLogger("bot.event_archive")
+        self._buffer: list[tuple] = []
+
+    async def create_tables(self):
+        await self.db.execute(
+            "CREATE TABLE IF NOT EXISTS log_events ("
+            "id INTEGER PRIMARY KEY, guild_id INTEGER, event_type TEXT NOT NULL, "
+            "user_id INTEGER, channel_id INTEGER, created_at INTEGER NOT NULL, content TEXT NOT NULL)"
+        )
+        # Every search is scoped to a guild and sorted by time; the FTS index covers text
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_log_events_time ON log_events (guild_id, created_at)")
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_log_events_user ON log_events (guild_id, user_id, created_at)")
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_log_events_channel ON log_events (guild_id, channel_id, created_at)")
+        await self.db.execute("CREATE INDEX IF NOT EXISTS idx_log_events_prune ON log_events (created_at)")
+        await self.db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS log_events_fts USING fts5("
+            "content, content='log_events', content_rowid='id')"
+        )
+        # Keep the external-content FTS index in step with the table
+        await self.db.execute(
+            "CREATE TRIGGER IF NOT EXISTS log_events_ai AFTER INSERT ON log_events BEGIN "
+            "INSERT INTO log_events_fts (rowid, content) VALUES (new.id, new.content); END"
+        )
+        await self.db.execute(
+            "CREATE TRIGGER IF NOT EXISTS log_events_ad AFTER DELETE ON log_events BEGIN "
+            "INSERT INTO log_events_fts (log_events_fts, rowid, content) VALUES ('delete', old.id, old.content); END"
+        )
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def record(self, event_type: str, guild_id: Optional[int], user_id: Optional[int] = None,
+               channel_id: Optional[int] = None, content: str = "", created_at: datetime.datetime = None) -> bool:
+        """Buffers an event; returns True once a full batch is waiting to be flushed."""
+        created_at = created_at or discord.utils.utcnow()
+        self._buffer.append((guild_id, event_type, user_id, channel_id, int(created_at.timestamp()), content or ""))
+        return len(self._buffer) >= self.batch_size
+
+    async def flush(self, durable: bool = False):
+        """Writes every buffered event in one batch (committed straight away if durable=True and any were buffered)."""
+        rows, self._buffer = self._buffer, []
+        if rows:
+            await self.db.executemany(
+                "INSERT INTO log_events (guild_id, event_type, user_id, channel_id, created_at, content) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+                durable=durable,
+            )
+
+    async def prune(self, chunk_size: int = 5000) -> int:
+        """Deletes events older than the retention window, a chunk at a time; returns how many."""
+        cutoff = int((discord.utils.utcnow() - datetime.timedelta(days=self.retention_days)).timestamp())
+        deleted = 0
+        while True:
+            changes = await self.db.execute_changes(
+                "DELETE FROM log_events WHERE id IN "
+                "(SELECT id FROM log_events WHERE created_at < ? ORDER BY created_at LIMIT ?)",
+                cutoff, chunk_size,
+            )
+            deleted += changes
+            if changes < chunk_size:
+                break
+        if deleted:
+            self.logger.info(f"Pruned {deleted} archived log event(s) older than {self.retention_days} day(s).")
+        return deleted
+
+    async def search(self, guild_id: int, user_id: int = None, channel_id: int = None, event_type: str = None,
+                     since: datetime.datetime = None, until: datetime.datetime = None, text: str = None,
+                     limit: int = 50) -> list[ArchivedEvent]:
+        """Returns matching events, newest first (read from the reader pool)."""
+        clauses, params = ["e.guild_id = ?"], [guild_id]
+        if user_id is not None:
+            clauses.append("e.user_id = ?")
+            params.append(user_id)
+        if channel_id is not None:
+            clauses.append("e.channel_id = ?")
+            params.append(channel_id)
+        if event_type:
+            clauses.append("e.event_type = ?")
+            params.append(event_type)
+        if since is not None:
+            clauses.append("e.created_at >= ?")
+            params.append(int(since.timestamp()))
+        if until is not None:
+            clauses.append("e.created_at < ?")
+            params.append(int(until.timestamp()))
+        if text and text.strip():
+            clauses.append("e.id IN (SELECT rowid FROM log_events_fts WHERE log_events_fts MATCH ?)")
+            params.append(fts_query(text))
+
+        rows = await self.db.fetchall(
+            "SELECT e.id, e.event_type, e.user_id, e.channel_id, e.created_at, e.content FROM log_events e "
+            f"WHERE {' AND '.join(clauses)} ORDER BY e.created_at DESC, e.id DESC LIMIT ?",
+            *params, limit,
+            read_only=True,
+        )
+        return [
+            ArchivedEvent(row["id"], row["event_type"], row["user_id"], row["channel_id"],
+                          datetime.datetime.fromtimestamp(row["created_at"], tz=datetime.timezone.utc), row["content"])
+            for row in rows
+        ]
@@ -0,0 +1,95 @@
+import ast
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from discord.ext import commands
+
+from startup_timeline import StartupTimeline
+
+logger = logging.getLogger("bot.extension_loader")
+
+
+def declared_dependencies(path: Path) -> tuple[str, ...]:
+    """
+    Reads a cog's module-level `DEPENDS_ON = ("cogs.other", ...)` without importing it.
+    Returns an empty tuple when the cog declares nothing.
+    """
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError):
+        return ()  # load_extension will report the real error
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "DEPENDS_ON" for t in node.targets):
+            try:
+                return tuple(ast.literal_eval(node.value))
+            except ValueError:
+                logger.warning(f"{path.name}: DEPENDS_ON must be a literal tuple of extension names.")
+    return ()
+
+
+def discover(cogs_dir: Path, package: str = "cogs") -> dict[str, tuple[str, ...]]:
+    """Maps every extension in `cogs_dir` to the extensions it depends on."""
+    return {
+        f"{package}.{file.stem}": declared_dependencies(file)
+        for file in sorted(cogs_dir.glob("*.py"))
+        if file.name != "__init__.py"
+    }
+
+
+def _cyclic(extensions: dict[str, tuple[str, ...]]) -> set[str]:
+    """Returns the extensions that are part of (or depend on) a dependency cycle."""
+    state: dict[str, int] = {}  # 1 = visiting, 2 = done
+    cyclic: set[str] = set()
+
+    def visit(name: str) -> bool:
+        if state.get(name) == 1:
+            return True
+        if state.get(name) == 2:
+            return name in cyclic
+        state[name] = 1
+        in_cycle = any(visit(dep) for dep in extensions.get(name, ()) if dep in extensions)
+        state[name] = 2
+        if in_cycle:
+            cyclic.add(name)
+        return in_cycle
+
+    for name in extensions:
+        visit(name)
+    return cyclic
+
+
+async def load_extensions(bot: commands.Bot, extensions: dict[str, tuple[str, ...]],
+                          timeline: StartupTimeline = None) -> dict[str, Exception]:
+    """
+    Loads extensions concurrently; each one waits only for the extensions it
+    declared in DEPENDS_ON. Returns the failures (extension name -> error).
+    """
+    done: dict[str, asyncio.Future] = {name: asyncio.get_running_loop().create_future() for name in extensions}
+    failures: dict[str, Exception] = {}
+    cyclic = _cyclic(extensions)
+
+    async def load(name: str):
+        try:
+            if name in cyclic:
+                raise RuntimeError("dependency cycle")
+            for dep in extensions[name]:
+                if dep not in done:
+                    raise RuntimeError(f"unknown dependency {dep}")
+                if not await done[dep]:
+                    raise RuntimeError(f"dependency {dep} failed to load")
+
+            start = time.perf_counter()
+            await bot.load_extension(name)
+            if timeline:
+                timeline.record(f"extension {name}", start)
+            logger.info(f"Loaded extension: {name}")
+            done[name].set_result(True)
+        except Exception as e:
+            failures[name] = e
+            logger.error(f"Failed to load extension {name}: {e}")
+            done[name].set_result(False)
+
+    await asyncio.gather(*(load(name) for name in extensions))
+    return failures
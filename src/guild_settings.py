@@ -0,0 +1,141 @@
+import json
+import logging
+from typing import Any, Callable, Optional
+
+# Channel settings: key -> what the channel is used for
+CHANNEL_SETTINGS = {
+    "welcome_channel": "Welcome messages",
+    "log_channel_messages": "Message deletes and edits",
+    "log_channel_members": "Joins and leaves",
+    "log_channel_moderation": "Kicks, bans and unbans",
+    "log_channel_server": "Role, channel and emoji changes",
+    "log_channel_voice": "Voice activity",
+}
+MIRROR_MAPPINGS = "mirror_mappings"  # List of MIRROR_MAPPINGS-style dicts whose source is in the guild
+SETTINGS = (*CHANNEL_SETTINGS, MIRROR_MAPPINGS)
+
+# config.py constants imported once into the store
+LEGACY_CONFIG = {
+    "welcome_channel": "WELCOME_CHANNEL_ID",
+    "log_channel_messages": "LOG_CHANNEL_MESSAGES",
+    "log_channel_members": "LOG_CHANNEL_MEMBERS",
+    "log_channel_moderation": "LOG_CHANNEL_MODERATION",
+    "log_channel_server": "LOG_CHANNEL_SERVER",
+    "log_channel_voice": "LOG_CHANNEL_VOICE",
+}
+IMPORTED_KEY = "guild_settings_imported"
+
+
+class GuildSettings:
+    """
+    Per-guild settings kept in SQLite and mirrored in a dict, so reads are a
+    plain lookup. Every change is written through and then announced through
+    `notify(guild_id, key, value)` (value None when a setting is reset).
+    """
+
+    def __init__(self, db, notify: Callable[[int, str, Any], None] = None):
+        self.db = db
+        self.notify = notify
+        self.logger = logging.getLogger("bot.guild_settings")
+        self._cache: dict[int, dict[str, Any]] = {}
+
+    async def load(self):
+        """Creates the table and reads every setting into memory."""
+        await self.db.execute(
+            "CREATE TABLE IF NOT EXISTS guild_settings ("
+            "guild_id INTEGER NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (guild_id, key))"
+        )
+        self._cache.clear()
+        for row in await self.db.fetchall("SELECT guild_id, key, value FROM guild_settings"):
+            self._cache.setdefault(row["guild_id"], {})[row["key"]] = json.loads(row["value"])
+        self.logger.info(f"Loaded settings for {len(self._cache)} guild(s).")
+
+    def get(self, guild_id: Optional[int], key: str, default=None):
+        return self._cache.get(guild_id, {}).get(key, default)
+
+    def for_guild(self, guild_id: int) -> dict[str, Any]:
+        return dict(self._cache.get(guild_id, {}))
+
+    def values(self, key: str) -> dict[int, Any]:
+        """guild ID -> value, for every guild that has the setting."""
+        return {guild_id: settings[key] for guild_id, settings in self._cache.items() if key in settings}
+
+    async def set(self, guild_id: int, key: str, value):
+        if key not in SETTINGS:
+            raise KeyError(f"Unknown setting: {key}")
+        await self.db.execute(
+            "INSERT OR REPLACE INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?)",
+            guild_id, key, json.dumps(value), durable=True,
+        )
+        self._cache.setdefault(guild_id, {})[key] = value
+        self._notify(guild_id, key, value)
+
+    async def reset(self, guild_id: int, key: str):
+        await self.db.execute("DELETE FROM guild_settings WHERE guild_id = ? AND key = ?", guild_id, key, durable=True)
+        if self._cache.get(guild_id, {}).pop(key, None) is not None:
+            self._notify(guild_id, key, None)
+
+    def _notify(self, guild_id: int, key: str, value):
+        if self.notify:
+            self.notify(guild_id, key, value)
+
+    async def import_legacy(self, config, guild_of: Callable[[int], Optional[int]]) -> int:
+        """
+        One-time copy of the channel IDs and mirror mappings in config.py into the
+        guilds that own those channels (`guild_of(channel_id)`). Channel settings
+        already in the store are kept; config mappings are added to the guild's list.
+        Each placed value is recorded, so a retry (for channels that could not be
+        placed yet) never brings back a setting an admin has since cleared.
+        Returns the number of settings imported.
+        """
+        await self.db.execute("CREATE TABLE IF NOT EXISTS bot_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if await self.db.fetchone("SELECT 1 FROM bot_state WHERE key = ?", IMPORTED_KEY):
+            return 0
+        done = {row["key"] for row in await self.db.fetchall("SELECT key FROM bot_state WHERE key LIKE ?", f"{IMPORTED_KEY}:%")}
+        placed = []
+
+        imported, unresolved = 0, 0
+        for key, name in LEGACY_CONFIG.items():
+            channel_id = getattr(config, name, None)
+            marker = f"{IMPORTED_KEY}:{name}"
+            if not channel_id or marker in done:
+                continue
+            guild_id = guild_of(int(channel_id))
+            if guild_id is None:
+                self.logger.warning(f"config.{name}: channel {channel_id} not found in any guild; not imported.")
+                unresolved += 1
+                continue
+            if self.get(guild_id, key) is None:
+                await self.set(guild_id, key, int(channel_id))
+                imported += 1
+            placed.append(marker)
+
+        mappings_by_guild: dict[int, list] = {}
+        for mapping in getattr(config, "MIRROR_MAPPINGS", None) or []:
+            source_channel_id = mapping.get("SOURCE_CHANNEL_ID")
+            marker = f"{IMPORTED_KEY}:MIRROR_MAPPINGS:{source_channel_id}:{mapping.get('TARGET_CHANNEL_ID')}"
+            if marker in done:
+                continue
+            guild_id = guild_of(int(source_channel_id)) if source_channel_id else None
+            if guild_id is None:
+                self.logger.warning(f"config.MIRROR_MAPPINGS: source channel {source_channel_id} not found; not imported.")
+                unresolved += 1
+                continue
+            mappings_by_guild.setdefault(guild_id, []).append(dict(mapping))
+            placed.append(marker)
+        for guild_id, mappings in mappings_by_guild.items():
+            current = self.get(guild_id, MIRROR_MAPPINGS) or []
+            merged = current + [mapping for mapping in mappings if mapping not in current]
+            if merged != current:
+                await self.set(guild_id, MIRROR_MAPPINGS, merged)
+                imported += 1
+
+        if placed:
+            await self.db.executemany("INSERT OR REPLACE INTO bot_state (key, value) VALUES (?, ?)",
+                                      [(marker, "1") for marker in placed], durable=True)
+        if unresolved:
+            self.logger.warning(f"{unresolved} config.py setting(s) could not be placed; they are retried next start.")
+        else:
+            await self.db.execute("INSERT OR REPLACE INTO bot_state (key, value) VALUES (?, ?)", IMPORTED_KEY, "1", durable=True)
+        self.logger.info(f"Imported {imported} setting(s) from config.py.")
+        return imported
@@ -0,0 +1,189 @@
+import collections
+import datetime
+import logging
+from typing import NamedTuple, Optional
+
+import discord
+
+
+def _today() -> str:
+    return discord.utils.utcnow().date().isoformat()
+
+
+def channel_kind(channel) -> str:
+    if isinstance(channel, discord.CategoryChannel):
+        return "category"
+    if isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+        return "voice"
+    if isinstance(channel, discord.ForumChannel):
+        return "forum"
+    return "text"
+
+
+class DailySnapshot(NamedTuple):
+    day: str  # ISO date (UTC)
+    members: int
+    humans: int
+    bots: int
+    joins: int
+    leaves: int
+
+
+class GuildStats:
+    """Live counts for one guild, adjusted by each gateway event."""
+
+    __slots__ = ("guild_id", "humans", "bots", "roles", "channels", "day", "joins", "leaves")
+
+    def __init__(self, guild_id: int, day: str):
+        self.guild_id = guild_id
+        self.humans = 0
+        self.bots = 0
+        self.roles: collections.Counter = collections.Counter()  # role ID -> members
+        self.channels: collections.Counter = collections.Counter()  # channel kind -> count
+        self.day = day
+        self.joins = 0
+        self.leaves = 0
+
+    @property
+    def members(self) -> int:
+        return self.humans + self.bots
+
+    def snapshot(self) -> DailySnapshot:
+        return DailySnapshot(self.day, self.members, self.humans, self.bots, self.joins, self.leaves)
+
+
+class GuildStatsEngine:
+    """
+    Per-guild member, role and channel counts, built once from the cache when a
+    guild becomes available and then kept current incrementally from gateway
+    events, so reading them costs O(1) regardless of guild size.
+    One row per guild and day is kept in SQLite for growth history.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.logger = logging.getLogger("bot.guild_stats")
+        self._stats: dict[int, GuildStats] = {}
+        self._finished: list[tuple[int, DailySnapshot]] = []  # Days rolled over since the last persist
+
+    async def create_tables(self):
+        await self.db.execute(
+            "CREATE TABLE IF NOT EXISTS guild_stats_daily ("
+            "guild_id INTEGER NOT NULL, day TEXT NOT NULL, members INTEGER NOT NULL, humans INTEGER NOT NULL, "
+            "bots INTEGER NOT NULL, joins INTEGER NOT NULL, leaves INTEGER NOT NULL, PRIMARY KEY (guild_id, day))"
+        )
+
+    def get(self, guild_id: int) -> Optional[GuildStats]:
+        return self._stats.get(guild_id)
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._stats
+
+    async def seed(self, guild: discord.Guild):
+        """Counts a guild from the cache (the only O(members) pass) and resumes today's join/leave totals."""
+        stats = GuildStats(guild.id, _today())
+        for member in guild.members:
+            self._add_member(stats, member)
+        for channel in guild.channels:
+            stats.channels[channel_kind(channel)] += 1
+
+        row = await self.db.fetchone(
+            "SELECT joins, leaves FROM guild_stats_daily WHERE guild_id = ? AND day = ?", guild.id, stats.day
+        )
+        if row:
+            stats.joins, stats.leaves = row
+        self._stats[guild.id] = stats
+        self.logger.info(f"Seeded stats for guild {guild.id}: {stats.members} members, {len(stats.roles)} roles.")
+
+    def remove_guild(self, guild_id: int):
+        self._stats.pop(guild_id, None)
+
+    def _current(self, guild_id: int) -> Optional[GuildStats]:
+        """Stats for the guild, with join/leave totals rolled over if the day changed."""
+        stats = self._stats.get(guild_id)
+        if stats is not None:
+            today = _today()
+            if stats.day != today:
+                self._finished.append((guild_id, stats.snapshot()))
+                stats.day, stats.joins, stats.leaves = today, 0, 0
+        return stats
+
+    @staticmethod
+    def _add_member(stats: GuildStats, member: discord.Member, sign: int = 1):
+        if member.bot:
+            stats.bots += sign
+        else:
+            stats.humans += sign
+        for role in member.roles:
+            if not role.is_default():
+                stats.roles[role.id] += sign
+
+    # --- Gateway events ---
+    def member_join(self, member: discord.Member):
+        stats = self._current(member.guild.id)
+        if stats is not None:
+            self._add_member(stats, member)
+            stats.joins += 1
+
+    def member_remove(self, member: discord.Member):
+        stats = self._current(member.guild.id)
+        if stats is not None:
+            self._add_member(stats, member, sign=-1)
+            stats.leaves += 1
+
+    def member_update(self, before: discord.Member, after: discord.Member):
+        stats = self._stats.get(after.guild.id)
+        if stats is None or before.roles == after.roles:
+            return
+        old, new = {role.id for role in before.roles}, {role.id for role in after.roles}
+        for role_id in new - old:
+            stats.roles[role_id] += 1
+        for role_id in old - new:
+            stats.roles[role_id] -= 1
+
+    def role_delete(self, role: discord.Role):
+        stats = self._stats.get(role.guild.id)
+        if stats is not None:
+            stats.roles.pop(role.id, None)
+
+    def channel_create(self, channel):
+        stats = self._stats.get(channel.guild.id)
+        if stats is not None:
+            stats.channels[channel_kind(channel)] += 1
+
+    def channel_delete(self, channel):
+        stats = self._stats.get(channel.guild.id)
+        if stats is not None:
+            stats.channels[channel_kind(channel)] -= 1
+
+    # --- Persistence ---
+    async def persist(self):
+        """Upserts today's row for every guild (and any day that just ended)."""
+        for guild_id in list(self._stats):
+            self._current(guild_id)
+        rows = [(guild_id, *snapshot) for guild_id, snapshot in self._finished]
+        rows += [(stats.guild_id, *stats.snapshot()) for stats in self._stats.values()]
+        self._finished = []
+        if rows:
+            await self.db.executemany(
+                "INSERT INTO guild_stats_daily (guild_id, day, members, humans, bots, joins, leaves) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (guild_id, day) DO UPDATE SET "
+                "members = excluded.members, humans = excluded.humans, bots = excluded.bots, "
+                "joins = excluded.joins, leaves = excluded.leaves",
+                rows,
+            )
+
+    async def history(self, guild_id: int, days: int) -> list[DailySnapshot]:
+        """Snapshots of the last `days` days, oldest first; today's comes from the live counts."""
+        stats = self._current(guild_id)
+        today = _today()
+        since = (datetime.date.fromisoformat(today) - datetime.timedelta(days=days - 1)).isoformat()
+        rows = await self.db.fetchall(
+            "SELECT day, members, humans, bots, joins, leaves FROM guild_stats_daily "
+            "WHERE guild_id = ? AND day >= ? AND day < ? ORDER BY day",
+            guild_id, since, today, read_only=True,
+        )
+        history = [DailySnapshot(*row) for row in rows]
+        if stats is not None:
+            history.append(stats.snapshot())
+        return history
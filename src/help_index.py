@@ -0,0 +1,115 @@
+import bisect
+import difflib
+from typing import NamedTuple
+
+import discord
+from discord.ext import commands
+
+# Commands listed per page of the general help
+HELP_PAGE_SIZE = 8
+# Autocomplete returns at most 25 choices
+MAX_SUGGESTIONS = 25
+
+
+class CommandEntry(NamedTuple):
+    name: str  # Qualified name, e.g. "profile start"
+    category: str
+    description: str
+    usage: str
+    aliases: tuple
+
+
+def _entry(command: commands.Command) -> CommandEntry:
+    params = [f"<{key}>" if value.default is value.empty else f"[{key}]" for key, value in command.clean_params.items()]
+    usage = " ".join([f"/{command.qualified_name}", *params])
+    return CommandEntry(
+        command.qualified_name,
+        command.cog_name or "Uncategorized",
+        command.description or command.short_doc or "No description provided.",
+        usage,
+        tuple(command.aliases),
+    )
+
+
+def _shorten(text: str, width: int) -> str:
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+class HelpIndex:
+    """
+    Snapshot of every visible command, taken once per extension load/unload:
+    the general help pages and each command's detail embed are rendered up
+    front, and a sorted name list serves prefix and fuzzy lookups.
+    """
+
+    def __init__(self, entries: list[CommandEntry], page_size: int = HELP_PAGE_SIZE):
+        self.entries = sorted(entries, key=lambda e: (e.category == "Uncategorized", e.category, e.name))
+        self._by_name: dict[str, CommandEntry] = {}
+        for entry in self.entries:
+            for alias in entry.aliases:
+                self._by_name.setdefault(alias.casefold(), entry)
+        for entry in self.entries:
+            self._by_name[entry.name.casefold()] = entry  # Real names win over aliases
+        self._names = sorted(self._by_name)
+        self._details = {entry.name: self._render_detail(entry) for entry in self.entries}
+        self.pages = self._render_pages(page_size)
+
+    @classmethod
+    def build(cls, bot: commands.Bot, page_size: int = HELP_PAGE_SIZE) -> "HelpIndex":
+        """Walks the command tree once (groups included)."""
+        return cls([_entry(command) for command in bot.walk_commands() if not command.hidden], page_size)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, name: str):
+        """Detail embed for a command name or alias (case-insensitive), or None."""
+        entry = self._by_name.get(" ".join(name.split()).casefold())
+        return self._details[entry.name] if entry else None
+
+    def suggest(self, query: str, limit: int = MAX_SUGGESTIONS) -> list[str]:
+        """Command names for a partial input: prefix matches, then substring, then close matches."""
+        query = " ".join(query.split()).casefold()
+        if not query:
+            return [entry.name for entry in self.entries[:limit]]
+
+        results: dict[str, None] = {}  # Ordered set of command names
+        start = bisect.bisect_left(self._names, query)
+        for key in self._names[start:]:
+            if not key.startswith(query) or len(results) >= limit:
+                break
+            results.setdefault(self._by_name[key].name)
+        for key in self._names:
+            if len(results) >= limit:
+                break
+            if query in key:
+                results.setdefault(self._by_name[key].name)
+        if len(results) < limit:
+            for key in difflib.get_close_matches(query, self._names, n=limit, cutoff=0.6):
+                results.setdefault(self._by_name[key].name)
+        return list(results)[:limit]
+
+    @staticmethod
+    def _render_detail(entry: CommandEntry) -> discord.Embed:
+        embed = discord.Embed(title=f"Command: {entry.name}", description=entry.description, color=discord.Color.blue())
+        if entry.aliases:
+            embed.add_field(name="Aliases", value=", ".join(entry.aliases), inline=False)
+        embed.add_field(name="Usage", value=f"`{entry.usage}`", inline=False)
+        embed.set_footer(text=entry.category)
+        return embed
+
+    def _render_pages(self, page_size: int) -> list[discord.Embed]:
+        chunks = [self.entries[i:i + page_size] for i in range(0, len(self.entries), page_size)] or [[]]
+        pages = []
+        for number, chunk in enumerate(chunks, start=1):
+            embed = discord.Embed(title="📚 Bot Commands", description="Here are the available commands:",
+                                  color=discord.Color.blue())
+            by_category: dict[str, list[str]] = {}
+            for entry in chunk:
+                by_category.setdefault(entry.category, []).append(f"`{entry.name}` · {_shorten(entry.description, 90)}")
+            for category, lines in by_category.items():
+                embed.add_field(name=category, value="\n".join(lines), inline=False)
+            embed.set_footer(text=f"Page {number}/{len(chunks)} · Type /help <command> for more info.")
+            pages.append(embed)
+        return pages
+
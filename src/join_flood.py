@@ -0,0 +1,104 @@
+import asyncio
+import collections
+import logging
+import time
+from typing import Awaitable, Callable
+
+import discord
+
+
+class JoinFloodGuard:
+    """
+    Per-guild sliding-window join counter that switches a guild to batched mode
+    during a join flood. While batched, joins are buffered and handed to `flush`
+    once per window as a single list; the guild returns to normal mode when a
+    window sees fewer than half the threshold.
+    """
+
+    def __init__(self, flush: Callable[[discord.Guild, list, float], Awaitable[None]], name: str,
+                 threshold: int = 10, window: float = 10.0, clock: Callable[[], float] = time.monotonic):
+        self.flush = flush
+        self.name = name
+        self.threshold = threshold
+        self.window = window
+        self.clock = clock
+        self.logger = logging.getLogger("bot.join_flood")
+
+        self._joins: dict[int, collections.deque] = {}  # guild ID -> join timestamps within the window
+        self._pending: dict[int, list[discord.Member]] = {}
+        self._guilds: dict[int, discord.Guild] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def rate(self, guild_id: int) -> float:
+        """Joins per minute over the last window."""
+        joins = self._joins.get(guild_id)
+        if not joins:
+            return 0.0
+        cutoff = self.clock() - self.window
+        while joins and joins[0] <= cutoff:
+            joins.popleft()
+        return len(joins) * 60.0 / self.window
+
+    def batching(self, guild_id: int) -> bool:
+        return guild_id in self._tasks
+
+    def add(self, member: discord.Member) -> bool:
+        """
+        Records a join. Returns True when the member was buffered for the next
+        batch, False when the caller should handle it on its own.
+        """
+        guild_id = member.guild.id
+        self._joins.setdefault(guild_id, collections.deque()).append(self.clock())
+        rate = self.rate(guild_id)
+
+        if not self.batching(guild_id):
+            if len(self._joins[guild_id]) < self.threshold:
+                return False
+            self.logger.warning(f"Join flood in guild {guild_id} ({rate:.0f} joins/min): batching {self.name}.")
+            self._tasks[guild_id] = asyncio.create_task(self._run(guild_id))
+
+        self._pending.setdefault(guild_id, []).append(member)
+        self._guilds[guild_id] = member.guild
+        return True
+
+    async def _run(self, guild_id: int):
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+                await self._flush(guild_id)
+                if self.rate(guild_id) * self.window / 60.0 < self.threshold / 2:
+                    break
+        finally:
+            self._tasks.pop(guild_id, None)
+        # Joins buffered while the last flush was sending (the guild was still batching then)
+        await self._flush(guild_id)
+        self.logger.info(f"Join flood in guild {guild_id} is over: {self.name} back to normal.")
+
+    async def _flush(self, guild_id: int):
+        members = self._pending.pop(guild_id, None)
+        if not members:
+            return
+        try:
+            await self.flush(self._guilds[guild_id], members, self.rate(guild_id))
+        except Exception as e:
+            self.logger.error(f"Could not send batched {self.name} for {len(members)} join(s) in guild {guild_id}: {e}")
+
+    async def close(self):
+        """Stops batching and flushes what is still buffered (called on unload)."""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        for guild_id in list(self._pending):
+            await self._flush(guild_id)
+
+
+def mention_list(members: list, limit: int = 1900) -> str:
+    """Comma-separated mentions that fit in `limit` characters, with a count of the rest."""
+    text = ""
+    for i, member in enumerate(members):
+        part = member.mention if not text else f", {member.mention}"
+        rest = f" and {len(members) - i} more"
+        if len(text) + len(part) + len(rest) > limit:
+            return text + rest
+        text += part
+    return text
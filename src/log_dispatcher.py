@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+
+import discord
+
+import metrics
+
+# Discord limits for a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+class LogDispatcher:
+    """
+    Per-channel queue that coalesces log embeds into as few messages as possible.
+    A channel's queue is flushed `interval` seconds after its first pending embed,
+    or straight away once a full message (10 embeds) is waiting.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.logger = logging.getLogger("bot.log_dispatcher")
+
+        # channel ID -> [(embed, enqueued_at)]
+        self._queues: dict[int, list[tuple[discord.Embed, float]]] = {}
+        self._channels: dict[int, discord.abc.Messageable] = {}
+        self._timers: dict[int, asyncio.Task] = {}
+        self._full: dict[int, asyncio.Event] = {}  # Wakes a channel's timer early
+        self._locks: dict[int, asyncio.Lock] = {}
+
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self.last_flush_latency = 0.0  # Seconds the oldest embed of the last batch waited
+        self.max_flush_latency = 0.0
+
+    def depth(self, channel_id: int = None) -> int:
+        """Number of embeds waiting (for one channel, or in total)."""
+        if channel_id is not None:
+            return len(self._queues.get(channel_id, ()))
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.depth(),
+            "sent_messages": self.sent_messages,
+            "sent_embeds": self.sent_embeds,
+            "last_flush_latency": self.last_flush_latency,
+            "max_flush_latency": self.max_flush_latency,
+        }
+
+    def submit(self, channel, embed: discord.Embed):
+        """Queues an embed for a channel; returns immediately."""
+        queue = self._queues.setdefault(channel.id, [])
+        queue.append((embed, time.monotonic()))
+        self._channels[channel.id] = channel
+
+        full = self._full.setdefault(channel.id, asyncio.Event())
+        if channel.id not in self._timers:
+            self._timers[channel.id] = asyncio.create_task(self._flush_later(channel.id))
+        if len(queue) >= MAX_EMBEDS_PER_MESSAGE:
+            full.set()
+
+    async def _flush_later(self, channel_id: int):
+        try:
+            await asyncio.wait_for(self._full[channel_id].wait(), timeout=self.interval)
+        except asyncio.TimeoutError:
+            pass
+        await self.flush(channel_id)
+
+    async def flush(self, channel_id: int):
+        """Sends everything queued for a channel, packed into as few messages as allowed."""
+        if self._timers.get(channel_id) is asyncio.current_task():
+            del self._timers[channel_id]
+            self._full[channel_id].clear()
+
+        async with self._locks.setdefault(channel_id, asyncio.Lock()):
+            channel = self._channels.get(channel_id)
+            queue = self._queues.get(channel_id)
+            while queue:
+                batch = self._take_batch(queue)
+                latency = time.monotonic() - batch[0][1]
+                try:
+                    await channel.send(embeds=[embed for embed, _ in batch])
+                    self.sent_messages += 1
+                    self.sent_embeds += len(batch)
+                    metrics.MESSAGES_SENT.labels("log_dispatcher", "ok").inc()
+                except discord.errors.Forbidden:
+                    self.logger.warning(f"Missing permissions to send message in channel {channel.name} ({channel.id}).")
+                    metrics.MESSAGES_SENT.labels("log_dispatcher", "forbidden").inc()
+                except Exception as e:
+                    self.logger.error(f"Could not send log to channel {channel.id}: {e}")
+                    metrics.MESSAGES_SENT.labels("log_dispatcher", "error").inc()
+
+                metrics.LOG_FLUSH_LATENCY.observe(latency)
+                self.last_flush_latency = latency
+                self.max_flush_latency = max(self.max_flush_latency, latency)
+
+    @staticmethod
+    def _take_batch(queue: list) -> list:
+        """Pops the longest prefix of the queue that fits in one message."""
+        count, chars = 0, 0
+        for embed, _ in queue[:MAX_EMBEDS_PER_MESSAGE]:
+            size = len(embed)
+            if count and chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            count += 1
+            chars += size
+        batch = queue[:count]
+        del queue[:count]
+        return batch
+
+    async def close(self):
+        """Flushes every queue now (called on shutdown)."""
+        for event in self._full.values():
+            event.set()
+        await asyncio.gather(*self._timers.values(), return_exceptions=True)
+        for channel_id in list(self._queues):
+            await self.flush(channel_id)
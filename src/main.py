@@ -1,3 +1,7 @@
+import time
+
+_PROCESS_START = time.perf_counter()  # Before the heavy imports, for the startup timeline
+
 import asyncio
 import logging
 import os
@@ -8,11 +12,21 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 
+import aiohttp
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
+import config
+import metrics
+from command_sync import sync_if_changed
 from database import DatabaseManager
+from extension_loader import discover, load_extensions
+from guild_settings import GuildSettings
+from startup_timeline import StartupTimeline
+
+timeline = StartupTimeline(started_at=_PROCESS_START)
+timeline.record("imports", _PROCESS_START)
 
 # 1. Load Environment Variables
 load_dotenv()
@@ -36,35 +50,62 @@ class Bot(commands.Bot):
             command_prefix="!",
             intents=intents,
             help_command=None,  # Custom help command can be added later
+            http_trace=metrics.http_trace(),  # REST request/429 metrics
+        )
+        slow_query_ms = getattr(config, "DB_SLOW_QUERY_MS", 100)
+        self.db = DatabaseManager(
+            os.getenv("DB_FILENAME", "database.db"),
+            slow_query_threshold=None if slow_query_ms is None else slow_query_ms / 1000,
         )
-        self.db = DatabaseManager(os.getenv("DB_FILENAME", "database.db"))
+        # Per-guild settings (channel IDs, mirror mappings); cogs listen for on_guild_settings_update
+        self.settings = GuildSettings(
+            self.db, notify=lambda guild_id, key, value: self.dispatch("guild_settings_update", guild_id, key, value)
+        )
+        self.http_session: aiohttp.ClientSession = None
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs):
+        # Time every listener of every cog (see metrics.instrument_cog)
+        metrics.instrument_cog(cog)
+        await super().add_cog(cog, **kwargs)
+
+    # Cogs that cache command metadata (e.g. the help index) listen for on_extensions_changed
+    async def load_extension(self, name: str, *, package: str = None):
+        await super().load_extension(name, package=package)
+        self.dispatch("extensions_changed", name)
+
+    async def unload_extension(self, name: str, *, package: str = None):
+        await super().unload_extension(name, package=package)
+        self.dispatch("extensions_changed", name)
+
+    async def reload_extension(self, name: str, *, package: str = None):
+        await super().reload_extension(name, package=package)
+        self.dispatch("extensions_changed", name)
 
     async def setup_hook(self):
         """
         Asynchronous setup code (loading extensions, syncing commands).
         """
-        await self.db.connect()
+        with timeline.step("database connect"):
+            await self.db.connect()
+        with timeline.step("settings load"):
+            await self.settings.load()
 
-        # Load Cogs
+        # Shared, connection-pooled HTTP session for cogs that download files
+        self.http_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300))
+
+        # Load Cogs concurrently; a cog waits only for the cogs named in its DEPENDS_ON
         cogs_dir = Path(__file__).parent / "cogs"
         if cogs_dir.exists():
-            for file in cogs_dir.glob("*.py"):
-                if file.name == "__init__.py":
-                    continue
-                
-                # Assuming running from src/ or src is in path
-                extension_name = f"cogs.{file.stem}"
-                try:
-                    await self.load_extension(extension_name)
-                    logger.info(f"Loaded extension: {extension_name}")
-                except Exception as e:
-                    logger.error(f"Failed to load extension {extension_name}: {e}")
-
-        # Sync Slash Commands
+            # Assuming running from src/ or src is in path
+            with timeline.step("extensions (total)"):
+                await load_extensions(self, discover(cogs_dir), timeline)
+
+        # Sync Slash Commands (only when the command tree changed, or FORCE_COMMAND_SYNC=1)
         # Note: Global sync can take up to an hour. For dev, sync to guild is faster.
         try:
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} command(s) globally.")
+            force = os.getenv("FORCE_COMMAND_SYNC", "").lower() in ("1", "true", "yes")
+            with timeline.step("command sync"):
+                await sync_if_changed(self.tree, self.db, self.application_id, force=force)
         except Exception as e:
             logger.error(f"Failed to sync commands: {e}")
 
@@ -86,14 +127,21 @@ class Bot(commands.Bot):
         logger.error(f"Error in command {ctx.command}: {error}", exc_info=True)
 
     async def close(self):
-        await self.db.close()
         await super().close()
+        if self.http_session:
+            await self.http_session.close()
+        await self.db.close()
 
     async def on_ready(self):
         logger.info(f"Logged in as {self.user} (ID: {self.user.id})")
         logger.info(f"Process ID: {os.getpid()}")
         logger.info("-------------------------------------------")
 
+        if not timeline.reported:  # on_ready fires again after reconnects
+            timeline.reported = True
+            timeline.mark("READY")
+            logger.info(timeline.report())
+
 async def main():
     token = os.getenv("DISCORD_TOKEN")
     if not token:
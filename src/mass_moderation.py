@@ -0,0 +1,120 @@
+import asyncio
+import csv
+import datetime
+import io
+import logging
+import re
+from typing import Iterable, NamedTuple
+
+import discord
+
+# Discord's bulk ban endpoint takes at most 200 users per call
+BULK_BAN_MAX = 200
+
+_USER_ID = re.compile(r"<@!?(\d{15,21})>|\b(\d{15,21})\b")
+
+logger = logging.getLogger("bot.mass_moderation")
+
+
+class TargetResult(NamedTuple):
+    user_id: int
+    result: str  # "banned", "kicked", "failed" or "skipped"
+    detail: str = ""
+
+
+def parse_user_ids(text: str) -> list[int]:
+    """Extracts user IDs and mentions from free text, in order, without duplicates."""
+    seen = {}
+    for mention, raw in _USER_ID.findall(text or ""):
+        seen.setdefault(int(mention or raw), None)
+    return list(seen)
+
+
+def select_members(guild: discord.Guild, joined_within: datetime.timedelta = None,
+                   account_younger_than: datetime.timedelta = None) -> list[discord.Member]:
+    """Members matching every selector given (from the member cache)."""
+    if joined_within is None and account_younger_than is None:
+        return []
+    now = discord.utils.utcnow()
+    selected = []
+    for member in guild.members:
+        if joined_within is not None and (member.joined_at is None or now - member.joined_at > joined_within):
+            continue
+        if account_younger_than is not None and now - member.created_at > account_younger_than:
+            continue
+        selected.append(member)
+    return selected
+
+
+def check_hierarchy(actor: discord.Member, guild: discord.Guild,
+                    user_ids: Iterable[int]) -> tuple[list[int], list[TargetResult]]:
+    """
+    Splits targets into the ones the moderator (and the bot) may act on and the
+    skipped ones. IDs of users not in the guild pass (they can still be banned).
+    """
+    allowed, skipped = [], []
+    me = guild.me
+    for user_id in user_ids:
+        member = guild.get_member(user_id)
+        if user_id in (actor.id, me.id):
+            skipped.append(TargetResult(user_id, "skipped", "cannot target yourself or the bot"))
+        elif user_id == guild.owner_id:
+            skipped.append(TargetResult(user_id, "skipped", "server owner"))
+        elif member is not None and member.top_role >= actor.top_role and actor.id != guild.owner_id:
+            skipped.append(TargetResult(user_id, "skipped", "role hierarchy"))
+        elif member is not None and member.top_role >= me.top_role:
+            skipped.append(TargetResult(user_id, "skipped", "above the bot's top role"))
+        else:
+            allowed.append(user_id)
+    return allowed, skipped
+
+
+async def bulk_ban(guild: discord.Guild, user_ids: list[int], reason: str,
+                   delete_message_seconds: int = 86400) -> list[TargetResult]:
+    """Bans users through the bulk ban endpoint, 200 per call."""
+    results = []
+    for start in range(0, len(user_ids), BULK_BAN_MAX):
+        chunk = user_ids[start:start + BULK_BAN_MAX]
+        try:
+            outcome = await guild.bulk_ban([discord.Object(user_id) for user_id in chunk], reason=reason,
+                                           delete_message_seconds=delete_message_seconds)
+        except discord.HTTPException as e:
+            logger.error(f"Bulk ban of {len(chunk)} user(s) in {guild.id} failed: {e}")
+            results.extend(TargetResult(user_id, "failed", str(e)) for user_id in chunk)
+            continue
+        results.extend(TargetResult(user.id, "banned") for user in outcome.banned)
+        results.extend(TargetResult(user.id, "failed", "rejected by Discord") for user in outcome.failed)
+    return results
+
+
+async def mass_kick(guild: discord.Guild, user_ids: list[int], reason: str, concurrency: int = 5) -> list[TargetResult]:
+    """Kicks members with at most `concurrency` requests in flight."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for user_id in user_ids:
+        queue.put_nowait(user_id)
+    results = []
+
+    async def worker():
+        while not queue.empty():
+            user_id = queue.get_nowait()
+            member = guild.get_member(user_id)
+            if member is None:
+                results.append(TargetResult(user_id, "skipped", "not a member"))
+                continue
+            try:
+                await member.kick(reason=reason)
+                results.append(TargetResult(user_id, "kicked"))
+            except discord.HTTPException as e:
+                results.append(TargetResult(user_id, "failed", str(e)))
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(user_ids)) or 1)))
+    return results
+
+
+def results_file(results: list[TargetResult], filename: str) -> discord.File:
+    """CSV of every target and what happened to it."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(("user_id", "result", "detail"))
+    writer.writerows(results)
+    return discord.File(io.BytesIO(out.getvalue().encode("utf-8")), filename=filename)
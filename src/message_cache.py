@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import discord
+
+# Rough per-record overhead (object headers, slots, dict entry) used for the byte budget
+RECORD_OVERHEAD = 200
+ATTACHMENT_OVERHEAD = 120
+
+
+class CachedAttachment:
+    """The parts of an attachment needed to log (and rescue) it after deletion."""
+    __slots__ = ("id", "filename", "url", "size", "content_type")
+
+    def __init__(self, attachment: discord.Attachment):
+        self.id = attachment.id
+        self.filename = attachment.filename
+        self.url = attachment.url
+        self.size = attachment.size
+        self.content_type = attachment.content_type
+
+
+class CachedMessage:
+    """Compact record of a message, kept so raw delete events can still be logged."""
+    __slots__ = ("id", "author_id", "channel_id", "content", "attachments", "nbytes")
+
+    def __init__(self, message: discord.Message):
+        self.id = message.id
+        self.author_id = message.author.id
+        self.channel_id = message.channel.id
+        self.content = message.content
+        self.attachments = tuple(CachedAttachment(a) for a in message.attachments)
+        self.nbytes = self._estimate_size()
+
+    def _estimate_size(self) -> int:
+        size = RECORD_OVERHEAD + len(self.content)
+        for attachment in self.attachments:
+            size += ATTACHMENT_OVERHEAD + len(attachment.filename) + len(attachment.url)
+        return size
+
+
+class MessageCache:
+    """
+    Bounded cache of recent messages (oldest evicted first), independent of
+    discord.py's own message cache and limited by both entry count and bytes.
+    """
+
+    def __init__(self, max_entries: int = 50000, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._records: OrderedDict[int, CachedMessage] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, message: discord.Message):
+        record = CachedMessage(message)
+        self.pop(record.id)
+        self._records[record.id] = record
+        self.total_bytes += record.nbytes
+        while self._records and (len(self._records) > self.max_entries or self.total_bytes > self.max_bytes):
+            _message_id, oldest = self._records.popitem(last=False)
+            self.total_bytes -= oldest.nbytes
+
+    def update_content(self, message_id: int, content: str):
+        record = self._records.get(message_id)
+        if record is not None:
+            delta = len(content) - len(record.content)
+            record.content = content
+            record.nbytes += delta
+            self.total_bytes += delta
+
+    def pop(self, message_id: int) -> Optional[CachedMessage]:
+        record = self._records.pop(message_id, None)
+        if record is not None:
+            self.total_bytes -= record.nbytes
+        return record
+
+    def pop_many(self, message_ids: Iterable[int]) -> list[CachedMessage]:
+        """Pops every known message of a bulk delete, oldest first."""
+        return [record for record in map(self.pop, sorted(message_ids)) if record is not None]
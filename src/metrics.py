@@ -0,0 +1,266 @@
+import bisect
+import functools
+import re
+import time
+from typing import Callable
+
+import aiohttp
+
+# Latency buckets (seconds) shared by the histograms below
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Registry:
+    """Holds every metric and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: list["_Metric"] = []
+
+    def register(self, metric: "_Metric"):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        registry.register(self)
+
+    def labels(self, *values):
+        """Returns the child for these label values (positional, in labelnames order)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self):
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {child.value}"
+
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Callable[[], float] = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Reads the value from `function` at scrape time instead."""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function else self.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def remove(self, *values):
+        self._children.pop(values, None)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            try:
+                value = child.get()
+            except Exception:
+                continue  # A callback whose owner is gone; skip rather than break the scrape
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {value}"
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS, registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self):
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += hits
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labelnames, values, 'le="' + le + '"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, values)} {child.sum}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, values)} {child.count}"
+
+
+# --- Metrics ---
+GATEWAY_EVENTS = Counter("discord_gateway_events_total", "Gateway dispatch events received.", ("event",))
+GATEWAY_LATENCY = Gauge("discord_gateway_latency_seconds", "Heartbeat latency to the gateway.")
+
+LISTENER_SECONDS = Histogram("bot_listener_duration_seconds", "Time spent in cog event listeners.", ("cog", "event"))
+LISTENER_ERRORS = Counter("bot_listener_errors_total", "Cog event listeners that raised.", ("cog", "event"))
+
+REST_REQUESTS = Counter("discord_rest_requests_total", "REST requests by route and status.", ("method", "route", "status"))
+REST_SECONDS = Histogram("discord_rest_request_duration_seconds", "REST request latency.", ("method", "route"))
+REST_RATE_LIMITS = Counter("discord_rest_rate_limits_total", "REST responses with status 429.", ("route", "scope"))
+
+MESSAGES_SENT = Counter("bot_messages_sent_total", "Messages sent by the bot's send helpers.", ("sender", "outcome"))
+LOG_EVENTS = Counter("bot_log_events_total", "Log embeds submitted, by log channel.", ("channel",))
+LOG_FLUSH_LATENCY = Histogram("bot_log_flush_latency_seconds", "Time a batched log embed waited before being sent.")
+QUEUE_DEPTH = Gauge("bot_queue_depth", "Items waiting in the bot's send queues.", ("queue",))
+
+
+# --- Listener instrumentation ---
+def instrument_cog(cog) -> None:
+    """
+    Wraps every listener of a cog (before it is added to the bot) so its
+    duration and errors are recorded. Listeners are replaced on the instance,
+    which is what Cog._inject/_eject register and remove.
+    """
+    cog_name = cog.qualified_name
+    for event, method_name in cog.__cog_listeners__:
+        listener = getattr(cog, method_name)
+        if getattr(listener, "__metrics_wrapped__", False):
+            continue
+        setattr(cog, method_name, _timed_listener(listener, LISTENER_SECONDS.labels(cog_name, event),
+                                                  LISTENER_ERRORS.labels(cog_name, event)))
+
+
+def _timed_listener(listener, seconds, errors):
+    @functools.wraps(listener)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await listener(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - start)
+
+    wrapper.__metrics_wrapped__ = True
+    return wrapper
+
+
+# --- REST instrumentation ---
+_API_PREFIX = re.compile(r"^/api/v\d+")
+_TOKEN_AFTER = ("webhooks", "interactions")  # /webhooks/{id}/{token}, /interactions/{id}/{token}
+
+
+def normalize_route(host: str, path: str) -> str:
+    """Collapses IDs, tokens and emoji in a REST path so routes can be used as labels."""
+    if host not in ("discord.com", "discordapp.com"):
+        return host or "unknown"  # CDN and media downloads: one label per host
+    parts = _API_PREFIX.sub("", path).strip("/").split("/")
+    for i, part in enumerate(parts):
+        if part.isdigit():
+            parts[i] = "{id}"
+        elif i >= 2 and parts[i - 2] in _TOKEN_AFTER and parts[i - 1] == "{id}":
+            parts[i] = "{token}"
+        elif i >= 1 and parts[i - 1] == "reactions":
+            parts[i] = "{emoji}"
+    return "/" + "/".join(parts)
+
+
+def http_trace() -> aiohttp.TraceConfig:
+    """TraceConfig for discord.py's HTTP session (pass as Bot(http_trace=...))."""
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        _record_request(params.method, params.url, params.response.status, params.response.headers, context)
+
+    async def on_request_exception(session, context, params):
+        _record_request(params.method, params.url, "error", {}, context)
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_request_end.append(on_request_end)
+    trace.on_request_exception.append(on_request_exception)
+    return trace
+
+
+def _record_request(method: str, url, status, headers, context):
+    route = normalize_route(url.host, url.path)
+    REST_REQUESTS.labels(method, route, str(status)).inc()
+    start = getattr(context, "start", None)
+    if start is not None:
+        REST_SECONDS.labels(method, route).observe(time.perf_counter() - start)
+    if status == 429:
+        REST_RATE_LIMITS.labels(route, headers.get("X-RateLimit-Scope", "unknown")).inc()
@@ -0,0 +1,67 @@
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+from typing import Optional
+
+
+class Profiler:
+    """
+    On-demand cProfile session for the event loop thread.
+    Nothing is installed until start(), so there is no overhead while it is off.
+    A session stops by itself after its window; the report is kept for dump().
+    """
+
+    def __init__(self, top: int = 40):
+        self.top = top
+        self.logger = logging.getLogger("bot.profiler")
+        self._profile: Optional[cProfile.Profile] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.started_at: Optional[float] = None
+        self.last_report: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def start(self, duration: float):
+        """Starts profiling for `duration` seconds; raises RuntimeError if already running."""
+        if self.running:
+            raise RuntimeError("A profiling session is already running.")
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # Another profiler owns the hook
+            raise RuntimeError(str(e)) from e
+        self._profile = profile
+        self.started_at = time.monotonic()
+        self._timer = asyncio.get_running_loop().call_later(duration, self._expire)
+        self.logger.info(f"Profiling started for {duration:.0f}s.")
+
+    def stop(self, sort: str = "cumulative") -> str:
+        """Stops the session and returns (and keeps) its report."""
+        if not self.running:
+            raise RuntimeError("No profiling session is running.")
+        self._profile.disable()
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        elapsed = time.monotonic() - self.started_at
+        self.last_report = self._format(self._profile, elapsed, sort)
+        self._profile = None
+        self.logger.info(f"Profiling stopped after {elapsed:.1f}s.")
+        return self.last_report
+
+    def _expire(self):
+        self._timer = None
+        if self.running:
+            self.stop()
+
+    def _format(self, profile: cProfile.Profile, elapsed: float, sort: str) -> str:
+        out = io.StringIO()
+        out.write(f"Profile of the event loop thread over {elapsed:.1f}s, top {self.top} by {sort} time\n\n")
+        stats = pstats.Stats(profile, stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(self.top)
+        return out.getvalue()
@@ -0,0 +1,165 @@
+import asyncio
+import datetime
+import logging
+import re
+import time
+from typing import Awaitable, Callable, Optional
+
+import discord
+
+# Discord's bulk delete endpoint takes 2-100 messages, none older than 14 days
+BULK_DELETE_MAX = 100
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)  # Margin for clock skew
+
+
+class PurgeFilter:
+    """Which messages a purge deletes; every criterion given must match."""
+
+    def __init__(self, user_id: int = None, bots_only: bool = False, contains: str = None,
+                 has_attachment: bool = False, pattern: re.Pattern = None):
+        self.user_id = user_id
+        self.bots_only = bots_only
+        self.contains = contains.casefold() if contains else None
+        self.has_attachment = has_attachment
+        self.pattern = pattern
+
+    def matches(self, message: discord.Message) -> bool:
+        if message.pinned:
+            return False
+        if self.user_id is not None and message.author.id != self.user_id:
+            return False
+        if self.bots_only and not message.author.bot:
+            return False
+        if self.has_attachment and not message.attachments:
+            return False
+        if self.contains and self.contains not in message.content.casefold():
+            return False
+        if self.pattern and not self.pattern.search(message.content):
+            return False
+        return True
+
+    def describe(self) -> str:
+        parts = []
+        if self.user_id is not None:
+            parts.append(f"from <@{self.user_id}>")
+        if self.bots_only:
+            parts.append("from bots")
+        if self.contains:
+            parts.append(f'containing "{self.contains}"')
+        if self.has_attachment:
+            parts.append("with attachments")
+        if self.pattern:
+            parts.append(f"matching `{self.pattern.pattern}`")
+        return ", ".join(parts) or "all messages"
+
+
+class PurgeJob:
+    """
+    Streams a channel's history (newest first) and deletes matching messages:
+    recent ones in bulk chunks of up to 100, older ones one at a time through a
+    paced worker. Only one chunk and a bounded queue are held in memory.
+    """
+
+    def __init__(self, channel, purge_filter: PurgeFilter, amount: int, before=None, scan_limit: int = None,
+                 single_delete_interval: float = 1.0, progress_interval: float = 2.0,
+                 on_progress: Callable[["PurgeJob"], Awaitable[None]] = None):
+        self.channel = channel
+        self.filter = purge_filter
+        self.amount = amount
+        self.before = before
+        self.scan_limit = scan_limit
+        self.single_delete_interval = single_delete_interval
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress
+        self.logger = logging.getLogger("bot.purge")
+
+        self.scanned = 0
+        self.matched = 0
+        self.deleted = 0
+        self.failed = 0
+        self.cancelled = False
+        self.error: Optional[str] = None
+        self.finished = False
+        self._last_progress = 0.0
+        self._old_queue: asyncio.Queue = asyncio.Queue(maxsize=BULK_DELETE_MAX)
+
+    def cancel(self):
+        self.cancelled = True
+
+    async def run(self) -> "PurgeJob":
+        worker = asyncio.create_task(self._single_delete_worker())
+        chunk: list[discord.Message] = []
+        bulk_cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        try:
+            async for message in self.channel.history(limit=self.scan_limit, before=self.before):
+                if self.cancelled or self.error or self.matched >= self.amount:
+                    break
+                self.scanned += 1
+                if self.filter.matches(message):
+                    self.matched += 1
+                    if message.created_at > bulk_cutoff:
+                        chunk.append(message)
+                        if len(chunk) == BULK_DELETE_MAX:
+                            await self._bulk_delete(chunk)
+                            chunk = []
+                    else:
+                        await self._old_queue.put(message)  # Waits while the worker is behind
+                await self._report()
+
+            if chunk and not self.cancelled and not self.error:
+                await self._bulk_delete(chunk)
+            if not self.cancelled:
+                await self._old_queue.join()
+        except discord.Forbidden:
+            self.error = "Missing permissions to read history or delete messages."
+        except discord.HTTPException as e:
+            self.logger.error(f"Purge in {self.channel.id} stopped: {e}")
+            self.error = f"Discord error: {e.text or e.status}"
+        finally:
+            worker.cancel()
+            self.finished = True
+            await self._report(force=True)
+        return self
+
+    async def _bulk_delete(self, chunk: list):
+        try:
+            await self.channel.delete_messages(chunk)
+            self.deleted += len(chunk)
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException as e:
+            # A message deleted meanwhile fails the whole call; retry them one by one
+            self.logger.warning(f"Bulk delete of {len(chunk)} message(s) in {self.channel.id} failed ({e}); deleting singly.")
+            for message in chunk:
+                await self._old_queue.put(message)
+        await self._report()
+
+    async def _single_delete_worker(self):
+        while True:
+            message = await self._old_queue.get()
+            try:
+                if not self.cancelled and not self.error:
+                    await message.delete()
+                    self.deleted += 1
+                    await asyncio.sleep(self.single_delete_interval)
+            except discord.NotFound:
+                pass  # Already gone
+            except discord.Forbidden:
+                self.error = "Missing permissions to delete messages."
+            except discord.HTTPException as e:
+                self.failed += 1
+                self.logger.warning(f"Could not delete message {message.id}: {e}")
+            finally:
+                self._old_queue.task_done()
+
+    async def _report(self, force: bool = False):
+        if self.on_progress is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        try:
+            await self.on_progress(self)
+        except discord.HTTPException as e:
+            self.logger.debug(f"Could not update purge status: {e}")
@@ -0,0 +1,91 @@
+import functools
+import re
+from typing import Optional
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last one catches the rest
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(sql: str) -> str:
+    """
+    Reduces a statement to its shape, so calls differing only in literals or
+    in the length of an IN (...) list are counted together.
+    Cached: the SQL text is almost always a constant of the calling code.
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("(?, ...)", sql)
+
+
+class StatementStats:
+    """Call count, total/max time and latency histogram of one normalized statement."""
+    __slots__ = ("statement", "count", "total", "max", "buckets", "plan_logged_at")
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.count = 0
+        self.total = 0.0  # Seconds
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+        self.plan_logged_at: Optional[float] = None
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        elapsed_ms = elapsed * 1000
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound (seconds) of the bucket holding the q-th quantile; max() for the last bucket."""
+        rank = q * self.count
+        seen = 0
+        for bound, hits in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += hits
+            if hits and seen >= rank:
+                return self.max if bound == float("inf") else min(bound / 1000, self.max)
+        return self.max
+
+
+class QueryStats:
+    """Per-statement timing collected by DatabaseManager."""
+
+    def __init__(self, max_statements: int = 500):
+        self.max_statements = max_statements
+        self._statements: dict[str, StatementStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def record(self, sql: str, elapsed: float) -> StatementStats:
+        key = normalize(sql)
+        stats = self._statements.get(key)
+        if stats is None:
+            if len(self._statements) >= self.max_statements:
+                key = "(other)"  # Keeps ad-hoc SQL from growing the table without bound
+                stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = StatementStats(key)
+        stats.add(elapsed)
+        return stats
+
+    def top(self, limit: int = 10, key: str = "total") -> list[StatementStats]:
+        """Statements sorted by `key` ("total", "count", "max" or "mean"), highest first."""
+        return sorted(self._statements.values(), key=lambda s: getattr(s, key), reverse=True)[:limit]
+
+    def reset(self):
+        self._statements.clear()
@@ -0,0 +1,37 @@
+import contextlib
+import time
+
+
+class StartupTimeline:
+    """
+    Records how long each startup phase took, relative to process start,
+    so slow imports or extensions show up in one report.
+    """
+
+    def __init__(self, started_at: float = None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.steps: list[tuple[str, float, float]] = []  # (label, offset, duration) in seconds
+        self.reported = False
+
+    def record(self, label: str, start: float, end: float = None):
+        end = time.perf_counter() if end is None else end
+        self.steps.append((label, start - self.started_at, end - start))
+
+    @contextlib.contextmanager
+    def step(self, label: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(label, start)
+
+    def mark(self, label: str):
+        """Records a point in time (e.g. READY) as a step lasting since process start."""
+        self.record(label, self.started_at)
+
+    def report(self) -> str:
+        width = max((len(label) for label, _, _ in self.steps), default=0)
+        lines = ["Startup timeline (offset from process start, duration):"]
+        for label, offset, duration in self.steps:
+            lines.append(f"  {label:<{width}}  +{offset * 1000:8.1f} ms  {duration * 1000:8.1f} ms")
+        return "\n".join(lines)
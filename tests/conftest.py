@@ -0,0 +1,16 @@
+import importlib
+import os
+import sys
+
+# Cogs import their siblings as top-level modules (e.g. `import config`), the way
+# `src/main.py` runs them. Put `src` on the path and alias those modules to the
+# `src.*` ones the tests import, so both names refer to the same module object.
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC = os.path.join(ROOT, 'src')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, SRC)
+
+for _file in sorted(os.listdir(SRC)):
+    _name, _ext = os.path.splitext(_file)
+    if _ext == ".py" and _name != "main":
+        sys.modules.setdefault(_name, importlib.import_module(f"src.{_name}"))
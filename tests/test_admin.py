@@ -0,0 +1,75 @@
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from discord.ext import commands
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cogs.admin import Admin
+from src.profiler import Profiler
+from src.query_stats import QueryStats
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+async def test_dbstats_lists_top_statements():
+    """Test that /dbstats shows statements ordered by total time."""
+    # Arrange
+    bot = MagicMock(spec=commands.Bot)
+    bot.db = MagicMock()
+    bot.db.slow_query_threshold = 0.1
+    bot.db.query_stats = QueryStats()
+    bot.db.query_stats.record("SELECT * FROM mirror_messages WHERE source_message_id = 1", 0.004)
+    bot.db.query_stats.record("INSERT INTO warnings VALUES (1)", 0.5)
+    cog = Admin(bot)
+    ctx = MagicMock()
+    ctx.send = AsyncMock()
+
+    # Act
+    await cog.dbstats.callback(cog, ctx)
+
+    # Assert
+    embed = ctx.send.call_args.kwargs['embed']
+    assert "INSERT INTO warnings VALUES (?)" in embed.fields[0].value
+    assert embed.fields[0].name.startswith("1. 500 ms total")
+    assert "100 ms" in embed.description
+
+async def test_profile_session_reports_top_functions():
+    """Test that /profile start then stop returns a report file, and dump re-sends it."""
+    # Arrange
+    bot = MagicMock(spec=commands.Bot)
+    cog = Admin(bot)
+    ctx = MagicMock()
+    ctx.send = AsyncMock()
+
+    def busy_work():
+        return sum(i * i for i in range(10000))
+
+    # Act
+    await cog.profile_start.callback(cog, ctx, seconds=60)
+    busy_work()
+    await cog.profile_stop.callback(cog, ctx)
+    stop_file = ctx.send.call_args.kwargs['file']
+    await cog.profile_dump.callback(cog, ctx)
+    dump_file = ctx.send.call_args.kwargs['file']
+
+    # Assert
+    report = stop_file.fp.read().decode()
+    assert report.startswith("Profile of the event loop thread")
+    assert "busy_work" in report
+    assert dump_file.filename == "profile.txt"
+    assert not cog.profiler.running
+
+async def test_profile_window_expires_on_its_own():
+    """Test that a session stops by itself once its window has passed."""
+    profiler = Profiler()
+
+    profiler.start(0.01)
+    await asyncio.sleep(0.05)
+
+    assert not profiler.running
+    assert profiler.last_report is not None
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+import pytest_asyncio
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.attachment_cache import AttachmentCache
+from src.database import DatabaseManager
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+def make_message(message_id: int, *payloads: bytes):
+    message = MagicMock(spec=discord.Message)
+    message.id = message_id
+    message.channel.id = 111
+    message.author.id = 12345
+    message.attachments = []
+    for index, data in enumerate(payloads):
+        attachment = MagicMock(spec=discord.Attachment)
+        attachment.id = message_id * 10 + index
+        attachment.filename = f"image{index}.png"
+        attachment.content_type = "image/png"
+        attachment.size = len(data)
+        attachment.read = AsyncMock(return_value=data)
+        message.attachments.append(attachment)
+    return message
+
+@pytest_asyncio.fixture
+async def cache(tmp_path):
+    cache = AttachmentCache(str(tmp_path), max_bytes=10, max_age=3600, channel_ids=[111])
+    await cache.load()
+    return cache
+
+async def test_store_and_pop_files_from_disk(cache):
+    """Test that a stored image is served back from disk, keyed by attachment ID."""
+    message = make_message(1, b"abcd")
+    assert cache.should_cache(message)
+
+    await cache.store(message)
+    files = cache.pop_files(1)
+
+    assert list(files) == [10]
+    assert files[10].filename == "image0.png"
+    assert files[10].fp.read() == b"abcd"
+    files[10].close()
+    assert cache.pop_files(1) == {}  # Forgotten once served
+
+async def test_identical_images_are_stored_once(cache):
+    """Test that the cache is content-addressed."""
+    await cache.store(make_message(1, b"same"))
+    await cache.store(make_message(2, b"same"))
+
+    assert cache.total_bytes == 4
+    assert len(cache._blobs) == 1
+
+async def test_least_recently_used_blob_is_evicted_over_budget(cache, tmp_path):
+    """Test that the byte budget evicts the oldest blob and counts the eviction."""
+    await cache.store(make_message(1, b"111111"))
+    await cache.store(make_message(2, b"222222"))
+
+    assert cache.total_bytes == 6
+    assert cache.stats["evictions"] == 1
+    assert cache.pop_files(1) == {}
+    files = cache.pop_files(2)
+    assert list(files) == [20]
+    files[20].close()
+    blobs = [name for _root, _dirs, names in os.walk(tmp_path) for name in names]
+    assert len(blobs) == 1
+
+async def test_message_index_survives_a_restart(tmp_path):
+    """Test that a new cache on the same directory and database still knows earlier messages."""
+    db = DatabaseManager(str(tmp_path / "bot.db"))
+    await db.connect()
+    directory = str(tmp_path / "blobs")
+    before = AttachmentCache(directory, max_bytes=100, max_age=3600, channel_ids=[111], db=db)
+    await before.load()
+    await before.store(make_message(1, b"abcd"))
+    await before.store(make_message(2, b"efgh"))
+    before.discard(2)
+    await before.flush()
+
+    after = AttachmentCache(directory, max_bytes=100, max_age=3600, channel_ids=[111], db=db)
+    await after.load()
+
+    assert after.get(1) == (12345, [(10, "image0.png", 4, "image/*")])
+    assert after.get(2) is None
+    files = after.pop_files(1)
+    assert files[10].fp.read() == b"abcd"
+    files[10].close()
+    await after.flush()
+    assert await db.fetchall("SELECT * FROM attachment_cache_index") == []
+    await db.close()
+
+async def test_concurrent_stores_of_the_same_image_count_its_bytes_once(tmp_path):
+    """Test that a raid posting one image many times at once does not inflate the byte budget."""
+    cache = AttachmentCache(str(tmp_path), max_bytes=10000, max_age=3600, channel_ids=[111])
+    await cache.load()
+
+    await asyncio.gather(*(cache.store(make_message(i, b"x" * 1000)) for i in range(1, 6)))
+
+    assert len(cache._blobs) == 1
+    assert cache.total_bytes == 1000
+    assert all(cache.get(i) for i in range(1, 6))
@@ -0,0 +1,70 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.attachments import AttachmentPipeline, StagedAttachment
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+def make_attachment(filename: str, data: bytes):
+    attachment = MagicMock(spec=discord.Attachment)
+    attachment.filename = filename
+    attachment.description = None
+    attachment.size = len(data)
+    attachment.url = f"https://cdn.example.com/{filename}"
+    attachment.is_spoiler.return_value = False
+    attachment.read = AsyncMock(return_value=data)
+    return attachment
+
+async def test_stage_skips_attachments_over_budget():
+    """Test that attachments beyond the per-message byte budget are not downloaded."""
+    pipeline = AttachmentPipeline(max_bytes_per_message=10)
+    small = make_attachment("small.png", b"12345")
+    big = make_attachment("big.png", b"x" * 20)
+
+    staged, skipped = await pipeline.stage([small, big])
+
+    assert [s.filename for s in staged] == ["small.png"]
+    assert skipped == [big]
+    big.read.assert_not_called()
+
+async def test_staged_attachment_is_reusable_across_uploads():
+    """Test that one download yields independent files for every target."""
+    pipeline = AttachmentPipeline()
+    attachment = make_attachment("image.png", b"payload")
+
+    staged, _ = await pipeline.stage([attachment])
+    first, second = staged[0].to_file(), staged[0].to_file()
+
+    assert first.fp.read() == b"payload"
+    assert second.fp.read() == b"payload"
+    attachment.read.assert_called_once()
+
+async def test_spilled_attachment_is_removed_on_cleanup(tmp_path):
+    """Test that large attachments are staged on disk and deleted on cleanup."""
+    pipeline = AttachmentPipeline(spool_threshold=4)
+    attachment = make_attachment("large.bin", b"0123456789")
+
+    async def fake_download(att):
+        path = tmp_path / "spilled"
+        path.write_bytes(b"0123456789")
+        return str(path)
+    pipeline._download_to_disk = fake_download
+
+    staged, _ = await pipeline.stage([attachment])
+    path = staged[0].path
+
+    assert staged[0].data is None and os.path.exists(path)
+    file = staged[0].to_file()
+    assert file.fp.read() == b"0123456789"
+    file.close()
+    staged[0].cleanup()
+    assert not os.path.exists(path)
+    attachment.read.assert_not_called()
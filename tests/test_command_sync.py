@@ -0,0 +1,57 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+import pytest_asyncio
+from discord import app_commands
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.command_sync import sync_if_changed, tree_fingerprint
+from src.database import DatabaseManager
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+APPLICATION_ID = 42
+
+def make_tree(*names):
+    client = MagicMock()
+    client._connection._command_tree = None
+    tree = app_commands.CommandTree(client)
+    for name in names:
+        async def callback(interaction: discord.Interaction):
+            pass
+        tree.add_command(app_commands.Command(name=name, description=f"{name} command", callback=callback))
+    tree.sync = AsyncMock(return_value=[object()] * len(names))
+    return tree
+
+@pytest_asyncio.fixture
+async def db():
+    db = DatabaseManager(":memory:")
+    await db.connect()
+    yield db
+    await db.close()
+
+async def test_fingerprint_ignores_registration_order():
+    """Test that the fingerprint depends on the commands, not the order they were added."""
+    assert tree_fingerprint(make_tree("ping", "warn"), APPLICATION_ID) == tree_fingerprint(make_tree("warn", "ping"), APPLICATION_ID)
+    assert tree_fingerprint(make_tree("ping"), APPLICATION_ID) != tree_fingerprint(make_tree("ping", "warn"), APPLICATION_ID)
+
+async def test_sync_only_when_tree_changes(db):
+    """Test that an unchanged tree skips the sync, a changed one syncs, and force always syncs."""
+    # Act
+    first = await sync_if_changed(make_tree("ping"), db, APPLICATION_ID)
+    unchanged_tree = make_tree("ping")
+    unchanged = await sync_if_changed(unchanged_tree, db, APPLICATION_ID)
+    changed = await sync_if_changed(make_tree("ping", "warn"), db, APPLICATION_ID)
+    forced_tree = make_tree("ping", "warn")
+    forced = await sync_if_changed(forced_tree, db, APPLICATION_ID, force=True)
+
+    # Assert
+    assert (first, unchanged, changed, forced) == (True, False, True, True)
+    unchanged_tree.sync.assert_not_awaited()
+    forced_tree.sync.assert_awaited_once()
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database import DatabaseManager
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+def committed_count(path) -> int:
+    """Counts rows as seen by a separate connection (i.e. only committed rows)."""
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "test.db"), commit_interval=60, commit_batch_size=3)
+    await db.connect()
+    await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)", durable=True)
+    yield db
+    await db.close()
+
+async def test_connect_enables_wal(db):
+    """Test that the connection runs in WAL mode."""
+    row = await db.fetchone("PRAGMA journal_mode")
+    assert row[0] == "wal"
+
+async def test_writes_are_group_committed(db):
+    """Test that writes are committed together once the batch size is reached."""
+    await db.execute("INSERT INTO items (name) VALUES (?)", "a")
+    await db.execute("INSERT INTO items (name) VALUES (?)", "b")
+    assert committed_count(db.db_name) == 0
+    assert (await db.fetchone("SELECT COUNT(*) FROM items"))[0] == 2  # Visible to this connection
+
+    await db.execute("INSERT INTO items (name) VALUES (?)", "c")
+    assert committed_count(db.db_name) == 3
+
+async def test_durable_write_and_executemany(db):
+    """Test that durable=True commits immediately and executemany inserts every row."""
+    await db.executemany("INSERT INTO items (name) VALUES (?)", [("x",), ("y",)], durable=True)
+    assert committed_count(db.db_name) == 2
+
+    await db.execute("INSERT INTO items (name) VALUES (?)", "z")
+    await db.commit()
+    assert committed_count(db.db_name) == 3
+
+async def test_failed_statement_keeps_other_pending_writes(db):
+    """Test that a statement-level error does not drop the writes grouped with it."""
+    await db.execute("INSERT INTO items (id, name) VALUES (1, 'a')")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        await db.execute("INSERT INTO items (id, name) VALUES (1, 'duplicate')")
+    await db.commit()
+
+    assert committed_count(db.db_name) == 1
+
+async def test_failed_commit_rolls_back_and_recovers(db, monkeypatch, caplog):
+    """Test that a failed commit is rolled back and logged, and later writes still commit."""
+    # Arrange
+    await db.execute("INSERT INTO items (name) VALUES ('lost')")
+    real_commit = db.conn.commit
+    monkeypatch.setattr(db.conn, "commit", AsyncMock(side_effect=sqlite3.OperationalError("disk I/O error")))
+
+    # Act
+    with caplog.at_level(logging.ERROR, logger="bot.database"), pytest.raises(sqlite3.OperationalError):
+        await db.commit()
+    monkeypatch.setattr(db.conn, "commit", real_commit)
+    await db.execute("INSERT INTO items (name) VALUES ('kept')", durable=True)
+
+    # Assert
+    assert "rolling back 1 pending write(s)" in caplog.text
+    with sqlite3.connect(db.db_name) as conn:
+        assert [row[0] for row in conn.execute("SELECT name FROM items")] == ["kept"]
+
+async def test_reader_pool_opens_paths_with_uri_characters(tmp_path):
+    """Test that ?, # and % in the file name do not send the readers to another file."""
+    db = DatabaseManager(str(tmp_path / "odd?name#1%.db"))
+    await db.connect()
+    await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    await db.execute("INSERT INTO items (name) VALUES ('a')", durable=True)
+
+    rows = await db.fetchall("SELECT name FROM items", read_only=True)
+
+    assert [row["name"] for row in rows] == ["a"]
+    await db.close()
+
+async def test_iterate_streams_rows_in_chunks(db):
+    """Test that iterate() yields every committed row across several chunks."""
+    await db.executemany("INSERT INTO items (name) VALUES (?)", [(f"item{i}",) for i in range(25)], durable=True)
+
+    names = [row["name"] async for row in db.iterate("SELECT name FROM items ORDER BY id", chunk_size=10)]
+
+    assert names == [f"item{i}" for i in range(25)]
+
+async def test_read_only_queries_use_the_reader_pool(db):
+    """Test that read-only fetches run on a pooled connection that cannot write."""
+    # Arrange
+    await db.execute("INSERT INTO items (name) VALUES (?)", "committed", durable=True)
+    await db.execute("INSERT INTO items (name) VALUES (?)", "pending")
+
+    # Act
+    rows = await db.fetchall("SELECT name FROM items", read_only=True)
+
+    # Assert
+    assert [row["name"] for row in rows] == ["committed"]  # Pool only sees committed data
+    async with db.reader() as reader:
+        assert reader is not db.conn
+        with pytest.raises(sqlite3.OperationalError):
+            await reader.execute("INSERT INTO items (name) VALUES ('nope')")
+
+async def test_in_memory_database_reads_through_the_writer():
+    """Test that an in-memory database has no pool and reads through the writer."""
+    db = DatabaseManager(":memory:")
+    await db.connect()
+    await db.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    await db.execute("INSERT INTO items (name) VALUES (?)", "a")
+
+    rows = [row["name"] async for row in db.iterate("SELECT name FROM items")]
+
+    assert rows == ["a"]
+    async with db.reader() as reader:
+        assert reader is db.conn
+    await db.close()
+
+async def test_slow_queries_are_logged_with_plan(db, caplog):
+    """Test that statements over the threshold are timed, logged, and explained."""
+    # Arrange
+    db.slow_query_threshold = 0
+    caplog.set_level(logging.WARNING, logger="bot.database")
+
+    # Act
+    await db.fetchall("SELECT name FROM items WHERE name = ?", "a")
+    await asyncio.gather(*db._plan_tasks)
+
+    # Assert
+    assert "SELECT name FROM items WHERE name = ?" in {stats.statement for stats in db.query_stats.top()}
+    assert "Slow query" in caplog.text
+    assert "Query plan for SELECT name FROM items WHERE name = ?:\nSCAN items" in caplog.text
@@ -0,0 +1,92 @@
+import asyncio
+import datetime
+import os
+import sys
+
+import pytest
+import pytest_asyncio
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database import DatabaseManager
+from src.event_archive import EventArchive, fts_query, parse_duration
+
+GUILD_ID = 1
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+@pytest_asyncio.fixture
+async def archive(tmp_path):
+    """Fixture for an archive on a file database (so searches use the reader pool)."""
+    db = DatabaseManager(str(tmp_path / "archive.db"))
+    await db.connect()
+    archive = EventArchive(db, retention_days=30)
+    await archive.create_tables()
+    yield archive
+    await db.close()
+
+async def add_events(archive):
+    archive.record("message_delete", GUILD_ID, 10, 100, "free nitro link here", NOW - datetime.timedelta(days=2))
+    archive.record("message_delete", GUILD_ID, 20, 100, "hello world", NOW - datetime.timedelta(hours=1))
+    archive.record("message_edit", GUILD_ID, 10, 200, "nitro giveaway\nnothing to see", NOW)
+    archive.record("message_delete", 2, 10, 300, "nitro in another guild", NOW)
+    archive.record("member_join", GUILD_ID, 30, None, "OldUser", NOW - datetime.timedelta(days=40))
+    await archive.flush()
+    await archive.db.commit()
+
+def test_parse_duration_and_fts_query():
+    """Test the duration parser and that FTS queries treat input as literal words."""
+    assert parse_duration("12h") == datetime.timedelta(hours=12)
+    assert parse_duration("2W") == datetime.timedelta(weeks=2)
+    assert parse_duration("soon") is None
+    assert fts_query('free "nitro OR') == '"free" """nitro" "OR"'
+
+@pytest.mark.asyncio
+async def test_search_filters_combine(archive):
+    """Test that guild, user, channel, type, time and text filters all apply."""
+    await add_events(archive)
+
+    by_text = await archive.search(GUILD_ID, text="nitro")
+    by_user = await archive.search(GUILD_ID, user_id=10, event_type="message_delete")
+    recent = await archive.search(GUILD_ID, since=NOW - datetime.timedelta(days=1))
+    by_channel = await archive.search(GUILD_ID, channel_id=100, until=NOW - datetime.timedelta(days=1))
+
+    assert [e.event_type for e in by_text] == ["message_edit", "message_delete"]  # Newest first, this guild only
+    assert [e.content for e in by_user] == ["free nitro link here"]
+    assert {e.user_id for e in recent} == {10, 20}
+    assert [e.user_id for e in by_channel] == [10]
+
+@pytest.mark.asyncio
+async def test_prune_drops_old_events_and_their_index_entries(archive):
+    """Test that retention pruning removes old rows from the table and the FTS index."""
+    await add_events(archive)
+
+    deleted = await archive.prune(chunk_size=1)
+    await archive.db.commit()
+
+    assert deleted == 1
+    assert await archive.search(GUILD_ID, text="OldUser") == []
+    row = await archive.db.fetchone("SELECT COUNT(*) FROM log_events_fts WHERE log_events_fts MATCH 'OldUser'")
+    assert row[0] == 0
+
+@pytest.mark.asyncio
+async def test_prune_counts_only_its_own_deletes(archive):
+    """Test that writes interleaved with a prune do not change its count or end it early."""
+    # Arrange
+    old = NOW - datetime.timedelta(days=40)
+    for i in range(7):
+        archive.record("member_join", GUILD_ID, 100 + i, None, f"Old{i}", old)
+    await archive.flush()
+
+    async def other_writes():
+        for i in range(20):
+            await archive.db.execute("INSERT INTO bot_state_probe (n) VALUES (?)", i)
+
+    await archive.db.execute("CREATE TABLE bot_state_probe (n INTEGER)")
+
+    # Act
+    deleted, _ = await asyncio.gather(archive.prune(chunk_size=2), other_writes())
+
+    # Assert
+    assert deleted == 7
+    assert (await archive.db.fetchone("SELECT COUNT(*) FROM log_events"))[0] == 0
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.extension_loader import discover, load_extensions
+from src.startup_timeline import StartupTimeline
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+class FakeBot:
+    """Records load order and how many extensions were loading at once."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.loaded = []
+        self.active = 0
+        self.max_active = 0
+
+    async def load_extension(self, name):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if name in self.failing:
+            raise RuntimeError("boom")
+        self.loaded.append(name)
+
+async def test_discover_reads_declared_dependencies(tmp_path):
+    """Test that DEPENDS_ON is read from cog files without importing them."""
+    (tmp_path / "__init__.py").write_text("")
+    (tmp_path / "base.py").write_text("import does_not_exist\n")
+    (tmp_path / "child.py").write_text('DEPENDS_ON = ("cogs.base",)\nimport does_not_exist\n')
+
+    assert discover(tmp_path) == {"cogs.base": (), "cogs.child": ("cogs.base",)}
+
+async def test_independent_extensions_load_concurrently_and_dependents_wait():
+    """Test that extensions overlap unless one depends on another."""
+    # Arrange
+    bot = FakeBot()
+    timeline = StartupTimeline()
+    extensions = {"cogs.a": (), "cogs.b": (), "cogs.c": ("cogs.a",)}
+
+    # Act
+    failures = await load_extensions(bot, extensions, timeline)
+
+    # Assert
+    assert failures == {}
+    assert bot.max_active == 2
+    assert bot.loaded.index("cogs.c") > bot.loaded.index("cogs.a")
+    assert {label for label, _, _ in timeline.steps} == {"extension cogs.a", "extension cogs.b", "extension cogs.c"}
+
+async def test_failures_propagate_to_dependents_and_cycles_are_rejected():
+    """Test that a failed, unknown or cyclic dependency fails its dependents without hanging."""
+    bot = FakeBot(failing={"cogs.base"})
+    extensions = {
+        "cogs.base": (),
+        "cogs.child": ("cogs.base",),
+        "cogs.orphan": ("cogs.missing",),
+        "cogs.x": ("cogs.y",),
+        "cogs.y": ("cogs.x",),
+        "cogs.ok": (),
+    }
+
+    failures = await asyncio.wait_for(load_extensions(bot, extensions), timeout=1)
+
+    assert set(failures) == {"cogs.base", "cogs.child", "cogs.orphan", "cogs.x", "cogs.y"}
+    assert "cogs.base failed" in str(failures["cogs.child"])
+    assert bot.loaded == ["cogs.ok"]
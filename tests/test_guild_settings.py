@@ -0,0 +1,120 @@
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database import DatabaseManager
+from src.guild_settings import MIRROR_MAPPINGS, GuildSettings
+from src.cogs.mirror import Mirror
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+LEGACY = SimpleNamespace(
+    WELCOME_CHANNEL_ID=101,
+    LOG_CHANNEL_MESSAGES=102,
+    LOG_CHANNEL_MEMBERS=0,  # Unset
+    LOG_CHANNEL_MODERATION=201,
+    MIRROR_MAPPINGS=[
+        {"SOURCE_CHANNEL_ID": 103, "TARGET_CHANNEL_ID": 900},
+        {"SOURCE_CHANNEL_ID": 202, "TARGET_CHANNEL_ID": 901, "DELIVERY": "webhook"},
+    ],
+)
+CHANNEL_GUILDS = {101: 1, 102: 1, 103: 1, 201: 2, 202: 2}
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    """Fixture for a file database."""
+    db = DatabaseManager(str(tmp_path / "settings.db"))
+    await db.connect()
+    yield db
+    await db.close()
+
+async def test_changes_are_cached_persisted_and_announced(db):
+    """Test that set/reset update the cache, survive a reload and notify listeners."""
+    # Arrange
+    notify = MagicMock()
+    settings = GuildSettings(db, notify=notify)
+    await settings.load()
+
+    # Act
+    await settings.set(1, "log_channel_voice", 555)
+    await settings.set(2, MIRROR_MAPPINGS, [{"SOURCE_CHANNEL_ID": 1, "TARGET_CHANNEL_ID": 2}])
+    await settings.reset(1, "log_channel_voice")
+    await settings.reset(1, "log_channel_voice")  # Already gone: no second notification
+    reloaded = GuildSettings(db)
+    await reloaded.load()
+
+    # Assert
+    assert settings.get(1, "log_channel_voice") is None
+    assert [c.args for c in notify.call_args_list] == [
+        (1, "log_channel_voice", 555),
+        (2, MIRROR_MAPPINGS, [{"SOURCE_CHANNEL_ID": 1, "TARGET_CHANNEL_ID": 2}]),
+        (1, "log_channel_voice", None),
+    ]
+    assert reloaded.values(MIRROR_MAPPINGS) == {2: [{"SOURCE_CHANNEL_ID": 1, "TARGET_CHANNEL_ID": 2}]}
+    with pytest.raises(KeyError):
+        await settings.set(1, "nope", 1)
+
+async def test_legacy_config_is_imported_once_into_owning_guilds(db):
+    """Test that config.py IDs land in the guild that owns each channel, without overwriting edits."""
+    # Arrange
+    settings = GuildSettings(db)
+    await settings.load()
+    await settings.set(2, "log_channel_moderation", 777)  # Edited before the import
+
+    # Act
+    imported = await settings.import_legacy(LEGACY, CHANNEL_GUILDS.get)
+    again = await settings.import_legacy(LEGACY, CHANNEL_GUILDS.get)
+
+    # Assert
+    assert imported == 4 and again == 0
+    assert settings.for_guild(1) == {
+        "welcome_channel": 101,
+        "log_channel_messages": 102,
+        MIRROR_MAPPINGS: [{"SOURCE_CHANNEL_ID": 103, "TARGET_CHANNEL_ID": 900}],
+    }
+    assert settings.get(2, "log_channel_moderation") == 777
+    assert settings.get(2, MIRROR_MAPPINGS)[0]["DELIVERY"] == "webhook"
+
+async def test_unresolved_channels_retry_the_import(db):
+    """Test that the import is not marked done while a channel cannot be placed."""
+    settings = GuildSettings(db)
+    await settings.load()
+
+    assert await settings.import_legacy(LEGACY, {101: 1}.get) == 1
+    assert await settings.import_legacy(LEGACY, CHANNEL_GUILDS.get) == 4
+
+async def test_retried_import_does_not_restore_cleared_settings(db):
+    """Test that a retry only places what is still unplaced, not settings an admin cleared after the first run."""
+    settings = GuildSettings(db)
+    await settings.load()
+    await settings.import_legacy(LEGACY, {101: 1, 103: 1}.get)
+    await settings.reset(1, "welcome_channel")
+    await settings.reset(1, MIRROR_MAPPINGS)
+
+    assert await settings.import_legacy(LEGACY, CHANNEL_GUILDS.get) == 3
+    assert settings.get(1, "welcome_channel") is None
+    assert settings.get(1, MIRROR_MAPPINGS) is None
+    assert settings.get(1, "log_channel_messages") == 102
+    assert settings.get(2, MIRROR_MAPPINGS) == [LEGACY.MIRROR_MAPPINGS[1]]
+
+async def test_mirror_routes_follow_setting_changes(db):
+    """Test that the mirror rebuilds its routes from every guild's mappings when one changes."""
+    bot = MagicMock()
+    bot.settings = GuildSettings(db)
+    await bot.settings.load()
+    mirror = Mirror(bot)
+    await bot.settings.set(1, MIRROR_MAPPINGS, [{"SOURCE_CHANNEL_ID": 10, "TARGET_CHANNEL_ID": 20}])
+    await bot.settings.set(2, MIRROR_MAPPINGS, [{"SOURCE_CHANNEL_ID": 30, "TARGET_CHANNEL_ID": 40}])
+
+    await mirror.on_guild_settings_update(2, MIRROR_MAPPINGS, None)
+
+    assert sorted(mirror.routes) == [10, 30]
+    assert mirror.routes[30][0].target_channel_id == 40
@@ -0,0 +1,107 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+import pytest_asyncio
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import guild_stats
+from src.database import DatabaseManager
+from src.guild_stats import GuildStatsEngine
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+GUILD_ID = 1
+
+def make_role(role_id):
+    role = MagicMock(spec=discord.Role)
+    role.id = role_id
+    role.is_default.return_value = role_id == GUILD_ID  # @everyone shares the guild's ID
+    role.guild.id = GUILD_ID
+    return role
+
+EVERYONE, MODS, VERIFIED = make_role(GUILD_ID), make_role(10), make_role(11)
+
+def make_member(member_id, bot=False, roles=()):
+    member = MagicMock(spec=discord.Member)
+    member.id = member_id
+    member.bot = bot
+    member.roles = [EVERYONE, *roles]
+    member.guild.id = GUILD_ID
+    return member
+
+def make_guild(members):
+    guild = MagicMock(spec=discord.Guild)
+    guild.id = GUILD_ID
+    guild.members = members
+    guild.channels = [MagicMock(spec=discord.TextChannel), MagicMock(spec=discord.TextChannel),
+                      MagicMock(spec=discord.VoiceChannel), MagicMock(spec=discord.CategoryChannel)]
+    return guild
+
+@pytest_asyncio.fixture
+async def engine(tmp_path, monkeypatch):
+    """Fixture for a stats engine on a file database, pinned to a fixed day."""
+    monkeypatch.setattr(guild_stats, "_today", lambda: "2026-03-10")
+    db = DatabaseManager(str(tmp_path / "stats.db"))
+    await db.connect()
+    engine = GuildStatsEngine(db)
+    await engine.create_tables()
+    yield engine
+    await db.close()
+
+async def test_counts_are_seeded_then_kept_current(engine):
+    """Test that member, bot, role and channel counts follow gateway events after the initial count."""
+    # Arrange
+    members = [make_member(100, roles=[MODS]), make_member(101, roles=[VERIFIED]), make_member(102, bot=True)]
+    await engine.seed(make_guild(members))
+
+    # Act
+    newcomer = make_member(103)
+    engine.member_join(newcomer)
+    engine.member_update(newcomer, make_member(103, roles=[VERIFIED]))
+    engine.member_remove(members[0])
+    engine.role_delete(MODS)
+    channel = MagicMock(spec=discord.VoiceChannel)
+    channel.guild.id = GUILD_ID
+    engine.channel_create(channel)
+
+    # Assert
+    stats = engine.get(GUILD_ID)
+    assert (stats.members, stats.humans, stats.bots) == (3, 2, 1)
+    assert dict(stats.roles) == {VERIFIED.id: 2}
+    assert stats.channels["text"] == 2 and stats.channels["voice"] == 2 and stats.channels["category"] == 1
+    assert (stats.joins, stats.leaves) == (1, 1)
+
+async def test_day_rollover_is_persisted_and_history_includes_today(engine, monkeypatch):
+    """Test that a finished day keeps its totals, today restarts at zero, and history merges both."""
+    await engine.seed(make_guild([make_member(100)]))
+    engine.member_join(make_member(101))
+    engine.member_join(make_member(102))
+    await engine.persist()
+
+    monkeypatch.setattr(guild_stats, "_today", lambda: "2026-03-11")
+    engine.member_remove(make_member(102))
+    await engine.persist()
+    await engine.db.commit()
+
+    history = await engine.history(GUILD_ID, days=7)
+    assert [(day.day, day.members, day.joins, day.leaves) for day in history] == [
+        ("2026-03-10", 3, 2, 0),
+        ("2026-03-11", 2, 0, 1),
+    ]
+
+async def test_seed_resumes_todays_totals(engine):
+    """Test that a restart keeps the day's join/leave totals instead of starting over."""
+    await engine.seed(make_guild([make_member(100)]))
+    engine.member_join(make_member(101))
+    await engine.persist()
+
+    restarted = GuildStatsEngine(engine.db)
+    await restarted.seed(make_guild([make_member(100), make_member(101)]))
+
+    assert restarted.get(GUILD_ID).joins == 1
@@ -0,0 +1,107 @@
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+import pytest_asyncio
+from discord.ext import commands
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cogs.admin import Admin
+from src.cogs.help import Help, HelpView
+from src.help_index import HelpIndex
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+class Tools(commands.Cog):
+    @commands.hybrid_command(name="ping", aliases=["latency"], description="Replies with pong.")
+    async def ping(self, ctx):
+        pass
+
+    @commands.hybrid_command(name="purge", description="Deletes messages.")
+    async def purge(self, ctx, amount: int, user: discord.User = None):
+        pass
+
+    @commands.command(name="secret", hidden=True)
+    async def secret(self, ctx):
+        pass
+
+def make_tool_command(i):
+    @commands.command(name=f"tool{i:02d}", description=f"Tool number {i}.")
+    async def tool(ctx):
+        pass
+    return tool
+
+@pytest_asyncio.fixture
+async def bot():
+    """Fixture for an offline bot with a few cogs loaded."""
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none(), help_command=None)
+    await bot.add_cog(Tools())
+    await bot.add_cog(Admin(bot))
+    await bot.add_cog(Help(bot))
+    yield bot
+    await bot.close()
+
+async def test_index_lists_visible_commands_with_usage(bot):
+    """Test that groups are walked, hidden commands skipped and usage pre-rendered."""
+    index = HelpIndex.build(bot)
+
+    names = [entry.name for entry in index.entries]
+    assert "profile start" in names and "secret" not in names
+    embed = index.lookup("PURGE")
+    assert embed.title == "Command: purge"
+    assert embed.fields[0].value == "`/purge <amount> [user]`"
+    assert index.lookup("latency").title == "Command: ping"
+    assert index.lookup("profile   start") is not None
+    assert index.lookup("nope") is None
+
+async def test_suggestions_rank_prefix_then_substring_then_fuzzy(bot):
+    """Test the autocomplete ordering."""
+    index = HelpIndex.build(bot)
+
+    assert index.suggest("pro")[:4] == ["profile", "profile dump", "profile start", "profile stop"]
+    assert index.suggest("stats") == ["dbstats"]
+    assert index.suggest("prge") == ["purge"]
+    assert len(index.suggest("")) == min(25, len(index))
+
+async def test_pages_respect_page_size(bot):
+    """Test that pages hold at most the page size and are numbered."""
+    for i in range(30):
+        bot.add_command(make_tool_command(i))
+
+    index = HelpIndex.build(bot, page_size=8)
+
+    assert len(index.pages) == -(-len(index) // 8)
+    assert all(sum(field.value.count("\n") + 1 for field in page.fields) <= 8 for page in index.pages)
+    assert index.pages[-1].fields[-1].name == "Uncategorized"
+    assert index.pages[0].footer.text.startswith(f"Page 1/{len(index.pages)}")
+
+    view = HelpView(index.pages, author_id=1)
+    assert view.previous_page.disabled and not view.next_page.disabled
+
+async def test_help_reuses_index_until_extensions_change(bot):
+    """Test that /help does not rebuild the index per call, and a load/unload invalidates it."""
+    # Arrange
+    cog = bot.get_cog("Help")
+    ctx = MagicMock()
+    ctx.author.id = 1
+    ctx.send = AsyncMock()
+
+    # Act
+    await cog.help.callback(cog, ctx)
+    first = cog.index
+    await cog.help.callback(cog, ctx, command_name="ping")
+    same = cog.index
+    await cog.on_extensions_changed("cogs.tools")
+
+    # Assert
+    assert same is first
+    assert cog.index is not first
+    assert ctx.send.call_args_list[0].kwargs == {"embed": first.pages[0]}  # One page: no buttons
+    assert ctx.send.call_args_list[1].kwargs["embed"].title == "Command: ping"
+    choices = await cog.command_name_autocomplete(MagicMock(), "db")
+    assert [choice.value for choice in choices] == ["dbstats"]
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.join_flood import JoinFloodGuard, mention_list
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_member(member_id, guild_id=1):
+    member = MagicMock(spec=discord.Member)
+    member.id = member_id
+    member.mention = f"<@{member_id}>"
+    member.guild.id = guild_id
+    return member
+
+async def test_guard_batches_above_threshold_and_reports_rate():
+    """Test that joins past the threshold are buffered and flushed together with the window's rate."""
+    # Arrange
+    clock = FakeClock()
+    flush = AsyncMock()
+    guard = JoinFloodGuard(flush, "test", threshold=5, window=0.05, clock=clock)
+
+    # Act
+    handled_alone = [not guard.add(make_member(i)) for i in range(12)]
+    await asyncio.sleep(0.07)
+
+    # Assert
+    assert handled_alone == [True] * 4 + [False] * 8
+    flush.assert_awaited_once()
+    guild, members, rate = flush.call_args.args
+    assert [m.id for m in members] == list(range(4, 12))
+    assert rate == pytest.approx(12 * 60 / 0.05)
+    await guard.close()
+
+async def test_guard_switches_back_when_rate_drops():
+    """Test that a guild leaves batched mode once a window sees fewer than half the threshold."""
+    clock = FakeClock()
+    flush = AsyncMock()
+    guard = JoinFloodGuard(flush, "test", threshold=4, window=0.05, clock=clock)
+    for i in range(4):
+        guard.add(make_member(i))
+    assert guard.batching(1)
+
+    clock.now += 1  # The window slides past every recorded join
+    await asyncio.sleep(0.07)
+
+    assert not guard.batching(1)
+    assert guard.rate(1) == 0.0
+    assert not guard.add(make_member(99))
+
+async def test_join_during_the_last_flush_is_not_left_behind():
+    """Test that a member buffered while the final batch is sending is flushed once batching ends."""
+    clock = FakeClock()
+    batches = []
+    guard = None
+
+    async def flush(guild, members, rate):
+        batches.append([m.id for m in members])
+        if len(batches) == 1:
+            clock.now += 1  # The flood is over after this window...
+            guard.add(make_member(99))  # ...but one more join lands while it is sent
+
+    guard = JoinFloodGuard(flush, "test", threshold=4, window=0.05, clock=clock)
+    for i in range(4):
+        guard.add(make_member(i))
+    await asyncio.sleep(0.07)
+
+    assert not guard.batching(1)
+    assert batches == [[3], [99]]  # The first three joins were handled alone
+    await guard.close()
+
+async def test_guard_tracks_guilds_separately_and_flushes_on_close():
+    """Test that one guild's flood does not batch another's joins, and close() sends what is buffered."""
+    flush = AsyncMock()
+    guard = JoinFloodGuard(flush, "test", threshold=3, window=60, clock=FakeClock())
+    for i in range(5):
+        guard.add(make_member(i, guild_id=1))
+
+    assert not guard.add(make_member(50, guild_id=2))
+    await guard.close()
+
+    flush.assert_awaited_once()
+    assert len(flush.call_args.args[1]) == 3
+
+async def test_mention_list_counts_what_does_not_fit():
+    """Test that a long mention list is cut at the limit with a count of the rest."""
+    members = [make_member(100000000000000000 + i) for i in range(200)]
+
+    text = mention_list(members, limit=500)
+
+    assert len(text) <= 500
+    shown = text.count("<@")
+    assert text.endswith(f" and {200 - shown} more")
+    assert mention_list(members[:2]) == f"{members[0].mention}, {members[1].mention}"
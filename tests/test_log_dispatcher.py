@@ -0,0 +1,61 @@
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock
+
+import discord
+import pytest
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.log_dispatcher import LogDispatcher
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+def make_channel(channel_id: int = 1):
+    channel = AsyncMock(spec=discord.TextChannel)
+    channel.id = channel_id
+    return channel
+
+async def test_embeds_are_packed_ten_per_message():
+    """Test that a burst of embeds goes out in messages of at most 10 embeds, in order."""
+    dispatcher = LogDispatcher(interval=60)
+    channel = make_channel()
+
+    for i in range(25):
+        dispatcher.submit(channel, discord.Embed(title=str(i)))
+    assert dispatcher.depth() == 25
+    await dispatcher.close()
+
+    sizes = [len(call.kwargs["embeds"]) for call in channel.send.call_args_list]
+    assert sizes == [10, 10, 5]
+    titles = [e.title for call in channel.send.call_args_list for e in call.kwargs["embeds"]]
+    assert titles == [str(i) for i in range(25)]
+    assert dispatcher.stats()["queue_depth"] == 0
+    assert dispatcher.sent_embeds == 25
+
+async def test_full_batch_flushes_before_the_interval():
+    """Test that a full batch does not wait for the flush interval."""
+    dispatcher = LogDispatcher(interval=60)
+    channel = make_channel()
+
+    for i in range(10):
+        dispatcher.submit(channel, discord.Embed(title=str(i)))
+    await asyncio.sleep(0.01)
+
+    channel.send.assert_called_once()
+    await dispatcher.close()
+
+async def test_batch_respects_total_embed_size():
+    """Test that embeds are split when a message would exceed 6000 characters."""
+    dispatcher = LogDispatcher(interval=60)
+    channel = make_channel()
+
+    for _ in range(3):
+        dispatcher.submit(channel, discord.Embed(description="x" * 2500))
+    await dispatcher.close()
+
+    sizes = [len(call.kwargs["embeds"]) for call in channel.send.call_args_list]
+    assert sizes == [2, 1]
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 import datetime
@@ -12,6 +13,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from src.cogs.logger import Logger
 from src import config
+from src.database import DatabaseManager
+from src.guild_settings import LEGACY_CONFIG
 
 # Pytest-asyncio mark
 pytestmark = pytest.mark.asyncio
@@ -21,6 +24,9 @@ def mock_bot():
     """Fixture for a mocked bot."""
     bot = MagicMock(spec=commands.Bot)
     bot.get_channel = MagicMock()
+    # Every guild resolves to the channel IDs in config.py
+    bot.settings = MagicMock()
+    bot.settings.get.side_effect = lambda guild_id, key, default=None: getattr(config, LEGACY_CONFIG[key])
     return bot
 
 @pytest.fixture
@@ -58,13 +64,14 @@ async def test_on_message_delete_sends_log(mock_utcnow, logger_cog, mock_bot):
 
     # --- Act ---
     await logger_cog.on_message_delete(mock_message)
+    await logger_cog.dispatcher.close()
 
     # --- Assert ---
     mock_bot.get_channel.assert_called_once_with(config.LOG_CHANNEL_MESSAGES)
     mock_log_channel.send.assert_called_once()
     
     _args, kwargs = mock_log_channel.send.call_args
-    sent_embed = kwargs['embed']
+    [sent_embed] = kwargs['embeds']
 
     assert sent_embed.title == "🗑️ Message Deleted"
     assert sent_embed.color == discord.Color.red()
@@ -92,14 +99,349 @@ async def test_on_guild_channel_update_sends_log(logger_cog, mock_bot):
 
     # --- Act ---
     await logger_cog.on_guild_channel_update(mock_before_channel, mock_after_channel)
+    await logger_cog.dispatcher.close()
 
     # --- Assert ---
     mock_bot.get_channel.assert_called_once_with(config.LOG_CHANNEL_SERVER)
     mock_log_channel.send.assert_called_once()
 
     _args, kwargs = mock_log_channel.send.call_args
-    sent_embed = kwargs['embed']
+    [sent_embed] = kwargs['embeds']
 
     assert sent_embed.title == "Channel Updated"
     assert "Name changed: `#old-name` → `#new-name`" in sent_embed.description
-    assert f"ID: {mock_after_channel.id}" in sent_embed.footer.text
\ No newline at end of file
+    assert f"ID: {mock_after_channel.id}" in sent_embed.footer.text
+
+async def test_rescue_images_uses_shared_session_within_size_cap(logger_cog, mock_bot):
+    """
+    Test that deleted images are fetched over the bot's shared session, skipping
+    non-images and anything beyond the per-log size cap.
+    """
+    # --- Arrange ---
+    logger_cog.rescue_max_bytes = 100
+
+    def make_attachment(filename, content_type, size):
+        attachment = MagicMock(spec=discord.Attachment)
+        attachment.filename = filename
+        attachment.content_type = content_type
+        attachment.size = size
+        attachment.url = f"https://cdn.example.com/{filename}"
+        return attachment
+
+    attachments = [
+        make_attachment("a.png", "image/png", 60),
+        make_attachment("notes.txt", "text/plain", 10),
+        make_attachment("b.png", "image/png", 60),  # Over the remaining budget
+    ]
+
+    response = MagicMock()
+    response.status = 200
+    response.read = AsyncMock(return_value=b"png-bytes")
+    request = MagicMock()
+    request.__aenter__ = AsyncMock(return_value=response)
+    request.__aexit__ = AsyncMock(return_value=False)
+    mock_bot.http_session = MagicMock()
+    mock_bot.http_session.get.return_value = request
+
+    # --- Act ---
+    files = await logger_cog._rescue_images(67890, 111, attachments)
+
+    # --- Assert ---
+    assert [f.filename for f in files] == ["a.png"]
+    mock_bot.http_session.get.assert_called_once()
+    assert mock_bot.http_session.get.call_args.args == ("https://cdn.example.com/a.png",)
+
+def make_kick_entry(guild_id, target_id, executor_id, reason):
+    entry = MagicMock(spec=discord.AuditLogEntry)
+    entry.action = discord.AuditLogAction.kick
+    entry.guild = MagicMock(spec=discord.Guild, id=guild_id)
+    entry.target = MagicMock(spec=discord.Member, id=target_id)
+    entry.user_id = executor_id
+    entry.reason = reason
+    return entry
+
+def make_removed_member(guild_id, member_id):
+    member = MagicMock(spec=discord.Member)
+    member.id = member_id
+    member.__str__.return_value = f"User{member_id}"
+    member.display_avatar.url = "http://example.com/avatar.png"
+    member.guild.id = guild_id
+    member.guild.me.guild_permissions.view_audit_log = True
+    return member
+
+async def test_on_member_remove_classifies_kicks_from_gateway_index(logger_cog, mock_bot):
+    """Test that close-together kicks are matched per target without calling the audit log API."""
+    # --- Arrange ---
+    mock_bot.intents = discord.Intents.default()
+    mock_log_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_log_channel
+    await logger_cog.on_audit_log_entry_create(make_kick_entry(1, 100, 9, "spam"))
+    await logger_cog.on_audit_log_entry_create(make_kick_entry(1, 200, 8, "raid"))
+    first, second = make_removed_member(1, 100), make_removed_member(1, 200)
+
+    # --- Act ---
+    await logger_cog.on_member_remove(second)
+    await logger_cog.on_member_remove(first)
+    await logger_cog.dispatcher.close()
+
+    # --- Assert ---
+    first.guild.audit_logs.assert_not_called()
+    embeds = mock_log_channel.send.call_args.kwargs["embeds"]
+    assert [e.title for e in embeds] == ["🥾 Member Kicked", "🥾 Member Kicked"]
+    assert [e.fields[1].value for e in embeds] == ["raid", "spam"]
+    assert embeds[0].fields[0].value == "<@8>"
+
+async def test_on_member_remove_waits_for_late_audit_event(logger_cog, mock_bot):
+    """Test that a kick whose audit event arrives after the removal is still classified."""
+    # --- Arrange ---
+    mock_bot.intents = discord.Intents.default()
+    mock_log_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_log_channel
+    member = make_removed_member(1, 100)
+
+    # --- Act ---
+    task = asyncio.create_task(logger_cog.on_member_remove(member))
+    await asyncio.sleep(0)
+    await logger_cog.on_audit_log_entry_create(make_kick_entry(1, 100, 9, "late"))
+    await task
+    await logger_cog.dispatcher.close()
+
+    # --- Assert ---
+    mock_bot.get_channel.assert_called_once_with(config.LOG_CHANNEL_MODERATION)
+    [embed] = mock_log_channel.send.call_args.kwargs["embeds"]
+    assert embed.title == "🥾 Member Kicked"
+
+async def test_on_member_remove_logs_leave_without_audit_entry(logger_cog, mock_bot):
+    """Test that a plain leave is logged once the short wait expires."""
+    # --- Arrange ---
+    mock_bot.intents = discord.Intents.default()
+    logger_cog.audit_wait_timeout = 0.01
+    mock_log_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_log_channel
+
+    # --- Act ---
+    await logger_cog.on_member_remove(make_removed_member(1, 100))
+    await logger_cog.dispatcher.close()
+
+    # --- Assert ---
+    mock_bot.get_channel.assert_called_once_with(config.LOG_CHANNEL_MEMBERS)
+    [embed] = mock_log_channel.send.call_args.kwargs["embeds"]
+    assert embed.title == "📤 Member Left"
+
+def make_prune_entry(guild_id, executor_id, members_removed):
+    entry = MagicMock(spec=discord.AuditLogEntry)
+    entry.action = discord.AuditLogAction.member_prune
+    entry.guild = MagicMock(spec=discord.Guild, id=guild_id)
+    entry.user_id = executor_id
+    entry.reason = None
+    entry.extra = MagicMock(members_removed=members_removed)
+    return entry
+
+async def test_audit_records_explain_only_the_removals_they_caused(logger_cog, mock_bot):
+    """Test that a kick is used once and a prune covers no more leaves than it removed."""
+    # --- Arrange ---
+    mock_bot.intents = discord.Intents.default()
+    logger_cog.audit_wait_timeout = 0.01
+    mock_log_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_log_channel
+    await logger_cog.on_audit_log_entry_create(make_kick_entry(1, 100, 9, "spam"))
+    await logger_cog.on_audit_log_entry_create(make_prune_entry(1, 8, members_removed=1))
+
+    # --- Act ---
+    for member_id in (100, 100, 200, 300):  # The kicked member rejoins and leaves again
+        await logger_cog.on_member_remove(make_removed_member(1, member_id))
+    await logger_cog.dispatcher.close()
+
+    # --- Assert ---
+    titles = [e.title for call in mock_log_channel.send.call_args_list for e in call.kwargs["embeds"]]
+    assert sorted(titles) == sorted(["🥾 Member Kicked", "✂️ Member Pruned", "📤 Member Left", "📤 Member Left"])
+
+async def test_on_member_remove_skips_audit_wait_without_permission(logger_cog, mock_bot):
+    """Test that without View Audit Log the leave is logged at once instead of waiting for an event that never comes."""
+    # --- Arrange ---
+    mock_bot.intents = discord.Intents.default()
+    logger_cog.audit_wait_timeout = 60
+    mock_bot.get_channel.return_value = AsyncMock(spec=discord.TextChannel)
+    member = make_removed_member(1, 100)
+    member.guild.me.guild_permissions.view_audit_log = False
+
+    # --- Act ---
+    await asyncio.wait_for(logger_cog.on_member_remove(member), timeout=1)
+
+    # --- Assert ---
+    mock_bot.get_channel.assert_called_once_with(config.LOG_CHANNEL_MEMBERS)
+    member.guild.audit_logs.assert_not_called()
+
+def make_posted_message(message_id, author_id, content):
+    message = MagicMock(spec=discord.Message)
+    message.id = message_id
+    message.guild = MagicMock(spec=discord.Guild)
+    message.author = MagicMock(spec=discord.Member)
+    message.author.id = author_id
+    message.author.bot = False
+    message.channel = MagicMock(spec=discord.TextChannel)
+    message.channel.id = 111
+    message.content = content
+    message.attachments = []
+    return message
+
+async def test_raw_delete_of_uncached_message_is_logged_from_compact_cache(logger_cog, mock_bot):
+    """Test that a deletion discord.py did not cache is logged from the logger's own cache."""
+    # --- Arrange ---
+    mock_log_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_log_channel
+    mock_bot.get_guild.return_value = None
+    mock_bot.get_user.return_value = None
+    await logger_cog.on_message(make_posted_message(67890, 12345, "Old message"))
+
+    payload = MagicMock(spec=discord.RawMessageDeleteEvent)
+    payload.message_id = 67890
+    payload.guild_id = 54321
+    payload.cached_message = None
+
+    # --- Act ---
+    await logger_cog.on_raw_message_delete(payload)
+    await logger_cog.dispatcher.close()
+
+    # --- Assert ---
+    [embed] = mock_log_channel.send.call_args.kwargs["embeds"]
+    assert embed.title == "🗑️ Message Deleted"
+    assert embed.author.name == "Unknown user (12345)"
+    assert "<#111>" in embed.description and "Old message" in embed.description
+    assert len(logger_cog.message_cache) == 0
+
+async def test_bulk_delete_sends_one_summary_with_transcript(logger_cog, mock_bot):
+    """Test that a bulk delete produces a single log with a transcript file."""
+    # --- Arrange ---
+    mock_log_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_log_channel
+    mock_bot.get_guild.return_value = None
+    mock_bot.get_user.return_value = None
+    posted = [make_posted_message(message_id, 12345, f"spam {message_id}") for message_id in (1001, 1002)]
+    for message in posted:
+        await logger_cog.on_message(message)
+
+    payload = MagicMock(spec=discord.RawBulkMessageDeleteEvent)
+    payload.message_ids = {1001, 1002, 1003}
+    payload.channel_id = 111
+    payload.guild_id = 54321
+    payload.cached_messages = [posted[1]]  # Also in discord.py's cache: still counted once
+
+    # --- Act ---
+    await logger_cog.on_raw_bulk_message_delete(payload)
+
+    # --- Assert ---
+    mock_log_channel.send.assert_called_once()
+    kwargs = mock_log_channel.send.call_args.kwargs
+    assert kwargs["embed"].title == "🧹 Bulk Delete"
+    assert "3 (2 with recorded content)" in kwargs["embed"].description
+    [transcript] = kwargs["files"]
+    lines = transcript.fp.read().decode().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("Unknown user (12345): spam 1001")
+
+async def test_deletions_are_archived_and_searchable(mock_bot, tmp_path):
+    """Test that logged deletions land in the archive and /logsearch finds them by text."""
+    # --- Arrange ---
+    mock_bot.db = DatabaseManager(str(tmp_path / "logs.db"))
+    await mock_bot.db.connect()
+    logger_cog = Logger(mock_bot)
+    await logger_cog.cog_load()
+    mock_bot.get_channel.return_value = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_guild.return_value = None
+    mock_bot.get_user.return_value = None
+    await logger_cog.on_message(make_posted_message(67890, 12345, "Buy cheap nitro"))
+
+    payload = MagicMock(spec=discord.RawMessageDeleteEvent)
+    payload.message_id = 67890
+    payload.guild_id = 54321
+    payload.cached_message = None
+    ctx = MagicMock()
+    ctx.guild.id = 54321
+    ctx.send = AsyncMock()
+
+    # --- Act ---
+    await logger_cog.on_raw_message_delete(payload)
+    await logger_cog.logsearch.callback(logger_cog, ctx, since="1d", text="nitro")
+    await logger_cog.cog_unload()
+    await mock_bot.db.close()
+
+    # --- Assert ---
+    embed = ctx.send.call_args.kwargs["embed"]
+    [field] = embed.fields
+    assert field.name.startswith("message_delete")
+    assert "<@12345> in <#111>" in field.value and "Buy cheap nitro" in field.value
+
+async def test_deleted_image_is_served_from_attachment_cache_after_restart(mock_bot, tmp_path):
+    """Test that an image cached before a restart is attached to the deletion log without a download."""
+    # --- Arrange ---
+    mock_bot.db = DatabaseManager(str(tmp_path / "logs.db"))
+    await mock_bot.db.connect()
+    mock_bot.get_guild.return_value = None
+    mock_bot.get_user.return_value = None
+    mock_bot.http_session = MagicMock()
+    with patch.multiple(config, LOG_ATTACHMENT_CACHE_CHANNELS=[111], LOG_ATTACHMENT_CACHE_DIR=str(tmp_path / "cache"),
+                        create=True):
+        before = Logger(mock_bot)
+        await before.cog_load()
+        message = make_posted_message(67890, 12345, "look")
+        attachment = MagicMock(spec=discord.Attachment)
+        attachment.id = 1
+        attachment.filename = "cat.png"
+        attachment.content_type = "image/png"
+        attachment.size = 9
+        attachment.read = AsyncMock(return_value=b"cat-bytes")
+        message.attachments = [attachment]
+        await before.on_message(message)
+        await before.cog_unload()
+
+        after = Logger(mock_bot)  # Fresh message cache, as after a restart
+        await after.cog_load()
+    mock_log_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_log_channel
+    payload = MagicMock(spec=discord.RawMessageDeleteEvent)
+    payload.message_id = 67890
+    payload.guild_id = 54321
+    payload.channel_id = 111
+    payload.cached_message = None
+
+    # --- Act ---
+    await after.on_raw_message_delete(payload)
+    await after.cog_unload()
+    await mock_bot.db.close()
+
+    # --- Assert ---
+    embed = mock_log_channel.send.call_args.kwargs["embed"]
+    [file] = mock_log_channel.send.call_args.kwargs["files"]
+    assert embed.author.name == "Unknown user (12345)"
+    assert "sent before the last restart" in embed.description
+    assert file.filename == "cat.png"
+    mock_bot.http_session.get.assert_not_called()
+
+async def test_join_flood_is_logged_as_one_embed(logger_cog, mock_bot):
+    """Test that joins past the flood threshold are aggregated into a single embed with the join rate."""
+    # --- Arrange ---
+    mock_log_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_log_channel
+    logger_cog.join_flood.threshold = 3
+    logger_cog.join_flood.window = 60
+    members = []
+    for i in range(30):
+        member = make_removed_member(1, 1000 + i)
+        member.mention = f"<@{1000 + i}>"
+        member.created_at = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc) + datetime.timedelta(hours=i)
+        members.append(member)
+
+    # --- Act ---
+    for member in members:
+        await logger_cog.on_member_join(member)
+    await logger_cog.join_flood.close()
+    await logger_cog.dispatcher.close()
+
+    # --- Assert ---
+    embeds = mock_log_channel.send.call_args.kwargs["embeds"]
+    assert [e.title for e in embeds] == ["📥 Member Joined"] * 2 + ["📥 28 Members Joined"]
+    batch = embeds[-1]
+    assert batch.description.count("<@") == 28
+    assert batch.fields[0].name == "Join Rate" and batch.fields[0].value == "30 joins/min"
+    assert batch.fields[1].value.startswith("<@1029>")
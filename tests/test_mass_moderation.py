@@ -0,0 +1,167 @@
+import asyncio
+import datetime
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+from discord.ext import commands
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import mass_moderation
+from src.cogs.moderation import MassBanFlags, Moderation
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+NOW = discord.utils.utcnow()
+OWNER_ID, MOD_ID, BOT_ID = 100000000000000001, 100000000000000002, 100000000000000003
+
+def make_member(user_id, top_role=1, joined_minutes_ago=60 * 24 * 365, account_days=365):
+    member = MagicMock(spec=discord.Member)
+    member.id = user_id
+    member.top_role = top_role  # Roles compare by position; ints stand in for them
+    member.joined_at = NOW - datetime.timedelta(minutes=joined_minutes_ago)
+    member.created_at = NOW - datetime.timedelta(days=account_days)
+    member.kick = AsyncMock()
+    return member
+
+def make_guild(members):
+    by_id = {member.id: member for member in members}
+    guild = MagicMock(spec=discord.Guild)
+    guild.id = 1
+    guild.owner_id = OWNER_ID
+    guild.me = make_member(BOT_ID, top_role=50)
+    guild.members = members
+    guild.get_member = by_id.get
+
+    async def bulk_ban(users, reason=None, delete_message_seconds=86400):
+        ids = [user.id for user in users]
+        return SimpleNamespace(banned=[discord.Object(i) for i in ids[:-1]], failed=[discord.Object(ids[-1])])
+
+    guild.bulk_ban = AsyncMock(side_effect=bulk_ban)
+    return guild
+
+async def test_parse_and_select_targets():
+    """Test ID/mention parsing and the join-age / account-age selectors."""
+    raider = make_member(200000000000000001, joined_minutes_ago=5, account_days=1)
+    old_timer = make_member(200000000000000002)
+    fresh_account = make_member(200000000000000003, joined_minutes_ago=60 * 24 * 30, account_days=2)
+    guild = make_guild([raider, old_timer, fresh_account])
+
+    ids = mass_moderation.parse_user_ids(f"<@{raider.id}> {old_timer.id}, <@!{raider.id}> 12345")
+    joined = mass_moderation.select_members(guild, joined_within=datetime.timedelta(minutes=10))
+    young = mass_moderation.select_members(guild, account_younger_than=datetime.timedelta(days=7))
+    both = mass_moderation.select_members(guild, datetime.timedelta(minutes=10), datetime.timedelta(days=7))
+
+    assert ids == [raider.id, old_timer.id]
+    assert joined == [raider]
+    assert young == [raider, fresh_account]
+    assert both == [raider]
+
+async def test_hierarchy_check_skips_protected_targets():
+    """Test that the moderator's and the bot's role positions are both enforced."""
+    moderator = make_member(MOD_ID, top_role=10)
+    peer = make_member(300000000000000001, top_role=10)
+    above_bot = make_member(300000000000000002, top_role=60)
+    regular = make_member(300000000000000003, top_role=1)
+    guild = make_guild([moderator, peer, above_bot, regular])
+    outsider = 300000000000000004  # Not in the guild: can still be banned
+
+    allowed, skipped = mass_moderation.check_hierarchy(
+        moderator, guild, [peer.id, regular.id, outsider, MOD_ID, OWNER_ID, BOT_ID])
+
+    assert allowed == [regular.id, outsider]
+    assert {r.user_id: r.detail for r in skipped}[peer.id] == "role hierarchy"
+    assert len(skipped) == 4
+
+    owner = make_member(OWNER_ID, top_role=5)
+    allowed, skipped = mass_moderation.check_hierarchy(owner, guild, [peer.id, above_bot.id])
+    assert allowed == [peer.id] and skipped[0].detail == "above the bot's top role"
+
+async def test_bulk_ban_sends_200_users_per_call():
+    """Test chunking to the bulk ban endpoint's limit and mapping of its result."""
+    guild = make_guild([])
+    user_ids = list(range(400000000000000000, 400000000000000450))
+
+    results = await mass_moderation.bulk_ban(guild, user_ids, "raid")
+
+    assert [len(call.args[0]) for call in guild.bulk_ban.await_args_list] == [200, 200, 50]
+    assert sum(r.result == "banned" for r in results) == 447
+    assert sum(r.result == "failed" for r in results) == 3
+
+async def test_mass_kick_bounds_concurrency():
+    """Test that no more than `concurrency` kicks are in flight at once."""
+    members = [make_member(500000000000000000 + i) for i in range(20)]
+    in_flight = peak = 0
+
+    async def kick(reason=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+
+    for member in members:
+        member.kick.side_effect = kick
+    guild = make_guild(members)
+
+    results = await mass_moderation.mass_kick(guild, [m.id for m in members] + [999999999999999999], "raid", concurrency=3)
+
+    assert peak == 3
+    assert sum(r.result == "kicked" for r in results) == 20
+    assert [r.detail for r in results if r.result == "skipped"] == ["not a member"]
+
+async def test_massban_sends_one_summary_with_result_file():
+    """Test that /massban replies once with a summary embed and a CSV of every target."""
+    # Arrange
+    raiders = [make_member(600000000000000000 + i, joined_minutes_ago=2) for i in range(5)]
+    moderator = make_member(MOD_ID, top_role=10, joined_minutes_ago=3)  # Matched, but never a target
+    guild = make_guild(raiders + [moderator])
+    cog = Moderation(MagicMock())
+    ctx = MagicMock()
+    ctx.guild = guild
+    ctx.author = moderator
+    ctx.interaction = None
+    ctx.send = AsyncMock()
+
+    # Act
+    flags = await MassBanFlags.convert(ctx, "joined_within_minutes: 10 reason: raid")
+    await cog.massban.callback(cog, ctx, flags=flags)
+
+    # Assert
+    ctx.send.assert_awaited_once()
+    embed = ctx.send.call_args.kwargs["embed"]
+    fields = {field.name: field.value for field in embed.fields}
+    assert fields["Matched"] == "6" and fields["Banned"] == "4" and fields["Failed"] == "1" and fields["Skipped"] == "1"
+    csv_text = ctx.send.call_args.kwargs["file"].fp.read().decode()
+    assert csv_text.splitlines()[0] == "user_id,result,detail"
+    assert f"{MOD_ID},skipped,cannot target yourself or the bot" in csv_text
+
+async def test_mass_action_flags_take_several_ids_and_bound_the_selectors():
+    """Test that prefix flags keep every ID of `users:` and reject selectors timedelta cannot hold."""
+    ctx = MagicMock()
+
+    flags = await MassBanFlags.convert(ctx, f"users: {OWNER_ID} <@{MOD_ID}> {BOT_ID} reason: spam wave")
+
+    assert mass_moderation.parse_user_ids(flags.users) == [OWNER_ID, MOD_ID, BOT_ID]
+    assert flags.reason == "spam wave" and flags.delete_message_days == 1
+    with pytest.raises(commands.BadFlagArgument):
+        await MassBanFlags.convert(ctx, "account_younger_than_days: 999999999999")
+
+async def test_massban_requires_manage_server_for_the_bulk_ban_endpoint():
+    """Test that /massban is rejected up front when the bot can ban but not manage the server."""
+    cog = Moderation(MagicMock())
+    ctx = MagicMock()
+    ctx.permissions = discord.Permissions.all()
+    ctx.bot_permissions = discord.Permissions(ban_members=True)
+
+    with pytest.raises(commands.BotMissingPermissions) as excinfo:
+        for check in cog.massban.checks:
+            await discord.utils.maybe_coroutine(check, ctx)
+
+    assert excinfo.value.missing_permissions == ["manage_guild"]
@@ -0,0 +1,85 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from discord.ext import commands
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import metrics
+from src.cogs.telemetry import Telemetry
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+class Sample(commands.Cog):
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        return "handled"
+
+    @commands.Cog.listener("on_member_join")
+    async def greet(self, member):
+        raise RuntimeError("boom")
+
+async def test_render_uses_prometheus_text_format():
+    """Test counters, gauges and cumulative histogram buckets in the exposition format."""
+    # Arrange
+    registry = metrics.Registry()
+    requests = metrics.Counter("requests_total", "Requests.", ("route",), registry=registry)
+    depth = metrics.Gauge("depth", "Depth.", registry=registry)
+    latency = metrics.Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+
+    # Act
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    depth.labels().set_function(lambda: 7)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+    text = registry.render()
+
+    # Assert
+    assert '# TYPE requests_total counter\nrequests_total{route="/a\\"b"} 3.0' in text
+    assert "depth 7" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1\nlatency_seconds_bucket{le="1.0"} 2\nlatency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+async def test_instrument_cog_times_listeners_and_counts_errors():
+    """Test that wrapped listeners are timed per cog/event and errors are counted."""
+    cog = Sample()
+    metrics.instrument_cog(cog)
+    metrics.instrument_cog(cog)  # Idempotent
+
+    assert await cog.on_message(None) == "handled"
+    with pytest.raises(RuntimeError):
+        await cog.greet(None)
+
+    assert dict(cog.get_listeners())["on_message"] is cog.on_message
+    assert metrics.LISTENER_SECONDS.labels("Sample", "on_message").count == 1
+    assert metrics.LISTENER_ERRORS.labels("Sample", "on_member_join").value == 1
+
+async def test_routes_are_normalized_to_bounded_labels():
+    """Test that IDs, tokens and emoji are collapsed and CDN downloads share one label."""
+    assert metrics.normalize_route("discord.com", "/api/v10/channels/123/messages/456") == "/channels/{id}/messages/{id}"
+    assert metrics.normalize_route("discord.com", "/api/v10/webhooks/1/abc-token") == "/webhooks/{id}/{token}"
+    assert metrics.normalize_route("discord.com", "/api/v10/channels/1/messages/2/reactions/%F0%9F%91%8D/@me") == \
+        "/channels/{id}/messages/{id}/reactions/{emoji}/@me"
+    assert metrics.normalize_route("cdn.discordapp.com", "/attachments/1/2/cat.png") == "cdn.discordapp.com"
+
+async def test_telemetry_counts_gateway_events_and_serves_metrics():
+    """Test the gateway event listener and the /metrics handler."""
+    bot = MagicMock(spec=commands.Bot)
+    bot.latency = 0.042
+    cog = Telemetry(bot)
+    await cog.cog_load()  # METRICS_PORT is None: no server, gauges only
+
+    await cog.on_socket_event_type("MESSAGE_CREATE")
+    response = await cog.handle_metrics(MagicMock())
+    await cog.cog_unload()
+
+    body = response.body.decode()
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'discord_gateway_events_total{event="MESSAGE_CREATE"}' in body
+    assert "discord_gateway_latency_seconds 0.042" in body
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from unittest.mock import AsyncMock, MagicMock
@@ -9,12 +10,15 @@ from discord.ext import commands
 # Add project root to path to allow importing from src
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.cogs.mirror import Mirror
-from src import config
+from src.cogs.mirror import Mirror, build_routes
+from src.database import DatabaseManager
+from src.guild_settings import GuildSettings
 
 # Pytest-asyncio mark
 pytestmark = pytest.mark.asyncio
 
+SOURCE_ID = discord.utils.time_snowflake(discord.utils.utcnow())  # A recent source message
+
 @pytest.fixture
 def mock_bot():
     """Fixture for a mocked bot."""
@@ -22,6 +26,7 @@ def mock_bot():
     bot.user = MagicMock(spec=discord.ClientUser)
     bot.user.id = 9876543210
     bot.get_channel = MagicMock()
+    bot.settings = GuildSettings(db=None)  # Empty: tests pass mappings to rebuild_routes
     return bot
 
 @pytest.fixture
@@ -45,7 +50,7 @@ async def test_on_message_no_mirror_if_from_bot_itself(mirror_cog, mock_bot):
 async def test_on_message_no_mirror_if_not_in_any_source_channel(mirror_cog, mock_bot):
     """Test that the bot doesn't mirror messages from unconfigured channels."""
     # --- Arrange ---
-    setattr(config, "MIRROR_MAPPINGS", [{
+    mirror_cog.rebuild_routes([{
         "SOURCE_CHANNEL_ID": 111,
         "TARGET_CHANNEL_ID": 222,
         "BOT_TO_MIRROR_ID": 12345
@@ -65,7 +70,7 @@ async def test_on_message_no_mirror_if_not_in_any_source_channel(mirror_cog, moc
 async def test_on_message_no_mirror_if_not_correct_bot_id(mirror_cog, mock_bot):
     """Test that the bot doesn't mirror messages from unconfigured authors."""
     # --- Arrange ---
-    setattr(config, "MIRROR_MAPPINGS", [{
+    mirror_cog.rebuild_routes([{
         "SOURCE_CHANNEL_ID": 111,
         "TARGET_CHANNEL_ID": 222,
         "BOT_TO_MIRROR_ID": 12345
@@ -88,7 +93,7 @@ async def test_on_message_mirrors_correctly_for_first_mapping(mirror_cog, mock_b
         { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222, "BOT_TO_MIRROR_ID": 123 },
         { "SOURCE_CHANNEL_ID": 333, "TARGET_CHANNEL_ID": 444, "BOT_TO_MIRROR_ID": 456 },
     ]
-    setattr(config, "MIRROR_MAPPINGS", MAPPINGS)
+    mirror_cog.rebuild_routes(MAPPINGS)
 
     mock_target_channel = AsyncMock(spec=discord.TextChannel)
     mock_bot.get_channel.return_value = mock_target_channel
@@ -105,19 +110,25 @@ async def test_on_message_mirrors_correctly_for_first_mapping(mirror_cog, mock_b
     message.embeds = [mock_embed]
 
     mock_attachment = MagicMock(spec=discord.Attachment)
-    mock_attachment.to_file = AsyncMock(return_value="file_content")
+    mock_attachment.filename = "image.png"
+    mock_attachment.description = None
+    mock_attachment.size = 12
+    mock_attachment.is_spoiler.return_value = False
+    mock_attachment.read = AsyncMock(return_value=b"file_content")
     message.attachments = [mock_attachment]
 
     # --- Act ---
     await mirror_cog.on_message(message)
+    await mirror_cog.join_queues()
 
     # --- Assert ---
     mock_bot.get_channel.assert_called_once_with(222)  # Correct target
-    mock_target_channel.send.assert_called_once_with(
-        content="Hello World",
-        embeds=["copied_embed"],
-        files=["file_content"],
-    )
+    mock_target_channel.send.assert_called_once()
+    _args, kwargs = mock_target_channel.send.call_args
+    assert kwargs["content"] == "Hello World"
+    assert kwargs["embeds"] == ["copied_embed"]
+    assert [f.filename for f in kwargs["files"]] == ["image.png"]
+    assert kwargs["files"][0].fp.read() == b"file_content"
 
 async def test_on_message_mirrors_correctly_for_second_mapping(mirror_cog, mock_bot):
     """Test that the bot mirrors a message matching the second of two mappings."""
@@ -126,7 +137,7 @@ async def test_on_message_mirrors_correctly_for_second_mapping(mirror_cog, mock_
         { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222, "BOT_TO_MIRROR_ID": 123 },
         { "SOURCE_CHANNEL_ID": 333, "TARGET_CHANNEL_ID": 444, "BOT_TO_MIRROR_ID": 456 },
     ]
-    setattr(config, "MIRROR_MAPPINGS", MAPPINGS)
+    mirror_cog.rebuild_routes(MAPPINGS)
 
     mock_target_channel = AsyncMock(spec=discord.TextChannel)
     mock_bot.get_channel.return_value = mock_target_channel
@@ -142,6 +153,7 @@ async def test_on_message_mirrors_correctly_for_second_mapping(mirror_cog, mock_
 
     # --- Act ---
     await mirror_cog.on_message(message)
+    await mirror_cog.join_queues()
 
     # --- Assert ---
     mock_bot.get_channel.assert_called_once_with(444)  # Correct target
@@ -150,3 +162,412 @@ async def test_on_message_mirrors_correctly_for_second_mapping(mirror_cog, mock_
         embeds=[],
         files=[],
     )
+
+
+async def test_build_routes_fans_out_one_source_to_many_targets():
+    """Test that a source listed in several mappings routes to every target."""
+    routes = build_routes([
+        { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222 },
+        { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 333 },
+        { "SOURCE_CHANNEL_ID": 444 },  # Incomplete, ignored
+    ])
+
+    assert [r.target_channel_id for r in routes[111]] == [222, 333]
+    assert 444 not in routes
+    with pytest.raises(TypeError):
+        routes[555] = ()  # The table is read-only
+
+async def test_on_message_fans_out_to_all_targets(mirror_cog, mock_bot):
+    """Test that one source message is mirrored to each of its targets."""
+    # --- Arrange ---
+    mirror_cog.rebuild_routes([
+        { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222 },
+        { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 333 },
+    ])
+    targets = {222: AsyncMock(spec=discord.TextChannel), 333: AsyncMock(spec=discord.TextChannel)}
+    mock_bot.get_channel.side_effect = targets.get
+
+    message = MagicMock(spec=discord.Message)
+    message.channel = MagicMock(spec=discord.TextChannel)
+    message.channel.id = 111
+    message.author = MagicMock(spec=discord.Member)
+    message.author.id = 123
+    message.content = "Fan-out"
+    message.embeds = []
+    message.attachments = []
+
+    # --- Act ---
+    await mirror_cog.on_message(message)
+    await mirror_cog.join_queues()
+
+    # --- Assert ---
+    for target in targets.values():
+        target.send.assert_called_once_with(content="Fan-out", embeds=[], files=[])
+
+def _empty_source_message():
+    message = MagicMock(spec=discord.Message)
+    message.id = SOURCE_ID
+    message.channel = MagicMock(spec=discord.TextChannel)
+    message.channel.id = 111
+    message.author = MagicMock(spec=discord.Member)
+    message.author.id = 123
+    message.content = ""
+    message.embeds = []
+    message.attachments = []
+    message.stickers = []
+    return message
+
+async def test_empty_message_completed_by_edit_event(mirror_cog, mock_bot):
+    """Test that a late unfurl delivered by the edit event is mirrored without a fetch."""
+    # --- Arrange ---
+    mirror_cog.rebuild_routes([{ "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222 }])
+    mock_target_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_target_channel
+    message = _empty_source_message()
+    message.channel.fetch_message = AsyncMock()
+
+    edited = _empty_source_message()
+    edited.content = "Unfurled"
+    payload = MagicMock(spec=discord.RawMessageUpdateEvent)
+    payload.message_id = SOURCE_ID
+    payload.message = edited
+
+    # --- Act ---
+    task = asyncio.create_task(mirror_cog.on_message(message))
+    await asyncio.sleep(0)
+    await mirror_cog.on_raw_message_edit(payload)
+    await task
+    await mirror_cog.join_queues()
+
+    # --- Assert ---
+    message.channel.fetch_message.assert_not_called()
+    mock_target_channel.send.assert_called_once_with(content="Unfurled", embeds=[], files=[])
+    assert mirror_cog.wait_stats == {"event": 1, "fallback": 0}
+
+async def test_empty_message_falls_back_to_single_fetch(mirror_cog, mock_bot):
+    """Test that a single fetch is made when no edit event arrives in time."""
+    # --- Arrange ---
+    mirror_cog.rebuild_routes([{ "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222 }])
+    mirror_cog.embed_wait_timeout = 0.01
+    mock_target_channel = AsyncMock(spec=discord.TextChannel)
+    mock_bot.get_channel.return_value = mock_target_channel
+    message = _empty_source_message()
+    fetched = _empty_source_message()
+    fetched.content = "Fetched"
+    message.channel.fetch_message = AsyncMock(return_value=fetched)
+
+    # --- Act ---
+    await mirror_cog.on_message(message)
+    await mirror_cog.join_queues()
+
+    # --- Assert ---
+    message.channel.fetch_message.assert_called_once_with(SOURCE_ID)
+    mock_target_channel.send.assert_called_once_with(content="Fetched", embeds=[], files=[])
+    assert mirror_cog.wait_stats == {"event": 0, "fallback": 1}
+    assert not mirror_cog._pending
+
+def _source_message(content: str):
+    message = _empty_source_message()
+    message.content = content
+    message.author.display_name = "NewsBot"
+    message.author.display_avatar.url = "http://example.com/news.png"
+    return message
+
+async def test_webhook_delivery_creates_and_caches_webhook(mirror_cog, mock_bot):
+    """Test that webhook delivery creates one webhook per target, persists it and reuses it."""
+    # --- Arrange ---
+    mirror_cog.rebuild_routes([{ "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222, "DELIVERY": "webhook" }])
+    mock_bot.db = MagicMock()
+    mock_bot.db.execute = AsyncMock()
+    mock_webhook = AsyncMock(spec=discord.Webhook)
+    mock_webhook.id = 555
+    mock_webhook.token = "secret"
+    mock_target_channel = AsyncMock(spec=discord.TextChannel)
+    mock_target_channel.id = 222
+    mock_target_channel.webhooks.return_value = []
+    mock_target_channel.create_webhook.return_value = mock_webhook
+    mock_bot.get_channel.return_value = mock_target_channel
+
+    # --- Act ---
+    await mirror_cog.on_message(_source_message("First"))
+    await mirror_cog.on_message(_source_message("Second"))
+    await mirror_cog.join_queues()
+
+    # --- Assert ---
+    mock_target_channel.create_webhook.assert_called_once()
+    mock_target_channel.send.assert_not_called()
+    assert mock_webhook.send.call_count == 2
+    _args, kwargs = mock_webhook.send.call_args
+    assert kwargs["content"] == "Second"
+    assert kwargs["username"] == "NewsBot"
+    mock_bot.db.execute.assert_called_once()
+    assert mock_bot.db.execute.call_args.args[1:] == (222, 555, "secret")
+    assert mirror_cog._is_mirror_webhook(555)
+    await mirror_cog._forget_webhook(222)
+    assert not mirror_cog._is_mirror_webhook(555)
+
+async def test_slow_target_does_not_delay_other_targets(mirror_cog, mock_bot):
+    """Test that each target has its own queue, so a stuck target cannot block another."""
+    # --- Arrange ---
+    mirror_cog.rebuild_routes([
+        { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222 },
+        { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 333 },
+    ])
+    stuck = asyncio.Event()
+
+    async def stuck_send(**kwargs):
+        await stuck.wait()
+
+    slow_target = AsyncMock(spec=discord.TextChannel)
+    slow_target.id = 222
+    slow_target.send.side_effect = stuck_send
+    fast_target = AsyncMock(spec=discord.TextChannel)
+    fast_target.id = 333
+    mock_bot.get_channel.side_effect = {222: slow_target, 333: fast_target}.get
+
+    # --- Act ---
+    await mirror_cog.on_message(_source_message("Burst"))
+    await asyncio.wait_for(mirror_cog._senders[333].queue.join(), timeout=1)
+
+    # --- Assert ---
+    fast_target.send.assert_called_once()
+    assert not stuck.is_set()
+    stuck.set()
+    await mirror_cog.join_queues()
+
+async def test_messages_from_own_mirror_webhooks_are_not_mirrored(mirror_cog, mock_bot):
+    """Test that two channels mirrored into each other through webhooks do not loop."""
+    # --- Arrange ---
+    mirror_cog.rebuild_routes([
+        { "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222, "DELIVERY": "webhook" },
+        { "SOURCE_CHANNEL_ID": 222, "TARGET_CHANNEL_ID": 111, "DELIVERY": "webhook" },
+    ])
+    mirror_cog._webhooks[111] = MagicMock(spec=discord.Webhook, id=555)
+    mirror_cog._webhook_ids.add(555)
+    copy = _source_message("Mirrored copy")
+    copy.webhook_id = 555
+
+    # --- Act ---
+    await mirror_cog.on_message(copy)
+
+    # --- Assert ---
+    mock_bot.get_channel.assert_not_called()
+
+async def test_closing_a_sender_releases_queued_payloads(mirror_cog, mock_bot, tmp_path):
+    """Test that stopping a target's worker removes the staged files of sends that never happened."""
+    # --- Arrange ---
+    mirror_cog.rebuild_routes([{ "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222 }])
+    stuck = asyncio.Event()
+
+    async def stuck_send(**kwargs):
+        await stuck.wait()
+
+    target = AsyncMock(spec=discord.TextChannel)
+    target.id = 222
+    target.send.side_effect = stuck_send
+    mock_bot.get_channel.return_value = target
+
+    paths = []
+
+    async def fake_download(attachment):
+        path = str(tmp_path / f"staged{len(paths)}")
+        with open(path, "wb") as f:
+            f.write(b"x" * attachment.size)
+        paths.append(path)
+        return path
+
+    mirror_cog.attachments.spool_threshold = 0
+    mirror_cog.attachments._download_to_disk = fake_download
+    for content in ("In flight", "Queued"):
+        attachment = MagicMock(spec=discord.Attachment)
+        attachment.filename = "clip.mp4"
+        attachment.description = None
+        attachment.size = 4
+        attachment.is_spoiler.return_value = False
+        message = _source_message(content)
+        message.attachments = [attachment]
+        await mirror_cog.on_message(message)
+    await asyncio.sleep(0)
+
+    # --- Act ---
+    await mirror_cog._senders[222].close()
+
+    # --- Assert ---
+    assert len(paths) == 2
+    assert not any(os.path.exists(path) for path in paths)
+
+def _routed_target(mock_bot, mirror_cog):
+    mirror_cog.rebuild_routes([{ "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222 }])
+    target = AsyncMock(spec=discord.TextChannel)
+    target.id = 222
+    target.send.return_value = MagicMock(spec=discord.Message, id=9001)
+    mock_bot.get_channel.return_value = target
+    return target
+
+async def test_edit_is_propagated_to_mirrored_copy(mirror_cog, mock_bot):
+    """Test that editing a source message edits its copy, found through the in-memory LRU."""
+    # --- Arrange ---
+    target = _routed_target(mock_bot, mirror_cog)
+    copy = AsyncMock(spec=discord.PartialMessage)
+    target.get_partial_message = MagicMock(return_value=copy)
+    await mirror_cog.on_message(_source_message("Old headline"))
+    await mirror_cog.join_queues()
+
+    payload = MagicMock(spec=discord.RawMessageUpdateEvent)
+    payload.message_id = SOURCE_ID
+    payload.channel_id = 111
+    payload.cached_message = None
+    payload.message = _source_message("New headline")
+    payload.message.embeds = []
+
+    # --- Act ---
+    await mirror_cog.on_raw_message_edit(payload)
+    await mirror_cog.join_queues()
+
+    # --- Assert ---
+    target.get_partial_message.assert_called_once_with(9001)
+    copy.edit.assert_called_once_with(content="New headline", embeds=[])
+
+async def test_delete_is_propagated_and_links_are_batched(mirror_cog, mock_bot):
+    """Test that links are written in one batch and a source delete removes the copy and its row."""
+    # --- Arrange ---
+    mock_bot.db = DatabaseManager(":memory:")
+    await mock_bot.db.connect()
+    await mirror_cog.cog_load()
+    mirror_cog.flush_links.cancel()
+    mirror_cog.prune_links.cancel()
+
+    target = _routed_target(mock_bot, mirror_cog)
+    copy = AsyncMock(spec=discord.PartialMessage)
+    target.get_partial_message = MagicMock(return_value=copy)
+    await mirror_cog.on_message(_source_message("Breaking"))
+    await mirror_cog.join_queues()
+    await mirror_cog._flush_links()
+    mirror_cog._links.clear()  # Force the lookup to go to SQLite
+
+    payload = MagicMock(spec=discord.RawMessageDeleteEvent)
+    payload.message_id = SOURCE_ID
+    payload.channel_id = 111
+
+    # --- Act ---
+    await mirror_cog.on_raw_message_delete(payload)
+    await mirror_cog.join_queues()
+    await mirror_cog._flush_links()
+
+    # --- Assert ---
+    target.get_partial_message.assert_called_once_with(9001)
+    copy.delete.assert_called_once()
+    assert await mock_bot.db.fetchall("SELECT * FROM mirror_messages") == []
+    await mock_bot.db.close()
+
+async def test_edit_keeps_links_to_attachments_that_were_not_uploaded(mirror_cog, mock_bot):
+    """Test that an edited copy is rebuilt like the original send, links to oversized attachments included."""
+    # --- Arrange ---
+    target = _routed_target(mock_bot, mirror_cog)
+    copy = AsyncMock(spec=discord.PartialMessage)
+    target.get_partial_message = MagicMock(return_value=copy)
+    mirror_cog.attachments.max_bytes_per_message = 10
+    big = MagicMock(spec=discord.Attachment)
+    big.id = 42
+    big.size = 1000
+    big.url = "https://cdn.example.com/big.zip"
+    message = _source_message("Old headline")
+    message.attachments = [big]
+    await mirror_cog.on_message(message)
+    await mirror_cog.join_queues()
+
+    payload = MagicMock(spec=discord.RawMessageUpdateEvent)
+    payload.message_id = SOURCE_ID
+    payload.channel_id = 111
+    payload.cached_message = None
+    payload.message = _source_message("New headline")
+    payload.message.attachments = [big]
+
+    # --- Act ---
+    await mirror_cog.on_raw_message_edit(payload)
+    await mirror_cog.join_queues()
+
+    # --- Assert ---
+    assert target.send.call_args.kwargs["content"] == "Old headline\nhttps://cdn.example.com/big.zip"
+    copy.edit.assert_called_once_with(content="New headline\nhttps://cdn.example.com/big.zip", embeds=[])
+
+async def test_copies_of_a_replaced_webhook_are_not_edited_through_the_new_one(mirror_cog, mock_bot):
+    """Test that edits are skipped and deletes go through the channel once the sending webhook was replaced."""
+    # --- Arrange ---
+    mock_bot.db = DatabaseManager(":memory:")
+    await mock_bot.db.connect()
+    await mirror_cog.cog_load()
+    mirror_cog.flush_links.cancel()
+    mirror_cog.prune_links.cancel()
+    mirror_cog.rebuild_routes([{ "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222, "DELIVERY": "webhook" }])
+    old_webhook = AsyncMock(spec=discord.Webhook)
+    old_webhook.id = 555
+    old_webhook.token = "old"
+    old_webhook.send.return_value = MagicMock(spec=discord.WebhookMessage, id=9001)
+    new_webhook = AsyncMock(spec=discord.Webhook)
+    new_webhook.id = 556
+    target = AsyncMock(spec=discord.TextChannel)
+    target.id = 222
+    copy = AsyncMock(spec=discord.PartialMessage)
+    target.get_partial_message = MagicMock(return_value=copy)
+    mock_bot.get_channel.return_value = target
+    mirror_cog._webhooks[222] = old_webhook
+    await mirror_cog.on_message(_source_message("Breaking"))
+    await mirror_cog.join_queues()
+    await mirror_cog._flush_links()
+    mirror_cog._links.clear()
+    mirror_cog._webhooks[222] = new_webhook  # e.g. the old one was deleted and a new one created
+
+    edit = MagicMock(spec=discord.RawMessageUpdateEvent)
+    edit.message_id = SOURCE_ID
+    edit.channel_id = 111
+    edit.cached_message = None
+    edit.message = _source_message("Update")
+    delete = MagicMock(spec=discord.RawMessageDeleteEvent)
+    delete.message_id = SOURCE_ID
+    delete.channel_id = 111
+
+    # --- Act ---
+    await mirror_cog.on_raw_message_edit(edit)
+    await mirror_cog.on_raw_message_delete(delete)
+    await mirror_cog.join_queues()
+    await mock_bot.db.close()
+
+    # --- Assert ---
+    new_webhook.edit_message.assert_not_called()
+    new_webhook.delete_message.assert_not_called()
+    old_webhook.edit_message.assert_not_called()
+    target.get_partial_message.assert_called_once_with(9001)
+    copy.delete.assert_called_once()
+
+async def test_updates_skip_other_authors_old_messages_and_known_misses(mirror_cog, mock_bot):
+    """Test that edits/deletes that cannot have copies cost no queue job, and a miss is looked up only once."""
+    # --- Arrange ---
+    mirror_cog.rebuild_routes([{ "SOURCE_CHANNEL_ID": 111, "TARGET_CHANNEL_ID": 222, "BOT_TO_MIRROR_ID": 123 }])
+    mock_bot.db = MagicMock()
+    mock_bot.db.fetchall = AsyncMock(return_value=[])
+    target = AsyncMock(spec=discord.TextChannel)
+    target.id = 222
+    mock_bot.get_channel.return_value = target
+
+    def edit(author_id, message_id=SOURCE_ID):
+        payload = MagicMock(spec=discord.RawMessageUpdateEvent)
+        payload.message_id = message_id
+        payload.channel_id = 111
+        payload.cached_message = None
+        payload.message = _source_message("Edited")
+        payload.message.id = message_id
+        payload.message.author.id = author_id
+        return payload
+
+    # --- Act ---
+    await mirror_cog.on_raw_message_edit(edit(author_id=456))  # Route only mirrors author 123
+    await mirror_cog.on_raw_message_edit(edit(author_id=123, message_id=777))  # Older than the retention window
+    other_calls = mock_bot.get_channel.call_count
+    for _ in range(3):
+        await mirror_cog.on_raw_message_edit(edit(author_id=123))  # Never mirrored
+    await mirror_cog.join_queues()
+
+    # --- Assert ---
+    assert other_calls == 0
+    mock_bot.db.fetchall.assert_awaited_once()
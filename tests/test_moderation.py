@@ -0,0 +1,127 @@
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+import pytest
+import pytest_asyncio
+from discord.ext import commands
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cogs.moderation import Moderation, WarningsView
+from src.database import DatabaseManager
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+GUILD_ID = 111
+USER_ID = 222
+MOD_ID = 333
+
+@pytest_asyncio.fixture
+async def moderation_cog():
+    """Fixture for the Moderation cog on an in-memory database."""
+    bot = MagicMock(spec=commands.Bot)
+    bot.db = DatabaseManager(":memory:")
+    await bot.db.connect()
+    cog = Moderation(bot)
+    cog.warn_escalation = {3: "timeout", 5: "kick"}
+    await cog.cog_load()
+    yield cog
+    await bot.db.close()
+
+def make_member():
+    member = AsyncMock(spec=discord.Member)
+    member.id = USER_ID
+    member.guild = MagicMock(id=GUILD_ID)
+    return member
+
+async def test_warning_counts_are_served_from_cache(moderation_cog):
+    """Test that only the first warning of a member needs a COUNT query."""
+    # Arrange
+    db = moderation_cog.bot.db
+
+    # Act
+    for _ in range(4):
+        await moderation_cog.add_warning(GUILD_ID, USER_ID, MOD_ID, "spam")
+
+    # Assert
+    count_stats = [s for s in db.query_stats.top() if s.statement.startswith("SELECT COUNT(*)")]
+    assert count_stats[0].count == 1
+    assert await moderation_cog.get_warning_count(GUILD_ID, USER_ID) == 4
+    assert (await db.fetchone("SELECT COUNT(*) FROM warnings"))[0] == 4
+
+async def test_concurrent_warnings_each_get_their_own_count(moderation_cog):
+    """Test that overlapping /warns for one member are counted one after the other."""
+    # Arrange
+    await moderation_cog.add_warning(GUILD_ID, USER_ID, MOD_ID, "first")  # Count now cached
+
+    # Act
+    counts = await asyncio.gather(
+        moderation_cog.add_warning(GUILD_ID, USER_ID, MOD_ID, "second"),
+        moderation_cog.add_warning(GUILD_ID, USER_ID, 444, "third"),
+    )
+
+    # Assert
+    assert sorted(counts) == [2, 3]
+    assert await moderation_cog.get_warning_count(GUILD_ID, USER_ID) == 3
+
+async def test_escalation_times_out_then_kicks(moderation_cog):
+    """Test that configured warning counts trigger a timeout and then a kick."""
+    member = make_member()
+
+    actions = []
+    for count in range(1, 6):
+        await moderation_cog.add_warning(GUILD_ID, USER_ID, MOD_ID, "spam")
+        actions.append(await moderation_cog._escalate(member, count))
+
+    assert actions[:2] == [None, None]
+    assert actions[2].startswith("Timed out for 60 minute(s)")
+    assert actions[4].startswith("Kicked")
+    member.timeout.assert_awaited_once()
+    member.kick.assert_awaited_once_with(reason="Reached 5 warnings")
+
+async def test_warnings_are_paginated_with_keyset_cursor(moderation_cog):
+    """Test that /warnings pages through history one page at a time, newest first."""
+    # Arrange
+    moderation_cog.warn_page_size = 2
+    for i in range(5):
+        with patch('src.cogs.moderation.discord.utils.utcnow') as mock_utcnow:
+            mock_utcnow.return_value.timestamp.return_value = 1_700_000_000 + i
+            await moderation_cog.add_warning(GUILD_ID, USER_ID, MOD_ID, f"reason {i}")
+    member = MagicMock(spec=discord.User, id=USER_ID)
+    view = WarningsView(moderation_cog, MOD_ID, GUILD_ID, member, total=5)
+    interaction = MagicMock()
+    interaction.response.edit_message = AsyncMock()
+
+    # Act
+    first = await view.load()
+    await view.next_page.callback(interaction)
+    second = interaction.response.edit_message.call_args.kwargs['embed']
+    await view.next_page.callback(interaction)
+    third = interaction.response.edit_message.call_args.kwargs['embed']
+    await view.previous_page.callback(interaction)
+    back = interaction.response.edit_message.call_args.kwargs['embed']
+
+    # Assert
+    reasons = lambda embed: [field.value.split("**Reason:** ")[1] for field in embed.fields]
+    assert reasons(first) == ["reason 4", "reason 3"]
+    assert reasons(second) == ["reason 2", "reason 1"]
+    assert reasons(third) == ["reason 0"]
+    assert reasons(back) == reasons(second)
+    assert third.footer.text == "Page 3/3 · 5 warning(s)"
+    assert view.next_page.disabled is False and view.previous_page.disabled is False
+
+async def test_clearwarns_resets_count(moderation_cog):
+    """Test that clearing warnings empties storage and the cached count."""
+    await moderation_cog.add_warning(GUILD_ID, USER_ID, MOD_ID, "spam")
+    await moderation_cog.add_warning(GUILD_ID, USER_ID, MOD_ID, "spam")
+
+    cleared = await moderation_cog.clear_warnings(GUILD_ID, USER_ID)
+
+    assert cleared == 2
+    assert await moderation_cog.get_warning_count(GUILD_ID, USER_ID) == 0
+    assert await moderation_cog.fetch_warning_page(GUILD_ID, USER_ID) == []
@@ -0,0 +1,123 @@
+import datetime
+import os
+import re
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cogs import general
+from src.purge import PurgeFilter, PurgeJob
+
+# Pytest-asyncio mark
+pytestmark = pytest.mark.asyncio
+
+NOW = discord.utils.utcnow()
+
+def make_message(i, age_days=0.0, bot=False, content="spam", attachments=()):
+    message = MagicMock(spec=discord.Message)
+    message.id = i
+    message.created_at = NOW - datetime.timedelta(days=age_days, seconds=i)
+    message.author.id = 1 if bot else 2
+    message.author.bot = bot
+    message.content = content
+    message.attachments = list(attachments)
+    message.pinned = False
+    message.delete = AsyncMock()
+    return message
+
+class FakeChannel:
+    """Channel whose history is generated lazily, counting how far it was read."""
+
+    def __init__(self, messages):
+        self.id = 555
+        self._messages = messages
+        self.read = 0
+        self.delete_messages = AsyncMock()
+
+    async def history(self, limit=None, before=None):
+        for message in self._messages[:limit]:
+            self.read += 1
+            yield message
+
+async def test_recent_messages_are_bulk_deleted_in_chunks_and_old_ones_singly():
+    """Test the 100-message chunks and the single-delete path past the 14-day boundary."""
+    # Arrange
+    messages = [make_message(i) for i in range(250)] + [make_message(1000 + i, age_days=20) for i in range(3)]
+    channel = FakeChannel(messages)
+    job = PurgeJob(channel, PurgeFilter(), amount=1000, single_delete_interval=0)
+
+    # Act
+    await job.run()
+
+    # Assert
+    chunk_sizes = [len(call.args[0]) for call in channel.delete_messages.await_args_list]
+    assert chunk_sizes == [100, 100, 50]
+    assert all(message.delete.await_count == 1 for message in messages[250:])
+    assert (job.scanned, job.matched, job.deleted) == (253, 253, 253)
+
+async def test_filters_combine_and_history_stops_at_amount():
+    """Test that only matching messages count and history is not walked past the amount."""
+    messages = [
+        make_message(1, bot=True, content="Buy NITRO now", attachments=[object()]),
+        make_message(2, bot=False, content="buy nitro"),
+        make_message(3, bot=True, content="hello"),
+        make_message(4, bot=True, content="nitro giveaway", attachments=[object()]),
+    ] + [make_message(10 + i, bot=True, content="nitro", attachments=[object()]) for i in range(100)]
+    channel = FakeChannel(messages)
+    purge_filter = PurgeFilter(bots_only=True, contains="nitro", has_attachment=True, pattern=re.compile(r"(?i)^buy|giveaway"))
+
+    job = await PurgeJob(channel, purge_filter, amount=2).run()
+
+    [call] = channel.delete_messages.await_args_list
+    assert [m.id for m in call.args[0]] == [1, 4]
+    assert channel.read == 5  # Stopped right after the second match
+
+async def test_cancel_stops_the_walk_and_reports_progress():
+    """Test that cancelling from the progress callback stops the purge and a final report is sent."""
+    channel = FakeChannel([make_message(i) for i in range(500)])
+    reports = []
+
+    async def on_progress(job):
+        reports.append((job.deleted, job.finished))
+        if job.deleted >= 100:
+            job.cancel()
+
+    job = await PurgeJob(channel, PurgeFilter(), amount=500, progress_interval=0, on_progress=on_progress).run()
+
+    assert job.cancelled and job.deleted == 100
+    assert channel.read < 500
+    assert reports[-1] == (100, True)
+
+async def test_http_error_while_reading_history_stops_the_purge_with_an_error():
+    """Test that a Discord error other than Forbidden is reported instead of a completed purge."""
+    class FailingChannel(FakeChannel):
+        async def history(self, limit=None, before=None):
+            yield make_message(1)
+            raise discord.HTTPException(MagicMock(status=503, reason="Service Unavailable"), "upstream error")
+
+    job = await PurgeJob(FailingChannel([]), PurgeFilter(), amount=10).run()
+
+    assert job.finished and not job.cancelled
+    assert job.error == "Discord error: upstream error"
+
+async def test_slash_purge_status_moves_to_a_channel_message_before_the_token_expires(monkeypatch):
+    """Test that a long slash purge stops editing its ephemeral status and continues in the channel."""
+    monkeypatch.setattr(general, "INTERACTION_EDIT_WINDOW", -1)  # Every report is past the window
+    cog = general.General(MagicMock())
+    status = AsyncMock(spec=discord.Message)
+    channel = FakeChannel([make_message(i) for i in range(3)])
+    channel.send = AsyncMock(return_value=AsyncMock(spec=discord.Message))
+    ctx = MagicMock()
+    ctx.channel = channel
+    ctx.send = AsyncMock(return_value=status)
+
+    await cog.purge.callback(cog, ctx, amount=10)
+
+    status.edit.assert_not_called()
+    channel.send.assert_awaited_once()
+    channel.send.return_value.edit.assert_awaited()
@@ -0,0 +1,40 @@
+import os
+import sys
+
+# Add project root to path to allow importing from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.query_stats import QueryStats, normalize
+
+def test_normalize_groups_statements_by_shape():
+    """Test that literals, whitespace and IN lists do not split a statement."""
+    assert normalize("SELECT *  FROM t\n WHERE id = 42 AND name = 'it''s'") == "SELECT * FROM t WHERE id = ? AND name = ?"
+    assert normalize("DELETE FROM t WHERE id IN (?, ?, ?)") == normalize("DELETE FROM t WHERE id IN (?,?)")
+
+def test_record_builds_histogram_and_ranks_by_total():
+    """Test that timings accumulate per statement and top() orders by total time."""
+    # Arrange
+    stats = QueryStats()
+
+    # Act
+    for _ in range(9):
+        stats.record("SELECT 1", 0.002)
+    stats.record("SELECT 1", 0.3)
+    stats.record("SELECT * FROM big", 0.5)
+
+    # Assert
+    fast, slow = stats.top(key="count")
+    assert fast.count == 10 and slow.count == 1
+    assert stats.top(1)[0] is slow  # 0.5 s total beats 0.318 s
+    assert fast.quantile(0.5) == 0.005
+    assert fast.quantile(1.0) == 0.3
+
+def test_statement_table_is_bounded():
+    """Test that statements past the limit are folded into one bucket."""
+    stats = QueryStats(max_statements=2)
+
+    for table in ("a", "b", "c", "d"):
+        stats.record(f"SELECT * FROM {table}", 0.001)
+
+    assert len(stats) == 3
+    assert stats.top(1, key="count")[0].statement == "(other)"